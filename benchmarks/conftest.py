@@ -0,0 +1,182 @@
+"""
+In-process API benchmarks against seeded datasets (storefront.seed).
+
+Skipped unless BENCHMARK=1. Other settings, all from the environment:
+
+    BENCHMARK_SCALES     comma separated dataset names (default: small)
+    BENCHMARK_ROUNDS     timed requests per benchmark (default: 50)
+    BENCHMARK_WARMUP     untimed requests first (default: 5)
+    BENCHMARK_OUTPUT     where to write the JSON results
+                         (default: benchmarks/results/<commit>.json)
+    BENCHMARK_BASELINE   results of an earlier run to compare against
+    BENCHMARK_TOLERANCE  allowed p95 slowdown as a fraction (default: 0.25)
+    BENCHMARK_MIN_DELTA  ... and in milliseconds, for very fast endpoints
+                         (default: 2)
+
+With a baseline, a benchmark fails if it runs more queries than it did
+there, or its p95 grew by more than both tolerances.
+
+    BENCHMARK=1 BENCHMARK_BASELINE=benchmarks/results/abc1234.json pytest benchmarks
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.test import APIClient
+from storefront import search, seed
+from storefront.budget import QueryCounter, count_queries
+import pytest
+
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+
+
+def enabled():
+    return os.environ.get('BENCHMARK') == '1'
+
+
+def get_scales():
+    return [name.strip() for name in os.environ.get('BENCHMARK_SCALES', 'small').split(',') if name.strip()]
+
+
+def get_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def pytest_collection_modifyitems(config, items):
+    if enabled():
+        return
+    skip = pytest.mark.skip(reason='set BENCHMARK=1 to run the benchmarks')
+    for item in items:
+        if BENCHMARK_DIR in Path(item.fspath).parents:
+            item.add_marker(skip)
+
+
+def pytest_generate_tests(metafunc):
+    if 'scale' in metafunc.fixturenames:
+        metafunc.parametrize('scale', get_scales(), scope='session')
+
+
+class Report:
+
+    def __init__(self):
+        self.results = {}
+        baseline = os.environ.get('BENCHMARK_BASELINE')
+        self.baseline = json.loads(Path(baseline).read_text())['results'] if baseline else {}
+        self.tolerance = float(os.environ.get('BENCHMARK_TOLERANCE', 0.25))
+        self.min_delta = float(os.environ.get('BENCHMARK_MIN_DELTA', 2))
+
+    def add(self, scale, name, stats):
+        self.results.setdefault(scale, {})[name] = stats
+
+    def regressions(self, scale, name, stats):
+        before = self.baseline.get(scale, {}).get(name)
+        if before is None:
+            return []
+        problems = []
+        if stats['queries'] > before['queries']:
+            problems.append(f'queries went from {before["queries"]} to {stats["queries"]}')
+        allowed = max(before['p95_ms'] * (1 + self.tolerance), before['p95_ms'] + self.min_delta)
+        if stats['p95_ms'] > allowed:
+            problems.append(f'p95 went from {before["p95_ms"]}ms to {stats["p95_ms"]}ms')
+        return problems
+
+    def write(self):
+        commit = get_commit()
+        path = Path(os.environ.get('BENCHMARK_OUTPUT') or BENCHMARK_DIR / 'results' / f'{commit}.json')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            'commit': commit,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'results': self.results,
+        }, indent=2, sort_keys=True) + '\n')
+        return path
+
+
+@pytest.fixture(scope='session')
+def report():
+    report = Report()
+    yield report
+    if report.results:
+        print(f'\nBenchmark results written to {report.write()}')
+
+
+@pytest.fixture(scope='session')
+def dataset(scale, django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        call_command('flush', interactive=False, verbosity=0)
+        # flush bypasses the delete signals that keep the in-process index current.
+        search.BACKENDS['index'].reset()
+        counts = seed.seed(scale)
+    return counts
+
+
+@pytest.fixture(autouse=True)
+def benchmark_settings(settings):
+    # Time the views rather than the catalog cache.
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    settings.QUERY_BUDGET_RAISE = False
+    settings.QUERY_BUDGET_LOG = False
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def bench(scale, dataset, report):
+    """
+    bench(name, run, setup=None) calls `run(*setup())` BENCHMARK_WARMUP +
+    BENCHMARK_ROUNDS times, timing only `run`, and records p50/p95 latency
+    and the most queries any round ran.
+    """
+    rounds = int(os.environ.get('BENCHMARK_ROUNDS', 50))
+    warmup = int(os.environ.get('BENCHMARK_WARMUP', 5))
+
+    def measure(name, run, setup=None):
+        timings, queries = [], []
+        for round_number in range(warmup + rounds):
+            args = setup() if setup else ()
+            with count_queries(QueryCounter()) as counter:
+                start = time.perf_counter()
+                result = run(*args)
+                elapsed = time.perf_counter() - start
+            status_code = getattr(result, 'status_code', 200)
+            assert status_code < 400, f'{name} returned {status_code}: {getattr(result, "data", "")}'
+            if round_number >= warmup:
+                timings.append(elapsed * 1000)
+                queries.append(counter.count)
+
+        stats = {
+            'rounds': rounds,
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'queries': max(queries),
+        }
+        report.add(scale, name, stats)
+        problems = report.regressions(scale, name, stats)
+        if problems:
+            pytest.fail(f'{name} [{scale}] regressed: ' + '; '.join(problems), pytrace=False)
+        return stats
+
+    return measure
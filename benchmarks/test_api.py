@@ -0,0 +1,79 @@
+from itertools import count
+
+from django.db.models import Count
+from storefront.carts import get_cart_backend
+from storefront.models import Collection, Customer, Order, Product
+from storefront.seed import WORDS
+from storefront.serializers import CreateOrderSerializer
+import pytest
+
+
+@pytest.fixture
+def product_ids():
+    return list(Product.objects.order_by('id').values_list('id', flat=True)[:200])
+
+
+def cycle(values):
+    counter = count()
+    return lambda: (values[next(counter) % len(values)],)
+
+
+@pytest.mark.django_db
+class TestCatalog:
+    def test_product_list(self, bench, api_client):
+        bench('product_list', lambda: api_client.get('/storefront/products/'))
+
+    def test_product_detail(self, bench, api_client, product_ids):
+        bench('product_detail', lambda product_id: api_client.get(f'/storefront/products/{product_id}/'),
+              setup=cycle(product_ids))
+
+    def test_product_filter(self, bench, api_client):
+        collection_ids = list(Collection.objects.values_list('id', flat=True))
+        bench('product_filter',
+              lambda collection_id: api_client.get(
+                  '/storefront/products/', {'collection_id': collection_id, 'price__lte': 250}),
+              setup=cycle(collection_ids))
+
+    def test_product_search(self, bench, api_client):
+        bench('product_search', lambda word: api_client.get('/storefront/products/', {'search': word}),
+              setup=cycle(WORDS))
+
+
+@pytest.mark.django_db
+class TestCart:
+    def test_cart_add(self, bench, api_client, product_ids):
+        cart_id = api_client.post('/storefront/carts/').data['id']
+
+        bench('cart_add',
+              lambda product_id: api_client.post(f'/storefront/carts/{cart_id}/cartitems/',
+                                                 {'product_id': product_id, 'quantity': 1}),
+              setup=cycle(product_ids))
+
+
+@pytest.mark.django_db
+class TestOrders:
+    @pytest.fixture
+    def customer(self):
+        busiest = Order.objects.values('customer').annotate(orders=Count('id')).order_by('-orders', 'customer')[0]
+        return Customer.objects.select_related('user').get(pk=busiest['customer'])
+
+    def test_checkout(self, bench, customer, product_ids):
+        carts = get_cart_backend()
+        next_products = cycle(product_ids)
+
+        def fill_cart():
+            cart = carts.create()
+            carts.add_items(cart.id, {next_products()[0]: 1 for _ in range(3)})
+            return (cart.id,)
+
+        def checkout(cart_id):
+            serializer = CreateOrderSerializer(data={'cart_id': cart_id}, context={'user_id': customer.user_id})
+            serializer.is_valid(raise_exception=True)
+            return serializer.save()
+
+        bench('checkout', checkout, setup=fill_cart)
+
+    def test_order_list(self, bench, api_client, customer):
+        api_client.force_authenticate(user=customer.user)
+
+        bench('order_list', lambda: api_client.get('/storefront/orders/'))
@@ -0,0 +1,88 @@
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from core import generations
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_CLAIM = 'session'
+
+
+def _session_key(user_id):
+    return f'auth:session:{user_id}'
+
+
+def _revoked_key(jti):
+    return f'auth:revoked:{jti}'
+
+
+def get_session(user_id):
+    """The user's session generation, stamped into every token issued to them."""
+    return generations.get_generation(_session_key(user_id))
+
+
+def revoke_user(user_id):
+    """Revoke every token issued to the user so far."""
+    transaction.on_commit(lambda: generations.bump_generation(_session_key(user_id)))
+
+
+def revoke_token(token):
+    """Revoke a single token until it would have expired anyway."""
+    ttl = token['exp'] - int(time.time())
+    if ttl > 0:
+        cache.set(_revoked_key(token[api_settings.JTI_CLAIM]), True, timeout=ttl)
+
+
+def is_revoked(token):
+    session_key = _session_key(token[api_settings.USER_ID_CLAIM])
+    revoked_key = _revoked_key(token[api_settings.JTI_CLAIM])
+    found = cache.get_many([session_key, revoked_key])
+    if revoked_key in found:
+        return True
+    if session_key not in found:
+        # Evicted: there's no telling whether the user was revoked since, so
+        # their tokens are refused. Re-seeding means this is logged once and
+        # the next login gets a working session.
+        logger.warning('Session generation for user %s was evicted from the cache; '
+                       'their tokens are refused until they log in again.', token[api_settings.USER_ID_CLAIM])
+        generations.get_generation(session_key)
+        return True
+    return found[session_key] != token.get(SESSION_CLAIM)
+
+
+class ClaimsUser(TokenUser):
+    """The user as described by the token's claims (see TokenObtainPairSerializer)."""
+
+    @cached_property
+    def customer_id(self):
+        return self.token.get('customer_id')
+
+
+class RevocationMixin:
+    """Reject tokens revoked by logout or by a credential change."""
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_revoked(token):
+            raise InvalidToken(_('Token has been revoked'))
+        return token
+
+
+class ClaimsJWTAuthentication(RevocationMixin, JWTStatelessUserAuthentication):
+    """
+    Authenticate from the access token alone: the user row is never loaded,
+    and the only lookup is one cache round trip to the revocation list.
+    """
+
+
+class UserJWTAuthentication(RevocationMixin, JWTAuthentication):
+    """Authenticate as the user row, for views that read or save it."""
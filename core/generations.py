@@ -0,0 +1,45 @@
+"""
+Generation counters kept in the cache. Anything derived from some state
+(cached responses, a search index, issued tokens) records the generation
+it was made under, and is stale once the counter has moved on.
+
+Counters are seeded with a timestamp rather than 1, so a counter that was
+evicted and re-created never lines up with a generation issued under the
+old one.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def get_generations(keys, initial=time.time_ns):
+    """The values under `keys`, seeding any that are missing with `initial()`."""
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, initial(), timeout=None)
+            values[key] = cache.get(key)
+    return [values[key] for key in keys]
+
+
+async def aget_generations(keys, initial=time.time_ns):
+    values = await cache.aget_many(keys)
+    for key in keys:
+        if key not in values:
+            await cache.aadd(key, initial(), timeout=None)
+            values[key] = await cache.aget(key)
+    return [values[key] for key in keys]
+
+
+def get_generation(key):
+    return get_generations([key])[0]
+
+
+def bump_generation(key):
+    """Move the counter on and return its new value."""
+    try:
+        return cache.incr(key)
+    except ValueError:
+        generation = time.time_ns()
+        cache.set(key, generation, timeout=None)
+        return generation
@@ -3,6 +3,15 @@ from djoser.serializers import (
     UserSerializer as BaseUserSerializer,
 )
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer as BaseTokenObtainPairSerializer,
+    TokenRefreshSerializer as BaseTokenRefreshSerializer,
+    TokenVerifySerializer as BaseTokenVerifySerializer,
+)
+from rest_framework_simplejwt.tokens import UntypedToken
+from storefront.models import Customer
+from .authentication import SESSION_CLAIM, get_session, is_revoked
 
 
 class UserCreateSerializer(BaseUserCreateSerializer):
@@ -13,3 +22,29 @@ class UserCreateSerializer(BaseUserCreateSerializer):
 class UserSerializer(BaseUserSerializer):
     class Meta(BaseUserSerializer.Meta):
         fields = ["id", "email", "username", "first_name", "last_name"]
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        # Copied into every access token minted from this refresh token.
+        token = super().get_token(user)
+        token["is_staff"] = user.is_staff
+        token["customer_id"] = Customer.objects.filter(user_id=user.id).values_list("id", flat=True).first()
+        token[SESSION_CLAIM] = get_session(user.id)
+        return token
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    def validate(self, attrs):
+        if is_revoked(self.token_class(attrs["refresh"])):
+            raise InvalidToken("Token has been revoked")
+        return super().validate(attrs)
+
+
+class TokenVerifySerializer(BaseTokenVerifySerializer):
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        if is_revoked(UntypedToken(attrs["token"])):
+            raise InvalidToken("Token has been revoked")
+        return data
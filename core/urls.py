@@ -0,0 +1,10 @@
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+router.register('users', views.UserViewSet)
+
+urlpatterns = router.urls + [
+    path('jwt/logout/', views.LogoutView.as_view(), name='jwt-logout'),
+]
@@ -1,3 +1,34 @@
-from django.shortcuts import render
+from djoser.views import UserViewSet as BaseUserViewSet
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import UserJWTAuthentication, revoke_token
 
-# Create your views here.
+
+class UserViewSet(BaseUserViewSet):
+    # Account management reads and saves the user row, so it authenticates
+    # against it rather than the token's claims.
+    authentication_classes = [UserJWTAuthentication]
+
+
+class LogoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        refresh = None
+        if 'refresh' in request.data:
+            try:
+                refresh = RefreshToken(request.data['refresh'])
+            except TokenError as e:
+                raise InvalidToken(e.args[0])
+            if refresh[api_settings.USER_ID_CLAIM] != request.user.id:
+                raise InvalidToken('Token belongs to another user')
+
+        revoke_token(request.auth)
+        if refresh is not None:
+            revoke_token(refresh)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,5 +1,29 @@
+import json
+import os
+from itertools import accumulate
+from pathlib import Path
+from random import choices, randint
+
 from locust import HttpUser, task, between
-from random import randint
+
+
+# Written by `manage.py seed`; SEED_MANIFEST points elsewhere. Without one,
+# browse the ids of the original fixture data, all equally often.
+MANIFEST_PATH = Path(os.environ.get('SEED_MANIFEST') or Path(__file__).with_name('seed.json'))
+if 'SEED_MANIFEST' in os.environ or MANIFEST_PATH.exists():
+    MANIFEST = json.loads(MANIFEST_PATH.read_text())
+    COLLECTIONS = range(MANIFEST['ranges']['collections'][0], MANIFEST['ranges']['collections'][1] + 1)
+    PRODUCTS = range(MANIFEST['ranges']['products'][0], MANIFEST['ranges']['products'][1] + 1)
+    # Browse with the same Zipf popularity the orders were generated with.
+    PRODUCT_WEIGHTS = list(accumulate(1 / rank ** MANIFEST['popularity'] for rank in range(1, len(PRODUCTS) + 1)))
+else:
+    COLLECTIONS = range(2, 7)
+    PRODUCTS = range(1, 101)
+    PRODUCT_WEIGHTS = None
+
+
+def popular_product():
+    return choices(PRODUCTS, cum_weights=PRODUCT_WEIGHTS)[0]
 
 
 class WebsiteUser(HttpUser):
@@ -12,7 +36,7 @@ class WebsiteUser(HttpUser):
 
     @task(2)
     def view_products(self):
-        collection_id = randint(2, 6)
+        collection_id = randint(COLLECTIONS.start, COLLECTIONS.stop - 1)
         self.client.get(
             f"/storefront/products/?collection_id={collection_id}",
             name="/storefront/products/",
@@ -20,7 +44,7 @@ class WebsiteUser(HttpUser):
 
     @task(4)
     def view_product(self):
-        product_id = randint(1, 100)
+        product_id = popular_product()
         self.client.get(
             f"/storefront/products/{product_id}/",
             name="/storefront/products/:id",
@@ -28,7 +52,7 @@ class WebsiteUser(HttpUser):
 
     @task(1)
     def add_to_cart(self):
-        product_id = randint(1, 100)
+        product_id = popular_product()
         self.client.post(
             f"/storefront/carts/{self.cart_id}/cartitems/",
             name="/storefront/carts/cartitems/",
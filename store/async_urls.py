@@ -0,0 +1,10 @@
+"""
+URL configuration for ASGI requests (see storefront.async_views): the
+catalog read routes served natively async, then everything in store.urls.
+"""
+from django.urls import path, include
+from store.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("storefront/", include("storefront.async_urls")),
+] + sync_urlpatterns
@@ -1,4 +1,5 @@
 from datetime import timedelta
+import importlib.util
 from pathlib import Path
 from dotenv import load_dotenv
 import os
@@ -25,7 +26,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
-    "django.contrib.admin",
+    "storefront.apps.StoreAdminConfig",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -44,6 +45,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'storefront.metrics.MetricsMiddleware',
+    'storefront.compression.CompressionMiddleware',
+    'storefront.routers.PrimaryPinMiddleware',
+    'storefront.async_views.AsyncCatalogMiddleware',
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -115,6 +120,22 @@ DATABASES = {
     },
 }
 
+# Read replicas, e.g. REPLICA_HOSTS=db-replica-1,db-replica-2. Catalog reads
+# go to them (storefront.routers); everything else stays on `default`.
+DATABASE_REPLICAS = []
+for number, host in enumerate(filter(None, os.environ.get('REPLICA_HOSTS', '').split(',')), start=1):
+    DATABASES[f'replica{number}'] = {**DATABASES['default'], 'HOST': host.strip(), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['storefront.routers.PrimaryReplicaRouter']
+
+# After a write, a client reads from the primary for this many seconds
+# (tracked with the REPLICA_PIN_COOKIE cookie).
+REPLICA_PIN_SECONDS = 5
+REPLICA_PIN_COOKIE = 'primary_pin'
+# Catalog responses read from a replica are cached for at most this long.
+REPLICA_CACHE_TIMEOUT = 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -162,18 +183,36 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "COERCE_DECIMAL_TO_STRING": False,
+    'DEFAULT_RENDERER_CLASSES': [
+        'storefront.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'storefront.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.ClaimsJWTAuthentication',
     ),
 }
 
 SIMPLE_JWT = {
    'AUTH_HEADER_TYPES': ('JWT',),
    "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
+   'TOKEN_OBTAIN_SERIALIZER': 'core.serializers.TokenObtainPairSerializer',
+   'TOKEN_REFRESH_SERIALIZER': 'core.serializers.TokenRefreshSerializer',
+   'TOKEN_VERIFY_SERIALIZER': 'core.serializers.TokenVerifySerializer',
+   'TOKEN_USER_CLASS': 'core.authentication.ClaimsUser',
 }
 
+# MessagePack is optional; offer it through `Accept: application/msgpack` when installed.
+if importlib.util.find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('storefront.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].append('storefront.renderers.MessagePackParser')
+
 AUTH_USER_MODEL = 'core.User'
 
 DJOSER = {
@@ -191,4 +230,54 @@ CACHES = {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
         }
     }
-}
\ No newline at end of file
+}
+
+CATALOG_CACHE_TIMEOUT = 60 * 15
+CUSTOMER_CACHE_TIMEOUT = 60 * 60
+
+ADMIN_AUTOCOMPLETE_CACHE_TIMEOUT = 30
+
+# Smaller bodies are sent uncompressed (see storefront.compression).
+COMPRESSION_MIN_SIZE = 1024
+
+# Log requests that run more queries than their view's declared budget.
+QUERY_BUDGET_LOG = True
+QUERY_BUDGET_RAISE = False
+
+# 'fulltext' (MySQL MATCH ... AGAINST), 'index' (in-process inverted index),
+# 'like' (icontains scan) or 'auto' to pick by database vendor.
+PRODUCT_SEARCH_BACKEND = 'auto'
+
+# storefront.carts.RedisCartBackend keeps carts in Redis hashes (on the
+# CART_REDIS_CACHE django_redis connection) and only writes rows at checkout.
+CART_BACKEND = 'storefront.carts.DatabaseCartBackend'
+CART_REDIS_CACHE = 'default'
+CART_TTL = 60 * 60 * 24 * 7
+
+# Rows per transaction for the bulk product import endpoint and command.
+PRODUCT_IMPORT_BATCH_SIZE = 500
+
+# storefront.outbox: attempts before a message is marked failed, and the
+# first retry delay in seconds (doubling per attempt, capped at an hour).
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BACKOFF = 5
+
+# Processes generating ProductImage variants after upload (storefront.images);
+# 0 renders them inline in the request instead.
+PRODUCT_IMAGE_WORKERS = 2
+
+# Serve catalog and cart reads from .values() rows (storefront.readers)
+# rather than the DRF serializers; the output is identical.
+FAST_CATALOG_READS = True
+
+# Under ASGI, serve catalog GETs from native async views using the async ORM
+# (storefront.async_views) instead of DRF viewsets in a thread.
+ASYNC_CATALOG_READS = True
+
+# Request metrics (storefront.metrics), served to staff at /storefront/metrics/.
+# With several worker processes, point METRICS_DIR at a directory they share
+# and clear it when the server starts; each process writes its totals there
+# at most every METRICS_FLUSH_INTERVAL seconds. Unset, only the process
+# answering the scrape is reported.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 1
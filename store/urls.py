@@ -25,7 +25,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("storefront/", include("storefront.urls")),
     path("__debug__/", include(debug_toolbar.urls)),
-    path("auth/", include("djoser.urls")),
+    path("auth/", include("core.urls")),
     path("auth/", include("djoser.urls.jwt")),
 ]
 
@@ -1,29 +1,28 @@
 from typing import Any
 from django.contrib import admin, messages
 from django.db.models.query import QuerySet
-from django.http.request import HttpRequest
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 
-from django.db.models import Count, Q
+from django.db.models import Count
+from django.utils import timezone
 from django.utils.html import format_html, urlencode
+from . import cache as catalog_cache, images
+from .admin_site import EstimatedCountPaginator, PageAnnotationsMixin
 from .models import Collection, Product, Customer, Order, OrderItem, ProductImage
 
 
 @admin.register(Collection)
 class CollectionAdmin(admin.ModelAdmin):
     list_display = ['title', 'product_count']
-    search_fields = ['title']
+    search_fields = ['title__istartswith']
     show_full_result_count = False
 
-    @admin.display(ordering="product_count")
+    @admin.display(ordering="products_count")
     def product_count(self, collection):
         url = (reverse('admin:storefront_product_changelist')+'?' +
                urlencode({'collection__id': str(collection.id)}))
-        return format_html('<a href={}>{}</a>', url, collection.product_count)
-
-    def get_queryset(self, request: HttpRequest) -> QuerySet[Any]:
-        return super().get_queryset(request).annotate(product_count=Count('product'))
+        return format_html('<a href={}>{}</a>', url, collection.products_count)
 
 
 class InventoryFilter(admin.SimpleListFilter):
@@ -31,17 +30,25 @@ class InventoryFilter(admin.SimpleListFilter):
     parameter_name = 'inventory'
     MEDIUM_RANGE = '>10 and <90'
     high = '>=90'
+    # Half-open [from, to) ranges, each one range scan of the inventory index.
+    buckets = {
+        '<10': ('low', None, 10),
+        MEDIUM_RANGE: ('medium', 10, 90),
+        high: ('high', 90, None),
+    }
 
     def lookups(self, request: Any, model_admin: Any) -> list[tuple[Any, str]]:
-        return [("<10", 'low'), (self.MEDIUM_RANGE, 'medium'), (self.high, 'high'),]
+        return [(value, label) for value, (label, _, _) in self.buckets.items()]
 
     def queryset(self, request: Any, queryset: QuerySet[Any]) -> QuerySet[Any] | None:
-        if self.value() == '<10':
-            return queryset.filter(inventory__lt=10)
-        elif self.value() == self.MEDIUM_RANGE:
-            return queryset.filter(Q(inventory__gte=10) & Q(inventory__lt=90))
-        elif self.value() == self.high:
-            return queryset.filter(Q(inventory__gte=90))
+        if self.value() not in self.buckets:
+            return None
+        _, start, end = self.buckets[self.value()]
+        if start is not None:
+            queryset = queryset.filter(inventory__gte=start)
+        if end is not None:
+            queryset = queryset.filter(inventory__lt=end)
+        return queryset
 
 
 class ProductImageInline(admin.TabularInline):
@@ -50,7 +57,8 @@ class ProductImageInline(admin.TabularInline):
 
     def thumbnail(self, instance):
         if instance.image.name != '':
-            return mark_safe(f'<img src="{instance.image.url}" alt="" style="width:50px; height:50px; object-fit:cover;"/>')
+            url = images.variant_url(instance.image.name, instance.variants, 'thumbnail')
+            return mark_safe(f'<img src="{url}" alt="" style="width:50px; height:50px; object-fit:cover;"/>')
 
 
 class ProductAdmin(admin.ModelAdmin):
@@ -66,8 +74,9 @@ class ProductAdmin(admin.ModelAdmin):
     list_editable = ['price']
     list_select_related = ['collection']
     list_filter = [InventoryFilter]
-    search_fields = ['title']
+    search_fields = ['title__istartswith']
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
     @admin.display(ordering="inventory")
     def inventory_status(self, product):
@@ -83,31 +92,37 @@ class ProductAdmin(admin.ModelAdmin):
 
     @admin.action(description="Clear inventory")
     def clear_inventory(self, request, queryset):
-        updated_inventory = queryset.update(inventory=0)
+        product_ids = list(queryset.values_list('id', flat=True))
+        updated_inventory = queryset.update(inventory=0, last_update=timezone.now())
+        catalog_cache.invalidate_products(product_ids)
         self.message_user(
             request, f"{updated_inventory} products were successfully updated",)
 
 
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(PageAnnotationsMixin, admin.ModelAdmin):
     list_display = ['username', 'first_name',
                     'last_name', 'membership', 'email', 'orders']
     list_per_page = 20
     list_editable = ['membership']
     list_select_related = ['user']
-    search_fields = ['first_name__startswith',
-                     'last_name__startswith', 'email']
-    ordering = ['user__first_name', 'user__last_name']
+    # Prefix searches on the user's unique (so indexed) columns.
+    search_fields = ['user__username__istartswith', 'user__email__istartswith']
+    ordering = ['user__username']
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
     autocomplete_fields = ['user']
 
-    @admin.display(ordering="orders_count")
+    @admin.display()
     def orders(self, customer):
         url = (reverse('admin:storefront_order_changelist') +
                '?' + urlencode({'customer__id': str(customer.id)}))
         return format_html('<a href={}>{}</a>', url, customer.orders_count)
 
-    def get_queryset(self, request: HttpRequest) -> QuerySet[Any]:
-        return super().get_queryset(request).annotate(orders_count=Count('order'))
+    def annotate_page(self, customers):
+        counts = dict(Order.objects.filter(customer__in=customers).order_by()
+                      .values('customer').annotate(count=Count('id')).values_list('customer', 'count'))
+        for customer in customers:
+            customer.orders_count = counts.get(customer.id, 0)
 
 
 class OrderItemInline(admin.TabularInline):
@@ -119,10 +134,12 @@ class OrderAdmin(admin.ModelAdmin):
     autocomplete_fields = ['customer']
     inlines = [OrderItemInline]
     list_display = ["customer", 'payment_status', 'placed_at']
-    list_select_related = ['customer']
+    # Customer.__str__ reads the user's name.
+    list_select_related = ['customer__user']
     list_per_page = 20
     list_editable = ['payment_status']
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 
 # admin.site.register(Collection)
@@ -0,0 +1,96 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.functional import cached_property
+
+
+def estimate_count(model, using):
+    """The row count from the database's table statistics, or None where there are none."""
+    connection = connections[using]
+    if connection.vendor == 'mysql':
+        sql = ('SELECT table_rows FROM information_schema.tables '
+               'WHERE table_schema = DATABASE() AND table_name = %s')
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [model._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counting every row of a large InnoDB table takes seconds, so an
+    unfiltered changelist uses the table statistics instead. Filtered
+    counts, and tables small enough for estimates to be off by a page or
+    more, are still counted exactly.
+    """
+    exact_below = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.has_filters() and not queryset.query.distinct:
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.exact_below:
+                return estimate
+        return super().count
+
+
+class PageAnnotationsMixin:
+    """
+    ModelAdmin mixin for computed columns: `annotate_page()` gets only the
+    rows of the changelist page, where a queryset annotation would be
+    computed for the whole table before paging.
+    """
+
+    def annotate_page(self, objects):
+        pass
+
+    def get_changelist(self, request, **kwargs):
+        model_admin = self
+
+        class PageChangeList(super().get_changelist(request, **kwargs)):
+            def get_results(self, request):
+                super().get_results(request)
+                # Fills the queryset's cache, which the rows and the
+                # list_editable formset are then built from.
+                model_admin.annotate_page(list(self.result_list))
+
+        return PageChangeList
+
+
+class CachedAutocompleteJsonView(AutocompleteJsonView):
+    """
+    The widget already waits 250ms after the last keystroke before asking;
+    repeated terms (backspacing, several admins) are then served from the
+    cache for ADMIN_AUTOCOMPLETE_CACHE_TIMEOUT seconds.
+    """
+
+    def get(self, request, *args, **kwargs):
+        self.term, self.model_admin, self.source_field, _ = self.process_request(request)
+        if not self.has_perm(request):
+            raise PermissionDenied
+
+        params = [request.GET.get(name, '') for name in ('app_label', 'model_name', 'field_name', 'term', 'page')]
+        key = f'admin:autocomplete:{md5(repr(params).encode("utf-8")).hexdigest()}'
+        content = cache.get(key)
+        if content is None:
+            content = super().get(request, *args, **kwargs).content
+            cache.set(key, content, getattr(settings, 'ADMIN_AUTOCOMPLETE_CACHE_TIMEOUT', 30))
+        return HttpResponse(content, content_type='application/json')
+
+
+class StoreAdminSite(admin.AdminSite):
+
+    def autocomplete_view(self, request):
+        return CachedAutocompleteJsonView.as_view(admin_site=self)(request)
@@ -1,9 +1,16 @@
 from django.apps import AppConfig
+from django.contrib.admin import apps as admin_apps
 
 
 class StorefrontConfig(AppConfig):
+    default = True
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'storefront'
     
     def ready(self) -> None:
         import storefront.signals.handlers
+
+
+class StoreAdminConfig(admin_apps.AdminConfig):
+    default = False
+    default_site = 'storefront.admin_site.StoreAdminSite'
@@ -0,0 +1,23 @@
+from django.urls import re_path
+from .async_views import AsyncCatalogView
+from .views import CollectionViewSet, ProductViewSet, ReviewViewSet
+
+
+# The catalog read routes of storefront.urls, with the same patterns and
+# names, served by AsyncCatalogView. Used by store.async_urls under ASGI.
+urlpatterns = [
+    re_path(r'^products/$', AsyncCatalogView(ProductViewSet, 'list', 'products', False),
+            name='products-list'),
+    re_path(r'^products/(?P<pk>[^/.]+)/$', AsyncCatalogView(ProductViewSet, 'retrieve', 'products', True),
+            name='products-detail'),
+    re_path(r'^collections/$', AsyncCatalogView(CollectionViewSet, 'list', 'collections', False),
+            name='collections-list'),
+    re_path(r'^collections/(?P<pk>[^/.]+)/$', AsyncCatalogView(CollectionViewSet, 'retrieve', 'collections', True),
+            name='collections-detail'),
+    re_path(r'^products/(?P<product_pk>[^/.]+)/reviews/$',
+            AsyncCatalogView(ReviewViewSet, 'list', 'product-reviews', False),
+            name='product-reviews-list'),
+    re_path(r'^products/(?P<product_pk>[^/.]+)/reviews/(?P<pk>[^/.]+)/$',
+            AsyncCatalogView(ReviewViewSet, 'retrieve', 'product-reviews', True),
+            name='product-reviews-detail'),
+]
@@ -0,0 +1,106 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse
+from django.urls import resolve
+from rest_framework.response import Response
+from storefront import readers, routers
+from storefront.budget import QueryCounter, check_query_budget, count_queries, install_query_counter
+
+
+def enabled():
+    return getattr(settings, 'ASYNC_CATALOG_READS', True) and readers.enabled()
+
+
+class AsyncCatalogView:
+    """
+    Native async GET/HEAD for a FastReadMixin viewset, mounted at the
+    viewset's own URL under ASGI (see AsyncCatalogMiddleware). It runs the
+    viewset's `alist`/`aretrieve` with the async ORM; anything else (writes,
+    the browsable API) goes to the regular viewset in a thread.
+    """
+    formats = ['json', 'msgpack']
+
+    def __init__(self, viewset, action, basename, detail):
+        self.viewset = viewset
+        self.action = action
+        self.basename = basename
+        self.detail = detail
+        markcoroutinefunction(self)
+        # Writes fall through to the viewset, which is exempt too.
+        self.csrf_exempt = True
+
+    async def __call__(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or not enabled():
+            return await self.fallback(request)
+
+        view = self.viewset(basename=self.basename, detail=self.detail)
+        view.action_map = {'get': self.action, 'head': self.action}
+        view.args, view.kwargs = args, kwargs
+        view.request = drf_request = view.initialize_request(request, *args, **kwargs)
+        view.headers = view.default_response_headers
+        with count_queries(QueryCounter()) as counter:
+            try:
+                view.format_kwarg = view.get_format_suffix(**kwargs)
+                renderer, media_type = view.perform_content_negotiation(drf_request)
+                if renderer.format not in self.formats:
+                    return await self.fallback(request)
+                drf_request.accepted_renderer, drf_request.accepted_media_type = renderer, media_type
+                # As in APIView.initial(); authenticators and throttles may
+                # block, so they run on the sync thread.
+                await sync_to_async(self.check_request)(view, drf_request)
+
+                handler = getattr(view, f'a{self.action}')
+                if routers.is_pinned(request):
+                    response = await handler(drf_request, *args, **kwargs)
+                else:
+                    with routers.replica_reads():
+                        response = await handler(drf_request, *args, **kwargs)
+            except Exception as exc:
+                response = view.handle_exception(exc)
+
+            response = view.finalize_response(drf_request, response, *args, **kwargs)
+        check_query_budget(f'{request.method} {request.path}', counter.count, view.get_query_budget())
+
+        if not isinstance(response, Response):
+            return response
+        # Rendered here: Django would render a Response in a thread.
+        response.render()
+        rendered = HttpResponse(response.content, status=response.status_code)
+        for header, value in response.items():
+            rendered[header] = value
+        if hasattr(response, 'compression_cache'):
+            rendered.compression_cache = response.compression_cache
+        return rendered
+
+    def check_request(self, view, request):
+        # The ORM's queries run on this thread too, so count them here.
+        install_query_counter()
+        view.perform_authentication(request)
+        view.check_permissions(request)
+        view.check_throttles(request)
+
+    async def fallback(self, request):
+        match = resolve(request.path_info, urlconf=settings.ROOT_URLCONF)
+        return await sync_to_async(match.func)(request, *match.args, **match.kwargs)
+
+
+class AsyncCatalogMiddleware:
+    """Resolve ASGI requests against store.async_urls."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if isinstance(request, ASGIRequest) and enabled():
+            request.urlconf = 'store.async_urls'
+        return await self.get_response(request)
@@ -0,0 +1,99 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+
+# The counters of the requests (or other blocks) the current context is in.
+# A context variable, so requests that share a thread and its connections,
+# as async requests do, each count only their own queries.
+_counters = ContextVar('query_counters', default=())
+
+
+def _count_query(execute, sql, params, many, context):
+    counters = _counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        for counter in counters:
+            counter.count += 1
+            counter.duration += duration
+
+
+def install_query_counter():
+    """Wrap this thread's connections with the query counter, once each."""
+    for connection in connections.all():
+        if _count_query not in connection.execute_wrappers:
+            # First in the list, so an execute_wrapper() block that was
+            # already open still removes its own wrapper on exit.
+            connection.execute_wrappers.insert(0, _count_query)
+
+
+@contextmanager
+def count_queries(counter):
+    """Add the queries run in this block, in this context, to `counter`."""
+    install_query_counter()
+    token = _counters.set(_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _counters.reset(token)
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of queries a view handler may run."""
+    def decorator(handler):
+        handler.query_budget = max_queries
+        return handler
+    return decorator
+
+
+def check_query_budget(label, count, budget):
+    if budget is None or count <= budget:
+        return
+    message = f'{label} ran {count} queries, budget is {budget}'
+    if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+        raise QueryBudgetExceeded(message)
+    if getattr(settings, 'QUERY_BUDGET_LOG', False):
+        logger.warning(message)
+
+
+class QueryBudgetMixin:
+    # Maps viewset actions to their query budget, e.g. {'list': 3}.
+    query_budgets = {}
+
+    def get_query_budget(self):
+        action = getattr(self, 'action', None)
+        if action is None:
+            return None
+        handler = getattr(self, action, None)
+        return getattr(handler, 'query_budget', self.query_budgets.get(action))
+
+    def dispatch(self, request, *args, **kwargs):
+        with count_queries(QueryCounter()) as counter:
+            response = super().dispatch(request, *args, **kwargs)
+
+        check_query_budget(
+            f'{request.method} {request.path}', counter.count, self.get_query_budget())
+        return response
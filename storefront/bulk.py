@@ -0,0 +1,223 @@
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from storefront import cache as catalog_cache, search
+from storefront.models import Collection, Product
+from storefront.serializers import ProductImportSerializer
+
+
+EXPORT_FIELDS = ['id', 'slug', 'title', 'description', 'price', 'inventory', 'collection']
+UPDATE_FIELDS = ['title', 'description', 'price', 'inventory', 'collection', 'last_update']
+
+
+def get_batch_size(batch_size=None):
+    return batch_size or getattr(settings, 'PRODUCT_IMPORT_BATCH_SIZE', 500)
+
+
+def _decode(lines):
+    for line in lines:
+        yield line.decode('utf-8') if isinstance(line, bytes) else line
+
+
+def parse_ndjson(lines):
+    """Yield (line number, row, error) for each non-blank line."""
+    for number, line in enumerate(_decode(lines), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield number, None, {'non_field_errors': [f'Invalid JSON: {error}']}
+            continue
+        if not isinstance(row, dict):
+            yield number, None, {'non_field_errors': ['Expected a JSON object.']}
+            continue
+        yield number, row, None
+
+
+def parse_csv(lines):
+    """Yield (line number, row, error) for each record after the header."""
+    reader = csv.DictReader(_decode(lines))
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield reader.line_num, None, {'non_field_errors': [f'Invalid CSV: {error}']}
+            continue
+        yield reader.line_num, row, None
+
+
+def recount_collections(collection_ids):
+    counts = (
+        Product.objects.filter(collection=OuterRef('pk')).order_by()
+        .values('collection').annotate(count=Count('id')).values('count')
+    )
+    Collection.objects.filter(pk__in=collection_ids).update(
+        products_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class ProductImporter:
+    """
+    Upsert products by slug from (line, row, error) tuples, `batch_size` rows
+    per transaction. Invalid rows are reported and skipped; they never abort
+    the rest of their batch.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = get_batch_size(batch_size)
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+
+    @property
+    def result(self):
+        return {'created': self.created, 'updated': self.updated, 'errors': self.errors}
+
+    def run(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        return self.result
+
+    def add_error(self, line, row, errors):
+        self.errors.append({'line': line, 'slug': (row or {}).get('slug'), 'errors': errors})
+
+    def validate(self, batch):
+        valid = {}
+        for line, row, error in batch:
+            if error is not None:
+                self.add_error(line, row, error)
+                continue
+            serializer = ProductImportSerializer(data=row)
+            if not serializer.is_valid():
+                self.add_error(line, row, serializer.errors)
+                continue
+            # A slug repeated within a batch can't be upserted twice in one
+            # statement; the later row wins, as it would across batches.
+            valid[serializer.validated_data['slug']] = (line, row, serializer.validated_data)
+
+        collection_ids = {data['collection_id'] for _, _, data in valid.values()}
+        known = set(Collection.objects.filter(pk__in=collection_ids).values_list('id', flat=True))
+        for slug, (line, row, data) in list(valid.items()):
+            if data['collection_id'] not in known:
+                self.add_error(line, row, {'collection': [f"Invalid pk \"{data['collection_id']}\" - object does not exist."]})
+                del valid[slug]
+        return [data for _, _, data in valid.values()]
+
+    def import_batch(self, batch):
+        rows = self.validate(batch)
+        if not rows:
+            return
+
+        slugs = [row['slug'] for row in rows]
+        with transaction.atomic():
+            previous = dict(Product.objects.filter(slug__in=slugs).values_list('slug', 'collection_id'))
+            options = {'update_conflicts': True, 'update_fields': UPDATE_FIELDS}
+            if connection.features.supports_update_conflicts_with_target:
+                options['unique_fields'] = ['slug']
+            Product.objects.bulk_create([Product(**row) for row in rows], **options)
+
+            # bulk_create skips the post_save handlers, so do their work per batch.
+            products = list(Product.objects.filter(slug__in=slugs).only('id', 'title', 'description'))
+            recount_collections({row['collection_id'] for row in rows} | set(previous.values()))
+            catalog_cache.invalidate_products([product.pk for product in products])
+            search.index_products(products)
+
+        self.updated += len(previous)
+        self.created += len(rows) - len(previous)
+
+
+def _export_rows(queryset, chunk_size):
+    # Walk the primary key rather than use iterator(): the MySQL driver
+    # buffers a whole result set client-side, so memory would grow with
+    # the catalog.
+    queryset = queryset.values_list(*EXPORT_FIELDS).order_by('pk')
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_id)[:chunk_size])
+        for row in rows:
+            yield dict(zip(EXPORT_FIELDS, row))
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, fieldnames):
+    writer = csv.DictWriter(_Echo(), fieldnames=fieldnames)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_ndjson(queryset, chunk_size=2000):
+    return ndjson_lines(_export_rows(queryset, chunk_size))
+
+
+def export_csv(queryset, chunk_size=2000):
+    return csv_lines(_export_rows(queryset, chunk_size), EXPORT_FIELDS)
+
+
+# Output column -> OrderItem lookup; one row per order line.
+ORDER_EXPORT_FIELDS = {
+    'order_id': 'order_id',
+    'placed_at': 'order__placed_at',
+    'payment_status': 'order__payment_status',
+    'customer_id': 'order__customer_id',
+    'item_id': 'id',
+    'product_id': 'product_id',
+    'product_title': 'product__title',
+    'quantity': 'quantity',
+    'unit_price': 'unit_price',
+}
+
+
+def order_rows(queryset, chunk_size=2000):
+    """Order lines joined to their order and product, in (order_id, id) order."""
+    # Walks the (order_id, id) key for the same reason as _export_rows().
+    columns = list(ORDER_EXPORT_FIELDS)
+    queryset = queryset.values_list(*ORDER_EXPORT_FIELDS.values()).order_by('order_id', 'id')
+    order_id = item_id = None
+    while True:
+        page = queryset
+        if order_id is not None:
+            page = page.filter(Q(order_id__gt=order_id) | Q(order_id=order_id, id__gt=item_id))
+        rows = list(page[:chunk_size])
+        for row in rows:
+            yield dict(zip(columns, row))
+        if len(rows) < chunk_size:
+            return
+        order_id, item_id = rows[-1][0], rows[-1][4]
+
+
+def export_orders(queryset, file_format, chunk_size=2000):
+    rows = order_rows(queryset, chunk_size)
+    if file_format == 'csv':
+        return csv_lines(rows, list(ORDER_EXPORT_FIELDS))
+    return ndjson_lines(rows)
+
+
+PARSERS = {'ndjson': parse_ndjson, 'csv': parse_csv}
+EXPORTERS = {'ndjson': export_ndjson, 'csv': export_csv}
+CONTENT_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
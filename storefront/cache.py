@@ -0,0 +1,195 @@
+import time
+from datetime import datetime, timezone
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from core import generations
+from rest_framework.response import Response
+
+
+PRODUCTS = 'products'
+COLLECTIONS = 'collections'
+PROMOTIONS = 'promotions'
+
+
+def product_scope(product_id):
+    return f'{PRODUCTS}:{product_id}'
+
+
+def _generation_key(scope):
+    return f'catalog:gen:{scope}'
+
+
+def _changed_key(scope):
+    return f'catalog:changed:{scope}'
+
+
+def get_generations(scopes):
+    return generations.get_generations([_generation_key(scope) for scope in scopes])
+
+
+async def aget_generations(scopes):
+    return await generations.aget_generations([_generation_key(scope) for scope in scopes])
+
+
+def _latest(timestamps):
+    return datetime.fromtimestamp(max(timestamps), tz=timezone.utc)
+
+
+def get_last_changed(scopes):
+    """Datetime of the latest bump of any of `scopes`."""
+    # A time missing from the cache is taken to be now, which is never
+    # earlier than the change it stands in for.
+    return _latest(generations.get_generations([_changed_key(scope) for scope in scopes], initial=time.time))
+
+
+async def aget_last_changed(scopes):
+    return _latest(await generations.aget_generations([_changed_key(scope) for scope in scopes], initial=time.time))
+
+
+def bump(*scopes):
+    def _bump():
+        for scope in scopes:
+            generations.bump_generation(_generation_key(scope))
+        now = time.time()
+        cache.set_many({_changed_key(scope): now for scope in scopes}, timeout=None)
+
+    transaction.on_commit(_bump)
+
+
+def invalidate_product(product_id):
+    bump(PRODUCTS, COLLECTIONS, product_scope(product_id))
+
+
+def invalidate_products(product_ids):
+    bump(PRODUCTS, COLLECTIONS, *[product_scope(product_id) for product_id in product_ids])
+
+
+def invalidate_collections():
+    bump(COLLECTIONS)
+
+
+def invalidate_promotions():
+    bump(PROMOTIONS)
+
+
+class CatalogCacheMixin:
+    cache_query_params = ['page', 'page_size', 'cursor', 'count', 'ordering']
+    cache_timeout = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 15)
+
+    def get_cache_scopes(self):
+        raise NotImplementedError('`get_cache_scopes()` must be implemented.')
+
+    def get_cache_key(self, request):
+        return self.build_cache_key(request, get_generations(self.get_cache_scopes()))
+
+    async def aget_cache_key(self, request):
+        return self.build_cache_key(request, await aget_generations(self.get_cache_scopes()))
+
+    def build_cache_key(self, request, generations):
+        params = sorted(
+            (name, ','.join(sorted(value.strip() for value in request.query_params.getlist(name))))
+            for name in self.cache_query_params if name in request.query_params
+        )
+        fingerprint = md5(repr((request.get_host(), request.path, params)).encode('utf-8')).hexdigest()
+        return 'catalog:{}:{}:{}'.format(
+            self.basename, ':'.join(str(generation) for generation in generations), fingerprint)
+
+    def get_cache_timeout(self):
+        return self.cache_timeout
+
+    def get_last_modified(self):
+        """Datetime of the latest change behind the response, or None."""
+        return None
+
+    async def aget_last_modified(self):
+        return None
+
+    def should_read_cache(self, request):
+        """Whether the request may be answered from a cached entry; it's cached afresh either way."""
+        return True
+
+    def get_etag(self, request, key):
+        # The key changes whenever a scope is bumped; the renderer is added
+        # so JSON and the browsable API don't share a strong ETag.
+        return quote_etag(md5(f'{key}:{request.accepted_renderer.format}'.encode('utf-8')).hexdigest())
+
+    def set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def set_compression_cache(self, request, response, key):
+        # The same data renders to the same bytes for a given media type, so
+        # CompressionMiddleware can keep compressed copies alongside the entry.
+        # The browsable API also renders the user and forms, so it can't.
+        # A response rendered in place of the cached entry replaces its
+        # compressed copies too.
+        if request.accepted_renderer.format != 'api':
+            response.compression_cache = (f'{key}:{request.accepted_media_type}', self.get_cache_timeout(),
+                                          not self.should_read_cache(request))
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        key = self.get_cache_key(request)
+        etag = self.get_etag(request, key)
+        entry = cache.get(key) if self.should_read_cache(request) else None
+        if entry is not None:
+            last_modified = entry['last_modified']
+        else:
+            last_modified = self.get_last_modified()
+            last_modified = last_modified and int(last_modified.timestamp())
+
+        conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if conditional is not None:
+            return self.set_validators(conditional, etag, last_modified)
+
+        if entry is not None:
+            response = Response(entry['data'])
+        else:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            cache.set(key, {'data': response.data, 'last_modified': last_modified}, self.get_cache_timeout())
+        self.set_compression_cache(request, response, key)
+        return self.set_validators(response, etag, last_modified)
+
+    async def acached_response(self, request, handler, *args, **kwargs):
+        key = await self.aget_cache_key(request)
+        etag = self.get_etag(request, key)
+        entry = await cache.aget(key) if self.should_read_cache(request) else None
+        if entry is not None:
+            last_modified = entry['last_modified']
+        else:
+            last_modified = await self.aget_last_modified()
+            last_modified = last_modified and int(last_modified.timestamp())
+
+        conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if conditional is not None:
+            return self.set_validators(conditional, etag, last_modified)
+
+        if entry is not None:
+            response = Response(entry['data'])
+        else:
+            response = await handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            await cache.aset(key, {'data': response.data, 'last_modified': last_modified}, self.get_cache_timeout())
+        self.set_compression_cache(request, response, key)
+        return self.set_validators(response, etag, last_modified)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(request, super().alist, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(request, super().aretrieve, *args, **kwargs)
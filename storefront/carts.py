@@ -0,0 +1,319 @@
+from datetime import datetime
+from functools import lru_cache
+from uuid import UUID, uuid4
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from storefront.models import Cart, CartItem, Product
+
+
+class UnknownProducts(Product.DoesNotExist):
+    """Raised by add_items, before any line is written, with the missing product ids."""
+
+    def __init__(self, product_ids):
+        super().__init__(product_ids)
+        self.product_ids = product_ids
+
+
+def _parse_cart_id(cart_id):
+    try:
+        return UUID(str(cart_id))
+    except ValueError:
+        return None
+
+
+class DatabaseCartBackend:
+    """Carts as Cart/CartItem rows."""
+
+    def create(self):
+        cart = Cart.objects.create()
+        # A new cart has no items; spare the serializer two queries finding that out.
+        cart._prefetched_objects_cache = {'items': CartItem.objects.none()}
+        return cart
+
+    def get(self, cart_id):
+        cart_id = _parse_cart_id(cart_id)
+        if cart_id is None:
+            return None
+        return Cart.objects.prefetch_related('items__product').filter(pk=cart_id).first()
+
+    def exists(self, cart_id):
+        return Cart.objects.filter(pk=cart_id).exists()
+
+    def delete(self, cart_id):
+        Cart.objects.filter(pk=cart_id).delete()
+
+    def items(self, cart_id):
+        cart_id = _parse_cart_id(cart_id)
+        if cart_id is None:
+            return CartItem.objects.none()
+        return CartItem.objects.select_related('cart', 'product').filter(cart_id=cart_id)
+
+    def get_item(self, cart_id, item_id):
+        return self.items(cart_id).filter(pk=item_id).first()
+
+    def _upsert(self, cart_id, quantities):
+        """
+        Write {product id: quantity} lines into the cart with one INSERT ... SELECT.
+        Joining the cart and product tables, and counting the products found,
+        writes nothing unless the cart and every product exist, so the
+        statement validates both without a lookup first.
+        Returns whether the lines were written and the id of the last item
+        written, which is only meaningful for a single line.
+        """
+        qn = connection.ops.quote_name
+        case = 'CASE p.id {} END'.format(' '.join(['WHEN %s THEN %s'] * len(quantities)))
+        ids = ', '.join(['%s'] * len(quantities))
+        product_table = qn(Product._meta.db_table)
+        sql = (
+            f'INSERT INTO {qn(CartItem._meta.db_table)} (cart_id, product_id, quantity) '
+            f'SELECT c.id, p.id, {case} FROM {qn(Cart._meta.db_table)} c, {product_table} p '
+            f'WHERE c.id = %s AND p.id IN ({ids}) '
+            f'AND (SELECT COUNT(*) FROM {product_table} WHERE id IN ({ids})) = %s '
+        )
+        params = [value for line in quantities.items() for value in line]
+        params += [Cart._meta.pk.get_db_prep_value(cart_id, connection), *quantities, *quantities, len(quantities)]
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute(sql + 'ON DUPLICATE KEY UPDATE quantity = VALUES(quantity), '
+                                     'id = LAST_INSERT_ID(id)', params)
+                return cursor.rowcount > 0, cursor.lastrowid
+            cursor.execute(sql + 'ON CONFLICT (cart_id, product_id) DO UPDATE '
+                                 'SET quantity = excluded.quantity RETURNING id', params)
+            rows = cursor.fetchall()
+            return bool(rows), rows[-1][0] if rows else None
+
+    def add_item(self, cart_id, product_id, quantity):
+        cart_id = _parse_cart_id(cart_id)
+        if cart_id is None:
+            raise Cart.DoesNotExist
+        written, item_id = self._upsert(cart_id, {product_id: quantity})
+        if not written:
+            if not Cart.objects.filter(pk=cart_id).exists():
+                raise Cart.DoesNotExist
+            raise Product.DoesNotExist
+        return CartItem(id=item_id, cart_id=cart_id, product_id=product_id, quantity=quantity)
+
+    def add_items(self, cart_id, quantities):
+        cart_id = _parse_cart_id(cart_id)
+        if cart_id is None:
+            raise Cart.DoesNotExist
+        written, _ = self._upsert(cart_id, quantities)
+        if not written:
+            # Either a product or the cart is missing; look for the products first.
+            found = set(Product.objects.filter(pk__in=quantities).values_list('pk', flat=True))
+            missing = [product_id for product_id in quantities if product_id not in found]
+            if missing:
+                raise UnknownProducts(missing)
+            raise Cart.DoesNotExist
+        items = {item.product_id: item for item in self.items(cart_id).filter(product_id__in=quantities)}
+        return [items[product_id] for product_id in quantities]
+
+    def update_item(self, item, quantity):
+        item.quantity = quantity
+        item.save()
+        return item
+
+    def remove_item(self, item):
+        item.delete()
+
+    def quantities(self, cart_id):
+        return dict(CartItem.objects.filter(cart_id=cart_id).values_list('product_id', 'quantity'))
+
+    def item_rows(self, cart_id):
+        """(item id, product id, title, price, quantity) rows, or None for an unknown cart."""
+        cart_id = _parse_cart_id(cart_id)
+        if cart_id is None:
+            return None
+        # LEFT JOIN from the cart: no rows means no cart, a row of NULLs an empty one.
+        rows = list(Cart.objects.filter(pk=cart_id).order_by('items__id').values_list(
+            'items__id', 'items__product_id', 'items__product__title', 'items__product__price', 'items__quantity'))
+        if not rows:
+            return None
+        return [row for row in rows if row[0] is not None]
+
+
+class RedisCartBackend:
+    """
+    Carts as Redis hashes on the django_redis connection, expiring after
+    CART_TTL seconds of inactivity. Rows only reach the database as
+    OrderItems at checkout.
+
+    Each cart is one hash: `placed_at`, `i:<item id>` -> "<product id>:<quantity>"
+    and `p:<product id>` -> item id, so adds can upsert by product.
+    """
+    key_prefix = 'cart:'
+    sequence_key = 'cart:item-seq'
+
+    ADD_ITEM = """
+        if redis.call('EXISTS', KEYS[1]) == 0 then return false end
+        local item = redis.call('HGET', KEYS[1], 'p:' .. ARGV[1])
+        if not item then
+            item = redis.call('INCR', KEYS[2])
+            redis.call('HSET', KEYS[1], 'p:' .. ARGV[1], item)
+        end
+        redis.call('HSET', KEYS[1], 'i:' .. item, ARGV[1] .. ':' .. ARGV[2])
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+        return item
+    """
+    UPDATE_ITEM = """
+        local value = redis.call('HGET', KEYS[1], 'i:' .. ARGV[1])
+        if not value then return false end
+        local product = string.match(value, '^(%d+):')
+        redis.call('HSET', KEYS[1], 'i:' .. ARGV[1], product .. ':' .. ARGV[2])
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+        return product
+    """
+    REMOVE_ITEM = """
+        local value = redis.call('HGET', KEYS[1], 'i:' .. ARGV[1])
+        if not value then return 0 end
+        local product = string.match(value, '^(%d+):')
+        redis.call('HDEL', KEYS[1], 'i:' .. ARGV[1], 'p:' .. product)
+        return 1
+    """
+
+    def __init__(self, client=None):
+        if client is None:
+            from django_redis import get_redis_connection
+            client = get_redis_connection(getattr(settings, 'CART_REDIS_CACHE', 'default'))
+        self.client = client
+        self.ttl = getattr(settings, 'CART_TTL', 60 * 60 * 24 * 7)
+        self._add_item = client.register_script(self.ADD_ITEM)
+        self._update_item = client.register_script(self.UPDATE_ITEM)
+        self._remove_item = client.register_script(self.REMOVE_ITEM)
+
+    def _key(self, cart_id):
+        return f'{self.key_prefix}{_parse_cart_id(cart_id)}'
+
+    def _load(self, cart_id):
+        cart_id = _parse_cart_id(cart_id)
+        if cart_id is None:
+            return None, {}
+        fields = self.client.hgetall(self._key(cart_id))
+        if not fields:
+            return None, {}
+        fields = {key.decode(): value.decode() for key, value in fields.items()}
+        cart = Cart(id=cart_id, placed_at=datetime.fromisoformat(fields['placed_at']))
+        lines = {}
+        for key, value in fields.items():
+            if key.startswith('i:'):
+                product_id, quantity = value.split(':')
+                lines[int(key[2:])] = (int(product_id), int(quantity))
+        return cart, lines
+
+    def _build_items(self, cart, lines):
+        products = Product.objects.only('id', 'title', 'price').in_bulk(
+            {product_id for product_id, _ in lines.values()})
+        items = [
+            CartItem(id=item_id, cart=cart, product=products[product_id], quantity=quantity)
+            for item_id, (product_id, quantity) in sorted(lines.items())
+            # Products deleted since they were added disappear, as with ON DELETE CASCADE.
+            if product_id in products
+        ]
+        cart._prefetched_objects_cache = {'items': items}
+        return items
+
+    def create(self):
+        cart = Cart(id=uuid4(), placed_at=timezone.now())
+        key = self._key(cart.id)
+        self.client.pipeline().hset(key, 'placed_at', cart.placed_at.isoformat()).expire(key, self.ttl).execute()
+        cart._prefetched_objects_cache = {'items': []}
+        return cart
+
+    def get(self, cart_id):
+        cart, lines = self._load(cart_id)
+        if cart is not None:
+            self._build_items(cart, lines)
+        return cart
+
+    def exists(self, cart_id):
+        return bool(self.client.exists(self._key(cart_id)))
+
+    def delete(self, cart_id):
+        # Checkout deletes the cart inside its DB transaction; don't lose it on rollback.
+        key = self._key(cart_id)
+        transaction.on_commit(lambda: self.client.delete(key))
+
+    def items(self, cart_id):
+        cart, lines = self._load(cart_id)
+        if cart is None:
+            return []
+        return self._build_items(cart, lines)
+
+    def get_item(self, cart_id, item_id):
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            return None
+        return next((item for item in self.items(cart_id) if item.id == item_id), None)
+
+    def add_item(self, cart_id, product_id, quantity):
+        product = Product.objects.only('id', 'title', 'price').filter(pk=product_id).first()
+        if product is None:
+            raise Product.DoesNotExist
+        item_id = self._add_item(keys=[self._key(cart_id), self.sequence_key],
+                                 args=[product_id, quantity, self.ttl])
+        if item_id is None:
+            raise Cart.DoesNotExist
+        return CartItem(id=int(item_id), cart_id=_parse_cart_id(cart_id), product=product, quantity=quantity)
+
+    def add_items(self, cart_id, quantities):
+        products = Product.objects.only('id', 'title', 'price').in_bulk(list(quantities))
+        missing = [product_id for product_id in quantities if product_id not in products]
+        if missing:
+            raise UnknownProducts(missing)
+        lines = list(quantities.items())
+
+        pipeline = self.client.pipeline()
+        for product_id, quantity in lines:
+            self._add_item(keys=[self._key(cart_id), self.sequence_key],
+                           args=[product_id, quantity, self.ttl], client=pipeline)
+        item_ids = pipeline.execute()
+        if None in item_ids:
+            raise Cart.DoesNotExist
+        return [
+            CartItem(id=int(item_id), cart_id=_parse_cart_id(cart_id), product=products[product_id], quantity=quantity)
+            for item_id, (product_id, quantity) in zip(item_ids, lines)
+        ]
+
+    def update_item(self, item, quantity):
+        self._update_item(keys=[self._key(item.cart_id)], args=[item.id, quantity, self.ttl])
+        item.quantity = quantity
+        return item
+
+    def remove_item(self, item):
+        self._remove_item(keys=[self._key(item.cart_id)], args=[item.id])
+
+    def quantities(self, cart_id):
+        _, lines = self._load(cart_id)
+        return {product_id: quantity for product_id, quantity in lines.values()}
+
+    def item_rows(self, cart_id):
+        cart, lines = self._load(cart_id)
+        if cart is None:
+            return None
+        products = {
+            product_id: (title, price) for product_id, title, price in Product.objects.filter(
+                pk__in={product_id for product_id, _ in lines.values()}).values_list('id', 'title', 'price')
+        }
+        return [
+            (item_id, product_id, *products[product_id], quantity)
+            for item_id, (product_id, quantity) in sorted(lines.items())
+            if product_id in products
+        ]
+
+
+@lru_cache(maxsize=None)
+def get_cart_backend():
+    return import_string(getattr(settings, 'CART_BACKEND', 'storefront.carts.DatabaseCartBackend'))()
+
+
+@receiver(setting_changed)
+def reset_cart_backend(setting, **kwargs):
+    if setting in ('CART_BACKEND', 'CART_REDIS_CACHE', 'CART_TTL'):
+        get_cart_backend.cache_clear()
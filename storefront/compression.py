@@ -0,0 +1,232 @@
+import zlib
+from hashlib import md5
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml',
+                      'application/x-ndjson', 'application/msgpack', 'image/svg+xml')
+
+
+class Gzip:
+    encoding = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compressobj(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        compressor = self.compressobj()
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self):
+        compressor = self.compressobj()
+        return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+class Brotli:
+    encoding = 'br'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+
+
+class Zstd:
+    encoding = 'zstd'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return zstandard.ZstdCompressor(level=self.level).compress(data)
+
+    def stream(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return (lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)), \
+            compressor.flush
+
+
+def get_codecs(stored=False):
+    """
+    Available codecs by preference. Stored bodies are compressed once and
+    served many times, so they get a slower, denser level.
+    """
+    codecs = []
+    if zstandard is not None:
+        codecs.append(Zstd(12 if stored else 3))
+    if brotli is not None:
+        codecs.append(Brotli(9 if stored else 5))
+    codecs.append(Gzip(9 if stored else 6))
+    return codecs
+
+
+def negotiate(accept_encoding, codecs):
+    """The codec with the highest `q` in Accept-Encoding; ties go to the earlier codec."""
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0
+    for codec in codecs:
+        weight = weights.get(codec.encoding, weights.get('*', 0))
+        if weight > best_weight:
+            best, best_weight = codec, weight
+    return best
+
+
+def get_min_size():
+    return getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+
+def is_compressible(response):
+    if response.has_header('Content-Encoding') or response.status_code < 200 or response.status_code in (204, 304):
+        return False
+    return response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+
+
+def _stored_key(compression_key, encoding):
+    return f'compressed:{md5(compression_key.encode("utf-8")).hexdigest()}:{encoding}'
+
+
+def compress_stream(codec, chunks):
+    write, finish = codec.stream()
+    for chunk in chunks:
+        data = write(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(codec, chunks):
+    write, finish = codec.stream()
+    async for chunk in chunks:
+        data = write(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies of at least COMPRESSION_MIN_SIZE bytes with the
+    best of zstd, br and gzip that the client accepts (zstd and br need the
+    zstandard and brotli packages). Streaming responses are compressed chunk
+    by chunk.
+
+    A response with `compression_cache = (key, timeout, refresh)` (see
+    CatalogCacheMixin) always renders the same body for the same key, so its
+    compressed variants are cached under that key and reused; with `refresh`
+    the stored variant is replaced rather than read.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        codec = self.get_codec(request, response)
+        if codec is None:
+            return response
+        if response.streaming:
+            return self.compress_streaming(codec, response)
+
+        stored = getattr(response, 'compression_cache', None)
+        if stored is None:
+            return self.set_content(codec, response, codec.compress(response.content))
+        key, timeout, refresh = stored
+        key = _stored_key(key, codec.encoding)
+        content = None if refresh else cache.get(key)
+        if content is None:
+            content = codec.compress(response.content)
+            cache.set(key, content, timeout)
+        return self.set_content(codec, response, content)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        codec = self.get_codec(request, response)
+        if codec is None:
+            return response
+        if response.streaming:
+            return self.compress_streaming(codec, response)
+
+        stored = getattr(response, 'compression_cache', None)
+        if stored is None:
+            return self.set_content(codec, response, codec.compress(response.content))
+        key, timeout, refresh = stored
+        key = _stored_key(key, codec.encoding)
+        content = None if refresh else await cache.aget(key)
+        if content is None:
+            content = codec.compress(response.content)
+            await cache.aset(key, content, timeout)
+        return self.set_content(codec, response, content)
+
+    def get_codec(self, request, response):
+        if not is_compressible(response):
+            return None
+        if not response.streaming and len(response.content) < get_min_size():
+            return None
+        # Whether or not this client gets a compressed body, caches must
+        # key on the header.
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''), get_codecs(
+            stored=not response.streaming and hasattr(response, 'compression_cache')))
+
+    def set_content(self, codec, response, content):
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        return self.set_encoding(codec, response)
+
+    def compress_streaming(self, codec, response):
+        if response.is_async:
+            response.streaming_content = acompress_stream(codec, response.streaming_content)
+        else:
+            response.streaming_content = compress_stream(codec, response.streaming_content)
+        del response['Content-Length']
+        return self.set_encoding(codec, response)
+
+    def set_encoding(self, codec, response):
+        # The encoded body is a different representation: a strong ETag
+        # must not match the identity one (as GZipMiddleware does).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = codec.encoding
+        return response
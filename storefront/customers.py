@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from storefront.models import Customer
+
+
+def _cache_key(user_id):
+    return f'customer:user:{user_id}'
+
+
+def load_customer(user_id):
+    key = _cache_key(user_id)
+    customer = cache.get(key)
+    if customer is None:
+        customer = Customer.objects.get(user_id=user_id)
+        cache.set(key, customer, timeout=getattr(settings, 'CUSTOMER_CACHE_TIMEOUT', 60 * 60))
+    return customer
+
+
+def get_customer(request):
+    """The requesting user's Customer: memoized on the request, cached across requests."""
+    if not hasattr(request, '_customer'):
+        request._customer = load_customer(request.user.id)
+    return request._customer
+
+
+def get_customer_id(request):
+    # Claims-authenticated users carry it in their token.
+    customer_id = getattr(request.user, 'customer_id', None)
+    if customer_id is None:
+        customer_id = get_customer(request).pk
+    return customer_id
+
+
+def invalidate(user_id):
+    transaction.on_commit(lambda: cache.delete(_cache_key(user_id)))
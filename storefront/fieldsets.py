@@ -0,0 +1,71 @@
+from collections import namedtuple
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+Fieldset = namedtuple('Fieldset', ['fields', 'expand'])
+
+
+def _split(value):
+    return [name.strip() for name in value.split(',') if name.strip()] if value else []
+
+
+class ExpandableFieldsMixin:
+    """
+    Serializer side of SparseFieldsMixin: renders context['fieldset'] when
+    present. `expandable` maps a field name to a factory for its expanded
+    form, which replaces (or, for a field not in Meta.fields, adds) it.
+    """
+    expandable = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        if fieldset is None:
+            return fields
+        for name in fieldset.expand:
+            fields[name] = self.expandable[name]()
+        return {name: fields[name] for name in fieldset.fields}
+
+
+class SparseFieldsMixin:
+    """
+    `?fields=title,price` limits a read to those fields and `?expand=collection`
+    swaps in the expanded form of one of the serializer's `expandable` fields,
+    including it whether or not it was listed. get_queryset() should fetch
+    only the columns and relations get_fieldset() asks for.
+    """
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def get_fieldset(self):
+        serializer_class = self.get_serializer_class()
+        default = list(serializer_class.Meta.fields)
+        if self.request.method not in SAFE_METHODS:
+            return Fieldset(default, [])
+
+        expandable = serializer_class.expandable
+        available = default + [name for name in expandable if name not in default]
+        requested = _split(self.request.query_params.get(self.fields_query_param))
+        expand = _split(self.request.query_params.get(self.expand_query_param))
+
+        errors = {}
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            errors[self.fields_query_param] = [
+                f'Unknown fields: {", ".join(unknown)}. Must be among: {", ".join(available)}.']
+        unknown = [name for name in expand if name not in expandable]
+        if unknown:
+            errors[self.expand_query_param] = [
+                f'Unknown fields: {", ".join(unknown)}. Must be among: {", ".join(expandable)}.']
+        if errors:
+            raise ValidationError(errors)
+
+        return Fieldset(
+            [name for name in available if name in (requested or default) or name in expand],
+            [name for name in expandable if name in expand],
+        )
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'fieldset': self.get_fieldset()}
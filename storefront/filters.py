@@ -1,5 +1,7 @@
-from django_filters.rest_framework import FilterSet
-from .models import Product
+from django_filters.rest_framework import ChoiceFilter, DateTimeFilter, FilterSet
+from rest_framework.filters import OrderingFilter, SearchFilter
+from . import search
+from .models import Order, OrderItem, Product
 
 
 class ProductFilter(FilterSet):
@@ -10,3 +12,33 @@ class ProductFilter(FilterSet):
             'collection_id': ['exact'],
             'price': ['gte', 'lte']
         }
+
+
+class OrderExportFilter(FilterSet):
+    placed_after = DateTimeFilter(field_name='order__placed_at', lookup_expr='gte')
+    placed_before = DateTimeFilter(field_name='order__placed_at', lookup_expr='lt')
+    payment_status = ChoiceFilter(field_name='order__payment_status', choices=Order.Status.choices)
+
+    class Meta:
+        model = OrderItem
+        fields = []
+
+
+class ProductSearchFilter(SearchFilter):
+    backend_param = 'search_backend'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        backend = search.get_backend(request.query_params.get(self.backend_param))
+        return backend.search(queryset, terms)
+
+
+class ProductOrderingFilter(OrderingFilter):
+
+    def get_default_ordering(self, view):
+        # Searches default to relevance; every search backend annotates `search_rank`.
+        if ProductSearchFilter().get_search_terms(view.request):
+            return ['-search_rank', 'title']
+        return super().get_default_ordering(view)
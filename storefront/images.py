@@ -0,0 +1,146 @@
+import logging
+import posixpath
+import threading
+from functools import partial
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.utils import timezone
+from PIL import Image, ImageOps
+from storefront import cache as catalog_cache, workers
+
+
+logger = logging.getLogger(__name__)
+
+# name -> (width, height, crop). Cropped variants are filled to exactly that
+# size; the others are scaled down to fit within it.
+VARIANTS = {
+    'thumbnail': (100, 100, True),
+    'listing': (400, 400, False),
+    'detail': (1200, 1200, False),
+}
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+DEFAULT_FORMAT = 'webp'
+VARIANT_DIR = 'storefront/images/variants'
+
+
+def variant_path(image_id, name, file_format):
+    return posixpath.join(VARIANT_DIR, str(image_id), f'{name}.{file_format}')
+
+
+def render_variants(image_id, name):
+    """
+    Write every size/format variant of an uploaded image to storage and return
+    the `ProductImage.variants` mapping. Runs in pool processes, so it only
+    touches storage, never the database.
+    """
+    with default_storage.open(name) as file, Image.open(file) as original:
+        original = ImageOps.exif_transpose(original)
+        variants = {}
+        for variant, (width, height, crop) in VARIANTS.items():
+            if crop:
+                resized = ImageOps.fit(original, (width, height), Image.LANCZOS)
+            else:
+                resized = original.copy()
+                resized.thumbnail((width, height), Image.LANCZOS)
+            variants[variant] = {'width': resized.width, 'height': resized.height}
+
+            for file_format, (pil_format, options) in FORMATS.items():
+                # JPEG has no alpha channel; WebP keeps it.
+                mode = 'RGBA' if pil_format == 'WEBP' and resized.mode in ('RGBA', 'LA', 'P') else 'RGB'
+                buffer = BytesIO()
+                resized.convert(mode).save(buffer, pil_format, **options)
+                path = variant_path(image_id, variant, file_format)
+                default_storage.delete(path)
+                variants[variant][file_format] = default_storage.save(path, ContentFile(buffer.getvalue()))
+        return variants
+
+
+def delete_variants(variants):
+    for variant in variants.values():
+        for file_format in FORMATS:
+            if file_format in variant:
+                default_storage.delete(variant[file_format])
+
+
+def save_variants(image_id, product_id, variants):
+    from storefront.models import Product, ProductImage
+    # update() rather than save() so the post_save handler doesn't reschedule us.
+    ProductImage.objects.filter(pk=image_id).update(variants=variants)
+    Product.objects.filter(pk=product_id).update(last_update=timezone.now())
+    catalog_cache.invalidate_product(product_id)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(max_workers=None):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = workers.process_pool(max_workers or getattr(settings, 'PRODUCT_IMAGE_WORKERS', 2))
+        return _executor
+
+
+def _finish(image_id, product_id, future):
+    try:
+        save_variants(image_id, product_id, future.result())
+    except Exception:
+        logger.exception('Could not generate variants for product image %s', image_id)
+    finally:
+        # Done callbacks run on the executor's thread, which has its own connection.
+        connections.close_all()
+
+
+def schedule(image):
+    """Generate variants for a saved ProductImage in the background."""
+    if not image.image.name:
+        return
+    if not getattr(settings, 'PRODUCT_IMAGE_WORKERS', 2):
+        save_variants(image.pk, image.product_id, render_variants(image.pk, image.image.name))
+        return
+    future = get_executor().submit(render_variants, image.pk, image.image.name)
+    future.add_done_callback(partial(_finish, image.pk, image.product_id))
+
+
+def variant_url(name, variants, size, file_format=None):
+    """URL of a variant, or of the original until the variant has been generated."""
+    path = (variants or {}).get(size, {}).get(file_format or DEFAULT_FORMAT)
+    if path:
+        return default_storage.url(path)
+    return default_storage.url(name) if name else None
+
+
+def _absolute(url, request):
+    if url is None or request is None:
+        return url
+    return request.build_absolute_uri(url)
+
+
+def variant_urls(name, variants, request=None):
+    return {
+        size: {file_format: _absolute(variant_url(name, variants, size, file_format), request)
+               for file_format in FORMATS}
+        for size in VARIANTS
+    }
+
+
+def requested_url(name, variants, request):
+    """
+    URL of the variant picked with ?image_size= (and ?image_format=), or
+    None when the request doesn't pick one.
+    """
+    size = request.query_params.get('image_size') if request is not None else None
+    if size not in VARIANTS:
+        return None
+    file_format = request.query_params.get('image_format')
+    if file_format not in FORMATS:
+        file_format = DEFAULT_FORMAT
+    return _absolute(variant_url(name, variants, size, file_format), request)
@@ -0,0 +1,58 @@
+from functools import reduce
+from operator import or_
+
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+from storefront import cache as catalog_cache
+from storefront.models import Product
+
+
+class InsufficientStock(Exception):
+
+    def __init__(self, shortages):
+        super().__init__('Insufficient stock')
+        self.shortages = shortages
+
+
+def reserve(quantities):
+    """
+    Take `quantities` ({product_id: quantity}) out of stock.
+
+    Must run inside transaction.atomic(). The product rows are locked in id
+    order so concurrent checkouts on overlapping carts can't deadlock, then
+    every line is decremented with one conditional UPDATE. Returns the locked
+    products by id; raises InsufficientStock listing every short line.
+    """
+    products = Product.objects.select_for_update().filter(
+        pk__in=quantities).order_by('pk').only('id', 'price', 'inventory')
+    products = {product.pk: product for product in products}
+
+    shortages = [
+        {
+            'product_id': product_id,
+            'requested': quantity,
+            'available': products[product_id].inventory if product_id in products else 0,
+        }
+        for product_id, quantity in sorted(quantities.items())
+        if product_id not in products or products[product_id].inventory < quantity
+    ]
+    if shortages:
+        raise InsufficientStock(shortages)
+
+    condition = reduce(or_, [Q(pk=product_id, inventory__gte=quantity)
+                             for product_id, quantity in quantities.items()])
+    updated = Product.objects.filter(condition).update(
+        inventory=Case(*[When(pk=product_id, then=F('inventory') - quantity)
+                         for product_id, quantity in quantities.items()]),
+        last_update=timezone.now(),
+    )
+    if updated != len(quantities):
+        # Only reachable without row locks (e.g. SQLite); report current stock.
+        raise InsufficientStock([
+            {'product_id': product.pk, 'requested': quantities[product.pk], 'available': product.inventory}
+            for product in Product.objects.filter(pk__in=quantities).order_by('pk')
+            if product.inventory < quantities[product.pk]
+        ])
+
+    catalog_cache.invalidate_products(list(quantities))
+    return products
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from storefront.models import Collection, Product
+
+
+class Command(BaseCommand):
+    help = ('Compare catalog throughput of the WSGI handler (DRF viewsets, one thread per connection) and the '
+            'ASGI handler (async catalog views) in-process, at the same concurrency, with the request mix of '
+            'locustfiles/browse_products.py. For a full-stack comparison run that locustfile against gunicorn '
+            'store.wsgi and uvicorn store.asgi:application.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--manifest', default=str(Path(settings.BASE_DIR) / 'locustfiles' / 'seed.json'),
+                            help='Written by `manage.py seed`; without it ids are read from the database.')
+        parser.add_argument('--no-cache', action='store_true', help='Bypass the catalog cache.')
+
+    def handle(self, *args, **options):
+        collections, products = self.get_ids(options['manifest'])
+        if not products:
+            raise CommandError('No products to browse; run `manage.py seed` first.')
+        rng = random.Random(0)
+        # browse_products.py: 2 collection listings : 4 product pages (the cart
+        # task is a write, which both handlers serve with the same viewset).
+        paths = [
+            f'/storefront/products/?collection_id={rng.choice(collections)}' if rng.random() < 1 / 3
+            else f'/storefront/products/{rng.choice(products)}/'
+            for _ in range(options['requests'])
+        ]
+
+        no_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), \
+                override_settings(CACHES=no_cache) if options['no_cache'] else nullcontext():
+            for name, run in (('wsgi', self.run_wsgi), ('asgi', self.run_asgi)):
+                run(paths[:options['concurrency']], options['concurrency'])  # warm up
+                start = time.perf_counter()
+                timings = run(paths, options['concurrency'])
+                elapsed = time.perf_counter() - start
+                timings.sort()
+                self.stdout.write(
+                    f'{name}  {len(paths) / elapsed:8.1f} req/s  '
+                    f'p50={statistics.median(timings) * 1000:7.2f}ms  '
+                    f'p95={timings[int(len(timings) * 0.95) - 1] * 1000:7.2f}ms')
+
+    def get_ids(self, manifest):
+        path = Path(manifest)
+        if path.exists():
+            ranges = json.loads(path.read_text())['ranges']
+            if ranges['collections'] and ranges['products']:
+                return (list(range(ranges['collections'][0], ranges['collections'][1] + 1)),
+                        list(range(ranges['products'][0], ranges['products'][1] + 1)))
+        return (list(Collection.objects.values_list('id', flat=True)),
+                list(Product.objects.values_list('id', flat=True)[:10000]))
+
+    def run_wsgi(self, paths, concurrency):
+        def fetch(path):
+            start = time.perf_counter()
+            response = Client().get(path)
+            assert response.status_code < 500, response.status_code
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(fetch, paths))
+
+    def run_asgi(self, paths, concurrency):
+        async def fetch(client, semaphore, path):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                assert response.status_code < 500, response.status_code
+                return time.perf_counter() - start
+
+        async def main():
+            semaphore = asyncio.Semaphore(concurrency)
+            client = AsyncClient()
+            return await asyncio.gather(*(fetch(client, semaphore, path) for path in paths))
+
+        return list(asyncio.run(main()))
@@ -0,0 +1,76 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from rest_framework.exceptions import ValidationError
+from storefront.models import Cart, CartItem, Collection, Customer, Order, OrderItem, Product
+from storefront.serializers import CreateOrderSerializer
+
+
+class Command(BaseCommand):
+    help = 'Run concurrent checkouts against one contended product and report throughput.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkouts', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--inventory', type=int, default=400,
+                            help='Starting stock; keep it below --checkouts to exercise shortages.')
+        parser.add_argument('--quantity', type=int, default=1)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stderr.write('SQLite serializes all writers; run this against MySQL for meaningful numbers.')
+
+        collection = Collection.objects.create(title='checkout benchmark')
+        product = Product.objects.create(
+            title='checkout benchmark', slug=f'checkout-benchmark-{uuid4().hex[:8]}', price=10,
+            inventory=options['inventory'], collection=collection)
+        User = get_user_model()
+        tag = uuid4().hex[:8]
+        users = [User.objects.create(username=f'bench-{tag}-{index}', email=f'bench-{tag}-{index}@example.com')
+                 for index in range(options['workers'])]
+        carts = []
+        for index in range(options['checkouts']):
+            cart = Cart.objects.create()
+            CartItem.objects.create(cart=cart, product=product, quantity=options['quantity'])
+            carts.append((users[index % len(users)].pk, cart.pk))
+
+        def checkout(job):
+            user_id, cart_id = job
+            try:
+                serializer = CreateOrderSerializer(data={'cart_id': cart_id}, context={'user_id': user_id})
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+                return True
+            except ValidationError:
+                return False
+            finally:
+                connections.close_all()
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+                results = list(executor.map(checkout, carts))
+            elapsed = time.perf_counter() - start
+
+            succeeded = sum(results)
+            product.refresh_from_db()
+            expected = options['inventory'] - succeeded * options['quantity']
+            self.stdout.write(f'{len(results)} checkouts in {elapsed:.2f}s '
+                              f'({len(results) / elapsed:.1f}/s), {succeeded} succeeded, '
+                              f'{len(results) - succeeded} rejected for stock')
+            self.stdout.write(f'final inventory {product.inventory}, expected {expected}')
+            if product.inventory != expected or product.inventory < 0:
+                self.stderr.write(self.style.ERROR('Inventory does not add up: oversold!'))
+        finally:
+            orders = Order.objects.filter(customer__user__in=users)
+            OrderItem.objects.filter(order__in=orders).delete()
+            orders.delete()
+            Cart.objects.filter(pk__in=[cart_id for _, cart_id in carts]).delete()
+            Customer.objects.filter(user__in=users).delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            product.delete()
+            collection.delete()
@@ -0,0 +1,92 @@
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from storefront import renderers
+
+
+def product_list(count):
+    return {
+        'next': 'http://localhost/storefront/products/?cursor=eyJwIjpbIk11ZyIsIDQyXX0%3D',
+        'previous': None,
+        'results': [
+            {
+                'id': index, 'title': f'Product {index}', 'slug': f'product-{index}',
+                'description': 'A sturdy stoneware product, dishwasher safe. ' * 3,
+                'inventory': index % 100, 'price': Decimal(f'{10 + index % 90}.99'),
+                'images': [{'image': f'http://localhost/media/storefront/images/{index}.jpg', 'variants': {
+                    size: {fmt: f'http://localhost/media/storefront/images/variants/{index}/{size}.{fmt}'
+                           for fmt in ('webp', 'jpeg')} for size in ('thumbnail', 'listing', 'detail')}}],
+                'collection': index % 10,
+            }
+            for index in range(count)
+        ],
+    }
+
+
+def cart_detail(count):
+    cart_id = uuid4()
+    items = [
+        {'id': index, 'cart': cart_id, 'product': {'id': index, 'title': f'Product {index}', 'price': Decimal('19.99')},
+         'quantity': 2, 'total_price': Decimal('39.98')}
+        for index in range(count)
+    ]
+    return {'id': str(cart_id), 'items': items, 'total_price': sum(item['total_price'] for item in items)}
+
+
+def order_list(count):
+    now = timezone.now()
+    return {
+        'next': None,
+        'previous': None,
+        'results': [
+            {'id': index, 'placed_at': now - timedelta(minutes=index), 'payment_status': 'C', 'customer_id': index,
+             'items': [{'id': index * 3 + line, 'quantity': 1, 'unit_price': Decimal('9.50'),
+                        'product': {'id': line, 'title': f'Product {line}', 'description': 'Stoneware.',
+                                    'price': Decimal('9.50'), 'collection': 1}} for line in range(3)]}
+            for index in range(count)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare render/parse time of the stdlib JSON, orjson and MessagePack renderers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100, help='Products, cart items or orders per payload.')
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        payloads = {
+            'product list': product_list(options['count']),
+            'cart detail': cart_detail(options['count']),
+            'order list': order_list(options['count']),
+        }
+        codecs = [('json', JSONRenderer(), JSONParser()),
+                  ('orjson', renderers.ORJSONRenderer(), renderers.ORJSONParser())]
+        if renderers.msgpack is not None:
+            codecs.append(('msgpack', renderers.MessagePackRenderer(), renderers.MessagePackParser()))
+
+        for name, payload in payloads.items():
+            self.stdout.write(name)
+            for codec, renderer, parser in codecs:
+                body = renderer.render(payload)
+                render = self.measure(lambda: renderer.render(payload), options['repeat'])
+                parse = self.measure(lambda: parser.parse(BytesIO(body)), options['repeat'])
+                self.stdout.write(f'  {codec:<8} render={render:9.1f}us  parse={parse:9.1f}us  size={len(body):8} bytes')
+
+    def measure(self, func, repeat):
+        func()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1_000_000
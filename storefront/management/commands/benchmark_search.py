@@ -0,0 +1,82 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from storefront import cache as catalog_cache, search
+from storefront.models import Collection, Product
+
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ren', 'tas', 'vo', 'pel', 'dun', 'sha', 'rik', 'bel', 'tor',
+             'nu', 'fa', 'gre', 'sol', 'qui', 'ma', 'zen', 'hal']
+# Two- and three-syllable pseudo words give a vocabulary of ~8400 terms, which is
+# closer to a real catalogue than a handful of very common words.
+WORDS = [a + b for a in SYLLABLES for b in SYLLABLES] + \
+    [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+
+
+class Command(BaseCommand):
+    help = 'Compare product search latency of the icontains filter against the search backend.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--queries', nargs='+', default=['kalo', 'mi', 'renvo tas'])
+        parser.add_argument('--backend', default=None,
+                            help='Backend to compare against "like" (defaults to PRODUCT_SEARCH_BACKEND).')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        candidate = options['backend'] or search.get_default_backend_name()
+        collection = Collection.objects.create(title='search benchmark')
+        rng = random.Random(42)
+        try:
+            created = 0
+            for size in sorted(options['sizes']):
+                created = self.fill(collection, rng, created, size, options['batch_size'])
+                search.BACKENDS['index'].reset()
+                self.stdout.write(f'{size} products')
+                for name in ['like', candidate]:
+                    backend = search.get_backend(name)
+                    for query in options['queries']:
+                        timings = self.measure(backend, collection, query, options['repeat'])
+                        self.stdout.write('  {:<9} {:<20} p50={:8.2f}ms p95={:8.2f}ms'.format(
+                            name, query, statistics.median(timings),
+                            statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]))
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM {} WHERE collection_id = %s'.format(
+                    connection.ops.quote_name(Product._meta.db_table)), [collection.pk])
+            collection.delete()
+            search.BACKENDS['index'].reset()
+            catalog_cache.bump(catalog_cache.PRODUCTS, catalog_cache.COLLECTIONS)
+
+    def fill(self, collection, rng, created, size, batch_size):
+        while created < size:
+            batch = []
+            for index in range(created, min(size, created + batch_size)):
+                title = ' '.join(rng.sample(WORDS, 3))
+                batch.append(Product(
+                    title=title,
+                    slug=f'search-benchmark-{index}',
+                    description=' '.join(rng.choices(WORDS, k=12)),
+                    price=rng.randint(1, 999),
+                    inventory=rng.randint(0, 100),
+                    collection=collection,
+                ))
+            Product.objects.bulk_create(batch)
+            created += len(batch)
+        return created
+
+    def measure(self, backend, collection, query, repeat):
+        terms = query.split()
+        queryset = Product.objects.filter(collection=collection)
+        # The first run also pays for building the in-process index; keep it out.
+        list(backend.search(queryset, terms).order_by('-search_rank', 'title', 'id')[:20])
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(backend.search(queryset, terms).order_by('-search_rank', 'title', 'id')[:20])
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
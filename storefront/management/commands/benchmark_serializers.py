@@ -0,0 +1,78 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from storefront import cache as catalog_cache, readers
+from storefront.models import Collection, Product, ProductImage
+from storefront.serializers import ProductSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare per-product cost of ProductSerializer against the .values() reader.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', nargs='+', type=int, default=[20, 100, 1000])
+        parser.add_argument('--images', type=int, default=2, help='Images per product.')
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        collection = Collection.objects.create(title='serializer benchmark')
+        try:
+            self.fill(collection, max(options['page_sizes']), options['images'])
+            request = Request(APIRequestFactory().get('/storefront/products/', HTTP_HOST='localhost'))
+            queryset = Product.objects.filter(collection=collection).order_by('title', 'id')
+            reader = readers.ProductReader()
+            renderer = JSONRenderer()
+
+            def serializer_path(size):
+                products = queryset.select_related('collection').prefetch_related('promotions', 'images')[:size]
+                return renderer.render(ProductSerializer(products, many=True, context={'request': request}).data)
+
+            def reader_path(size):
+                return renderer.render(reader.build(list(reader.rows(queryset)[:size]), request))
+
+            for size in options['page_sizes']:
+                if serializer_path(size) != reader_path(size):
+                    self.stderr.write(f'Output differs at page size {size}!')
+                results = {name: self.measure(path, size, options['repeat'])
+                           for name, path in [('serializer', serializer_path), ('reader', reader_path)]}
+                self.stdout.write('page_size={:<5} serializer={:8.1f}us/item  reader={:8.1f}us/item  x{:.1f}'.format(
+                    size, results['serializer'], results['reader'], results['serializer'] / results['reader']))
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM {} WHERE product_id IN (SELECT id FROM {} WHERE collection_id = %s)'.format(
+                    connection.ops.quote_name(ProductImage._meta.db_table),
+                    connection.ops.quote_name(Product._meta.db_table)), [collection.pk])
+                cursor.execute('DELETE FROM {} WHERE collection_id = %s'.format(
+                    connection.ops.quote_name(Product._meta.db_table)), [collection.pk])
+            collection.delete()
+            catalog_cache.bump(catalog_cache.PRODUCTS, catalog_cache.COLLECTIONS)
+
+    def fill(self, collection, count, images):
+        products = Product.objects.bulk_create([
+            Product(title=f'Benchmark product {index:05}', slug=f'serializer-benchmark-{collection.pk}-{index}',
+                    description='A product used to benchmark serialization. ' * 4,
+                    price=10 + index % 90, inventory=index % 100, collection=collection)
+            for index in range(count)
+        ])
+        if connection.features.can_return_rows_from_bulk_insert:
+            ids = [product.pk for product in products]
+        else:
+            ids = list(Product.objects.filter(collection=collection).values_list('id', flat=True))
+        ProductImage.objects.bulk_create([
+            ProductImage(product_id=product_id, image=f'storefront/images/benchmark-{product_id}-{index}.jpg')
+            for product_id in ids for index in range(images)
+        ])
+
+    def measure(self, path, size, repeat):
+        path(size)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            path(size)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) / size * 1_000_000
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from storefront import bulk
+from storefront.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Stream every product as NDJSON or CSV to a file or stdout.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(bulk.EXPORTERS), default='ndjson')
+        parser.add_argument('--output', default='-')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunks = bulk.EXPORTERS[options['format']](Product.objects.all(), chunk_size=options['chunk_size'])
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            output.writelines(chunks)
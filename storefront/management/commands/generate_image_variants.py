@@ -0,0 +1,49 @@
+import multiprocessing
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+from storefront import cache as catalog_cache, images, workers
+from storefront.models import ProductImage
+
+
+class Command(BaseCommand):
+    help = 'Generate missing size/format variants for existing product images on a process pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='0 renders in this process.')
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--force', action='store_true', help='Regenerate images that already have variants.')
+
+    def handle(self, *args, **options):
+        queryset = ProductImage.objects.exclude(image='').order_by('pk')
+        if not options['force']:
+            queryset = queryset.filter(variants={})
+
+        done = failed = 0
+        last_id = 0
+        with workers.process_pool(options['workers']) as executor:
+            while True:
+                batch = list(queryset.filter(pk__gt=last_id)
+                             .values_list('pk', 'product_id', 'image')[:options['batch_size']])
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+
+                futures = {executor.submit(images.render_variants, pk, name): (pk, product_id)
+                           for pk, product_id, name in batch}
+                rendered = []
+                for future in as_completed(futures):
+                    pk, product_id = futures[future]
+                    try:
+                        rendered.append(ProductImage(pk=pk, product_id=product_id, variants=future.result()))
+                    except Exception as error:
+                        failed += 1
+                        self.stderr.write(f'Image {pk}: {error}')
+                ProductImage.objects.bulk_update(rendered, ['variants'])
+                catalog_cache.invalidate_products({image.product_id for image in rendered})
+                done += len(rendered)
+                self.stdout.write(f'{done} image(s) done, {failed} failed')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated variants for {done} image(s); {failed} failed.'))
+
@@ -0,0 +1,31 @@
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from storefront import bulk
+
+
+class Command(BaseCommand):
+    help = 'Upsert products by slug from an NDJSON or CSV file ("-" reads stdin).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=list(bulk.PARSERS), default=None,
+                            help='Defaults to csv for *.csv files, ndjson otherwise.')
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        try:
+            source = nullcontext(sys.stdin) if path == '-' else open(path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(error)
+
+        with source as lines:
+            result = bulk.ProductImporter(options['batch_size']).run(bulk.PARSERS[file_format](lines))
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']} ({error['slug']}): {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']}, updated {result['updated']}, {len(result['errors'])} error(s)."))
@@ -0,0 +1,58 @@
+import signal
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from storefront import outbox
+from storefront.models import OutboxMessage
+
+
+class Command(BaseCommand):
+    help = 'Deliver outbox messages to their signal receivers, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when nothing is due.')
+        parser.add_argument('--lease', type=int, default=60,
+                            help='Seconds a claimed batch stays hidden from other workers.')
+        parser.add_argument('--once', action='store_true', help='Drain what is due, then exit.')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        totals = Counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while self.running:
+                messages = outbox.claim(options['batch_size'], lease=options['lease'])
+                if not messages:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                statuses = Counter(executor.map(self.process, messages))
+                totals.update(statuses)
+                self.stdout.write(self.describe(statuses))
+
+        self.stdout.write(self.style.SUCCESS(f'Processed: {self.describe(totals) or "nothing"}'))
+
+    def describe(self, statuses):
+        # Retried messages are still pending.
+        return ', '.join(f'{count} {OutboxMessage.Status(status).label.lower()}'
+                         for status, count in statuses.items())
+
+    def process(self, message):
+        try:
+            return outbox.process(message)
+        finally:
+            # Pool threads each hold their own connection; recycle it the way
+            # request handling would, per CONN_MAX_AGE.
+            close_old_connections()
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from storefront import cache as catalog_cache
+from storefront.models import Collection, Product
+
+
+class Command(BaseCommand):
+    help = 'Recompute Collection.products_count in batches and fix any drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        fixed = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                collections = list(
+                    Collection.objects.select_for_update()
+                    .filter(pk__gt=last_id).order_by('pk')
+                    .only('id', 'products_count')[:batch_size]
+                )
+                if not collections:
+                    break
+                last_id = collections[-1].pk
+
+                counts = dict(
+                    Product.objects.filter(collection__in=collections).order_by()
+                    .values_list('collection').annotate(count=Count('id'))
+                )
+                drifted = []
+                for collection in collections:
+                    actual = counts.get(collection.pk, 0)
+                    if collection.products_count != actual:
+                        collection.products_count = actual
+                        drifted.append(collection)
+                Collection.objects.bulk_update(drifted, ['products_count'])
+                fixed += len(drifted)
+
+        if fixed:
+            catalog_cache.invalidate_collections()
+        self.stdout.write(self.style.SUCCESS(f'Fixed {fixed} collection(s).'))
@@ -0,0 +1,48 @@
+import json
+import multiprocessing
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from storefront import seed, workers
+
+
+class Command(BaseCommand):
+    help = ('Generate synthetic collections, products, images, reviews, customers and orders on a '
+            'process pool, and write a manifest of the generated ids for the locust files.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=list(seed.SCALES), default='small',
+                            help='Preset sizes; the options below override them.')
+        parser.add_argument('--collections', type=int)
+        parser.add_argument('--products', type=int)
+        parser.add_argument('--customers', type=int)
+        parser.add_argument('--orders-per-customer', type=float, help='Mean of a geometric distribution.')
+        parser.add_argument('--reviews-per-product', type=int)
+        parser.add_argument('--images-per-product', type=int)
+        parser.add_argument('--popularity', type=float, default=1.1,
+                            help='Zipf exponent of product popularity in orders and reviews.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per job.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT.')
+        parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                            help='0 seeds in this process.')
+        parser.add_argument('--manifest', default=str(Path(settings.BASE_DIR) / 'locustfiles' / 'seed.json'))
+
+    def handle(self, *args, **options):
+        sizes = dict(seed.get_scale(options['scale']))
+        for name in sizes:
+            if options[name] is not None:
+                sizes[name] = options[name]
+        plan = seed.Plan(seed=options['seed'], popularity=options['popularity'],
+                         chunk_size=options['chunk_size'], batch_size=options['batch_size'], **sizes)
+
+        started = time.monotonic()
+        with workers.process_pool(options['workers']) as executor:
+            counts, manifest = seed.generate(plan, executor, progress=self.stdout.write)
+
+        Path(options['manifest']).write_text(json.dumps(manifest, indent=2) + '\n')
+        rows = sum(counts.values()) + counts['customers']  # and a user per customer
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {rows} rows in {time.monotonic() - started:.1f}s; manifest written to {options["manifest"]}.'))
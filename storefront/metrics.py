@@ -0,0 +1,209 @@
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from storefront.budget import QueryCounter, count_queries, install_query_counter
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'storefront_requests_total': (
+        'counter', 'Requests handled, by route, method and status.', None),
+    'storefront_request_duration_seconds': (
+        'histogram', 'Time spent producing the response.', LATENCY_BUCKETS),
+    'storefront_db_queries': (
+        'histogram', 'Database queries run per request.', QUERY_BUCKETS),
+    'storefront_db_duration_seconds': (
+        'histogram', 'Time spent in database queries per request.', LATENCY_BUCKETS),
+    'storefront_response_size_bytes': (
+        'histogram', 'Size of non-streaming response bodies.', SIZE_BUCKETS),
+}
+
+
+def _label_key(labels):
+    return json.dumps(sorted(labels.items()))
+
+
+class Registry:
+    """
+    Cumulative metrics for this process. With METRICS_DIR set, snapshots are
+    written to <METRICS_DIR>/<pid>.json so that `collect()` can add up every
+    worker process; without it only this process is reported.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.values = {name: {} for name in METRICS}
+            self.last_flush = 0
+
+    def inc(self, name, labels, value=1):
+        key = _label_key(labels)
+        with self.lock:
+            self.values[name][key] = self.values[name].get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = _label_key(labels)
+        with self.lock:
+            series = self.values[name].get(key)
+            if series is None:
+                series = self.values[name][key] = {'buckets': [0] * (len(buckets) + 1), 'sum': 0, 'count': 0}
+            # The last slot is +Inf.
+            series['buckets'][bisect_left(buckets, value)] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.values))
+
+    def flush(self, force=False):
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self.last_flush < getattr(settings, 'METRICS_FLUSH_INTERVAL', 1):
+            return
+        self.last_flush = now
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename, so a reader never sees a half-written file.
+        with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as file:
+            json.dump(self.snapshot(), file)
+        os.replace(file.name, os.path.join(directory, f'{os.getpid()}.json'))
+
+
+registry = Registry()
+
+
+def _merge(total, values):
+    for name, series in values.items():
+        if name not in METRICS:
+            continue
+        for key, value in series.items():
+            current = total[name].get(key)
+            if current is None:
+                total[name][key] = value
+            elif isinstance(value, dict):
+                current['buckets'] = [a + b for a, b in zip(current['buckets'], value['buckets'])]
+                current['sum'] += value['sum']
+                current['count'] += value['count']
+            else:
+                total[name][key] = current + value
+
+
+def collect():
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return registry.snapshot()
+    registry.flush(force=True)
+    total = {name: {} for name in METRICS}
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        try:
+            with open(path) as file:
+                _merge(total, json.load(file))
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(values):
+    """Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for key, value in sorted(values.get(name, {}).items()):
+            pairs = [tuple(pair) for pair in json.loads(key)]
+            if kind == 'counter':
+                lines.append(f'{name}{_format_labels(pairs)} {_format_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + [float('inf')], value['buckets']):
+                cumulative += count
+                labels = _format_labels(pairs + [('le', _format_number(bound))])
+                lines.append(f'{name}_bucket{labels} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(pairs)} {_format_number(value["sum"])}')
+            lines.append(f'{name}_count{_format_labels(pairs)} {value["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def get_route(request):
+    """The URL pattern's name, e.g. `products-list`, so ids don't split series."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.view_name:
+        return 'unmatched'
+    return match.view_name
+
+
+class MetricsMiddleware:
+    """
+    Records latency, database queries and time, response size and status for
+    every request. Put it first in MIDDLEWARE so it times the others too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with count_queries(QueryCounter()) as counter:
+            response = self.get_response(request)
+        self.record(request, response, counter, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        # The async ORM runs queries on the request's sync thread, whose
+        # connections are not this thread's; the counter reaches them
+        # through the context, which sync_to_async carries over.
+        await sync_to_async(install_query_counter)()
+        with count_queries(QueryCounter()) as counter:
+            response = await self.get_response(request)
+        self.record(request, response, counter, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, counter, duration):
+        labels = {'route': get_route(request), 'method': request.method}
+        registry.inc('storefront_requests_total', {**labels, 'status': str(response.status_code)})
+        registry.observe('storefront_request_duration_seconds', labels, duration)
+        registry.observe('storefront_db_queries', labels, counter.count)
+        registry.observe('storefront_db_duration_seconds', labels, counter.duration)
+        if not response.streaming:
+            registry.observe('storefront_response_size_bytes', labels, len(response.content))
+        registry.flush()
@@ -0,0 +1,37 @@
+# Generated by Django 5.0 on 2026-10-18 04:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storefront", "0013_alter_cartitem_cart_alter_cartitem_unique_together"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["placed_at", "id"], name="storefront__placed__e90536_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["customer", "placed_at", "id"],
+                name="storefront__custome_de55ff_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["title", "id"], name="storefront__title_1cc03e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["product", "date", "id"], name="storefront__product_c6ec85_idx"
+            ),
+        ),
+    ]
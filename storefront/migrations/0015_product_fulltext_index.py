@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(
+        "CREATE FULLTEXT INDEX storefront_product_fulltext "
+        "ON storefront_product (title, description)"
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(
+        "DROP INDEX storefront_product_fulltext ON storefront_product"
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storefront", "0014_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
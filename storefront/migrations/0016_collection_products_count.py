@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-18 04:12
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_products_count(apps, schema_editor):
+    Collection = apps.get_model("storefront", "Collection")
+    Product = apps.get_model("storefront", "Product")
+    counts = (
+        Product.objects.filter(collection=OuterRef("pk"))
+        .order_by()
+        .values("collection")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    Collection.objects.update(
+        products_count=Coalesce(Subquery(counts), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storefront", "0015_product_fulltext_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="collection",
+            name="products_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_products_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-18 04:19
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def deduplicate_slugs(apps, schema_editor):
+    Product = apps.get_model("storefront", "Product")
+    duplicated = (
+        Product.objects.order_by()
+        .values("slug")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .values_list("slug", flat=True)
+    )
+    for slug in list(duplicated):
+        # Keep the oldest product on the slug and suffix the rest with their id.
+        for product in Product.objects.filter(slug=slug).order_by("id")[1:]:
+            product.slug = f"{slug[:40]}-{product.id}"
+            product.save(update_fields=["slug"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storefront", "0016_collection_products_count"),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="product",
+            name="slug",
+            field=models.SlugField(unique=True),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.0 on 2026-10-18 04:23
+
+import django.db.models.deletion
+import storefront.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storefront", "0018_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductImage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "image",
+                    models.ImageField(
+                        upload_to="storefront/images",
+                        validators=[storefront.validators.max_image_file_size],
+                    ),
+                ),
+                (
+                    "variants",
+                    models.JSONField(blank=True, default=dict, editable=False),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="images",
+                        to="storefront.product",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storefront", "0019_productimage"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["last_update"], name="storefront__last_up_7ec872_idx"
+            ),
+        ),
+    ]
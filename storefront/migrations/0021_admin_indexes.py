@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-18 04:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("storefront", "0020_product_last_update_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="collection",
+            index=models.Index(fields=["title"], name="storefront__title_6da624_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["inventory"], name="storefront__invento_28802b_idx"
+            ),
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from django.contrib import admin
@@ -10,14 +11,26 @@ from storefront.validators import max_image_file_size
 class Collection(models.Model):
     title = models.CharField(max_length=255)
     feature_product_id = models.CharField(max_length=255, null=True)
+    # Kept in step with the product table by the handlers in storefront.signals;
+    # `manage.py reconcile_collection_counts` repairs any drift.
+    products_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=['title'])]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_title = instance.__dict__.get('title')
+        return instance
+
 
 class Product(models.Model):
     title = models.CharField(max_length=255)
-    slug = models.SlugField()
+    slug = models.SlugField(unique=True)
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=6, decimal_places=2, validators=[
                                 MinValueValidator(1)],)
@@ -28,20 +41,45 @@ class Product(models.Model):
 
     class Meta:
         ordering = ["title"]
+        indexes = [
+            models.Index(fields=['title', 'id']),
+            models.Index(fields=['last_update']),
+            models.Index(fields=['inventory']),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_collection_id = instance.__dict__.get('collection_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Run the post_save handlers (collection counts) in the same transaction.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
 
 class ProductImage(models.Model):
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(
         upload_to='storefront/images', validators=[max_image_file_size])
+    # {size: {'width': ..., 'height': ..., <format>: <storage path>}}, filled
+    # in by storefront.images after upload.
+    variants = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return str(self.image)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_image_name = instance.__dict__.get('image')
+        return instance
+
 
 class Customer(models.Model):
     class Membership(models.TextChoices):
@@ -93,6 +131,10 @@ class Order(models.Model):
         permissions = [
             ("cancel_order", 'Can cancel order')
         ]
+        indexes = [
+            models.Index(fields=['placed_at', 'id']),
+            models.Index(fields=['customer', 'placed_at', 'id']),
+        ]
 
 
 class Address(models.Model):
@@ -138,3 +180,35 @@ class Review(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
     date = models.DateField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'date', 'id']),
+        ]
+
+
+class OutboxMessage(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "P", _("Pending")
+        DONE = "D", _("Done")
+        FAILED = "F", _("Failed")
+
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        choices=Status, default=Status.PENDING, max_length=1)
+    attempts = models.PositiveIntegerField(default=0)
+    # Pending messages are claimable from this time on: now for new ones,
+    # later for retries and for messages leased by a worker.
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f'{self.topic} #{self.pk}'
@@ -0,0 +1,95 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from storefront.models import Order, OutboxMessage
+from storefront.signals import order_created
+
+
+logger = logging.getLogger(__name__)
+
+# topic -> (signal, function turning the stored payload into signal kwargs)
+_topics = {}
+
+
+def register(topic, signal, load=None):
+    _topics[topic] = (signal, load or (lambda payload: payload))
+
+
+def publish(topic, **payload):
+    """
+    Record a signal to be sent by `manage.py process_outbox`. Call it inside
+    the transaction whose outcome the message describes: it is only seen by
+    the worker if that transaction commits.
+    """
+    if topic not in _topics:
+        raise KeyError(f'Unknown outbox topic {topic!r}')
+    return OutboxMessage.objects.create(topic=topic, payload=payload)
+
+
+def get_backoff(attempts):
+    base = getattr(settings, 'OUTBOX_RETRY_BACKOFF', 5)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 60 * 60))
+
+
+def claim(batch_size, lease=60):
+    """
+    Lease up to `batch_size` due messages by pushing their `available_at`
+    `lease` seconds ahead. Concurrent workers skip each other's rows, and a
+    worker that dies only delays its messages until the lease runs out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects
+            .select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+            .filter(status=OutboxMessage.Status.PENDING, available_at__lte=now)
+            .order_by('available_at', 'id')[:batch_size]
+        )
+        OutboxMessage.objects.filter(pk__in=[message.pk for message in messages]) \
+            .update(available_at=now + timedelta(seconds=lease))
+    return messages
+
+
+def dispatch(message):
+    """Send one message to its signal's receivers; returns the errors they raised."""
+    signal, load = _topics[message.topic]
+    try:
+        kwargs = load(message.payload)
+    except Exception as error:
+        return [error]
+    responses = signal.send_robust(sender=OutboxMessage, **kwargs)
+    return [response for _, response in responses if isinstance(response, Exception)]
+
+
+def record(message, errors):
+    """
+    Mark a dispatched message done, or schedule a retry. Delivery is at least
+    once: a retry goes to every receiver again, so receivers must be idempotent.
+    """
+    now = timezone.now()
+    message.attempts += 1
+    if not errors:
+        message.status = OutboxMessage.Status.DONE
+        message.processed_at = now
+        message.last_error = ''
+    else:
+        message.last_error = '\n'.join(repr(error) for error in errors)
+        if message.attempts >= getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 8):
+            message.status = OutboxMessage.Status.FAILED
+            message.processed_at = now
+            logger.error('Outbox message %s failed for good: %s', message, message.last_error)
+        else:
+            message.available_at = now + get_backoff(message.attempts)
+    message.save(update_fields=['status', 'attempts', 'available_at', 'processed_at', 'last_error'])
+
+
+def process(message):
+    record(message, dispatch(message))
+    return message.status
+
+
+register('order_created', order_created,
+         lambda payload: {'order': Order.objects.get(pk=payload['order_id'])})
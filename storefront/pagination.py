@@ -0,0 +1,248 @@
+import json
+from base64 import b64decode, b64encode
+from collections import OrderedDict, namedtuple
+
+from asgiref.sync import sync_to_async
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.template import loader
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+Cursor = namedtuple('Cursor', ['position', 'reverse'])
+
+
+def _reverse_ordering(ordering):
+    return [term[1:] if term.startswith('-') else '-' + term for term in ordering]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek-based pagination over a composite ordering.
+
+    The ordering comes from the view's OrderingFilter (so `?ordering=` keeps
+    working), then `view.ordering`, then the model's Meta.ordering, and always
+    ends with `tie_breaker` so every row has a unique position. Pages are
+    fetched with `WHERE (a, b, id) > (x, y, z)` instead of an OFFSET, and the
+    total `count` is only computed when the client asks for it with `?count=true`.
+
+    Requests with `?page=` (and no cursor) keep getting PageNumberPagination
+    pages, in the same ordering, so existing clients keep working.
+    """
+    cursor_query_param = 'cursor'
+    page_number_class = PageNumberPagination
+    page_number_paginator = None
+    count_query_param = 'count'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    tie_breaker = 'id'
+    invalid_cursor_message = _('Invalid cursor')
+    template = 'rest_framework/pagination/previous_and_next.html'
+
+    def uses_page_numbers(self, request):
+        params = request.query_params
+        return self.page_number_class.page_query_param in params and self.cursor_query_param not in params
+
+    def get_page_number_queryset(self, queryset, request, view):
+        self.page_number_paginator = self.page_number_class()
+        return queryset.order_by(*self.get_ordering(request, queryset, view))
+
+    def set_page_number_page(self, page):
+        self.display_page_controls = self.page_number_paginator.display_page_controls
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.uses_page_numbers(request):
+            queryset = self.get_page_number_queryset(queryset, request, view)
+            return self.set_page_number_page(self.page_number_paginator.paginate_queryset(queryset, request, view))
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        self.count = queryset.count() if self.wants_count(request) else None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        if self.uses_page_numbers(request):
+            queryset = self.get_page_number_queryset(queryset, request, view)
+            return self.set_page_number_page(
+                await sync_to_async(self.page_number_paginator.paginate_queryset)(queryset, request, view))
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        if page_queryset is None:
+            return None
+        self.count = await queryset.acount() if self.wants_count(request) else None
+        return self.set_page([row async for row in page_queryset])
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """The rows of the requested page, plus one to tell whether there is another."""
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        if self.cursor is not None and self.cursor.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(self.cursor))
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+
+        if self.cursor is not None and self.cursor.reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+
+        return self.page_size
+
+    def wants_count(self, request):
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or queryset.model._meta.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+
+        ordering = [term.replace('pk', self.tie_breaker) if term.lstrip('-') == 'pk' else term
+                    for term in ordering]
+        if self.tie_breaker not in [term.lstrip('-') for term in ordering]:
+            ordering.append(self.tie_breaker)
+        return ordering
+
+    def get_keyset_filter(self, cursor):
+        condition = Q()
+        for index, term in enumerate(self.ordering):
+            descending = term.startswith('-') != cursor.reverse
+            lookup = term.lstrip('-') + ('__lt' if descending else '__gt')
+            clause = Q(**{lookup: cursor.position[index]})
+            for previous, value in zip(self.ordering[:index], cursor.position[:index]):
+                clause &= Q(**{previous.lstrip('-'): value})
+            condition |= clause
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position = payload['p']
+            reverse = bool(payload.get('r', False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(position=position, reverse=reverse)
+
+    def encode_cursor(self, cursor):
+        payload = {'p': cursor.position}
+        if cursor.reverse:
+            payload['r'] = 1
+        data = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+        encoded = b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_position(self, item):
+        position = []
+        for term in self.ordering:
+            field = term.lstrip('-')
+            if isinstance(item, dict):
+                position.append(item[field])
+                continue
+            value = item
+            for attr in field.split('__'):
+                value = getattr(value, attr)
+            position.append(value)
+        return position
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(position=self.get_position(self.page[-1]), reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(Cursor(position=self.get_position(self.page[0]), reverse=True))
+
+    def get_paginated_response(self, data):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.get_paginated_response(data)
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ])
+        if self.count is not None:
+            response['count'] = self.count
+            response.move_to_end('count', last=False)
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_html_context(self):
+        return {
+            'previous_url': self.get_previous_link(),
+            'next_url': self.get_next_link()
+        }
+
+    def to_html(self):
+        if self.page_number_paginator is not None:
+            return self.page_number_paginator.to_html()
+        template = loader.get_template(self.template)
+        context = self.get_html_context()
+        return template.render(context)
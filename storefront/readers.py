@@ -0,0 +1,227 @@
+from collections import defaultdict
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from storefront import images
+from storefront.fieldsets import Fieldset
+from storefront.models import Product, ProductImage
+
+
+def enabled():
+    return getattr(settings, 'FAST_CATALOG_READS', True)
+
+
+class ProductReader:
+    """Builds ProductSerializer's output, for the given fieldset, from .values() rows."""
+    fields = ['id', 'title', 'slug', 'description', 'inventory', 'price', 'collection']
+    default_fieldset = Fieldset(
+        ['id', 'title', 'slug', 'description', 'inventory', 'price', 'images', 'collection'], [])
+
+    def __init__(self, fieldset=None):
+        self.fieldset = fieldset or self.default_fieldset
+
+    def rows(self, queryset, extra=()):
+        fields = [field for field in self.fields if field == 'id' or field in self.fieldset.fields]
+        if 'collection' in self.fieldset.expand:
+            fields += ['collection__title', 'collection__products_count']
+        fields += [field for field in extra if field not in fields]
+        return queryset.prefetch_related(None).values(*fields)
+
+    def group(self, rows):
+        grouped = defaultdict(list)
+        for product_id, *values in rows:
+            grouped[product_id].append(values)
+        return grouped
+
+    async def agroup(self, rows):
+        grouped = defaultdict(list)
+        async for product_id, *values in rows:
+            grouped[product_id].append(values)
+        return grouped
+
+    def image_queryset(self, product_ids):
+        return ProductImage.objects.filter(product_id__in=product_ids).values_list('product_id', 'image', 'variants')
+
+    def promotion_queryset(self, product_ids):
+        return Product.promotions.through.objects.filter(product_id__in=product_ids).order_by('promotion_id') \
+            .values_list('product_id', 'promotion_id', 'promotion__description', 'promotion__discount')
+
+    def image(self, name, variants, request):
+        url = images.requested_url(name, variants, request)
+        if url is None and name:
+            url = default_storage.url(name)
+            if request is not None:
+                url = request.build_absolute_uri(url)
+        return {'image': url, 'variants': images.variant_urls(name, variants, request)}
+
+    def related_querysets(self, rows):
+        product_ids = [row['id'] for row in rows]
+        querysets = {}
+        if 'images' in self.fieldset.fields:
+            querysets['images'] = self.image_queryset(product_ids)
+        if 'promotions' in self.fieldset.expand:
+            querysets['promotions'] = self.promotion_queryset(product_ids)
+        return querysets
+
+    def build(self, rows, request=None):
+        related = {name: self.group(queryset) for name, queryset in self.related_querysets(rows).items()}
+        return self.assemble(rows, related, request)
+
+    async def abuild(self, rows, request=None):
+        related = {name: await self.agroup(queryset) for name, queryset in self.related_querysets(rows).items()}
+        return self.assemble(rows, related, request)
+
+    def assemble(self, rows, related, request):
+        fields, expand = self.fieldset
+        results = []
+        for row in rows:
+            item = {}
+            for field in fields:
+                if field == 'images':
+                    item[field] = [self.image(name, variants, request) for name, variants in related['images'][row['id']]]
+                elif field == 'promotions':
+                    item[field] = [{'id': promotion_id, 'description': description, 'discount': discount}
+                                   for promotion_id, description, discount in related['promotions'][row['id']]]
+                elif field == 'collection' and 'collection' in expand:
+                    item[field] = {'id': row['collection'], 'title': row['collection__title'],
+                                   'products_count': row['collection__products_count']}
+                else:
+                    item[field] = row[field]
+            results.append(item)
+        return results
+
+
+class CollectionReader:
+    """Builds CollectionSerializer's output from .values() rows."""
+    fields = ['id', 'title', 'products_count']
+
+    def rows(self, queryset, extra=()):
+        fields = self.fields + [field for field in extra if field not in self.fields]
+        return queryset.values(*fields)
+
+    def build(self, rows, request=None):
+        return [{'id': row['id'], 'title': row['title'], 'products_count': row['products_count']} for row in rows]
+
+    async def abuild(self, rows, request=None):
+        return self.build(rows, request)
+
+
+class ReviewReader:
+    """Builds ReviewSerializer's output from .values() rows."""
+    fields = ['id', 'name', 'description', 'date']
+
+    def rows(self, queryset, extra=()):
+        fields = self.fields + [field for field in extra if field not in self.fields]
+        return queryset.select_related(None).values(*fields)
+
+    def build(self, rows, request=None):
+        return [
+            {'id': row['id'], 'name': row['name'], 'description': row['description'],
+             'date': row['date'].isoformat() if row['date'] else None}
+            for row in rows
+        ]
+
+    async def abuild(self, rows, request=None):
+        return self.build(rows, request)
+
+
+class FastReadMixin:
+    """
+    Serve list and retrieve from `reader` instead of the serializer when
+    FAST_CATALOG_READS is on. The reader must produce exactly what the
+    serializer would; the tests compare the two byte for byte.
+    """
+    reader = None
+    # Query parameters whose filters touch the database (e.g. to validate a
+    # ModelChoiceFilter); the async path runs filter_queryset() in a thread
+    # when one of them is present.
+    sync_filter_params = []
+
+    def get_reader(self):
+        return self.reader
+
+    def get_position_fields(self, queryset):
+        # Keyset pagination reads the ordering fields off each row.
+        paginator = self.paginator
+        if paginator is None or not hasattr(paginator, 'get_ordering'):
+            return []
+        return [term.lstrip('-') for term in paginator.get_ordering(self.request, queryset, self)]
+
+    def list(self, request, *args, **kwargs):
+        if not enabled():
+            return super().list(request, *args, **kwargs)
+        reader = self.get_reader()
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = reader.rows(queryset, self.get_position_fields(queryset))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.build(page, request))
+        return Response(reader.build(list(rows), request))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not enabled():
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        reader = self.get_reader()
+        queryset = reader.rows(self.filter_queryset(self.get_queryset()))
+        row = get_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return Response(reader.build([row], request)[0])
+
+    async def afilter_queryset(self, queryset):
+        if any(name in self.request.query_params for name in self.sync_filter_params):
+            return await sync_to_async(self.filter_queryset)(queryset)
+        return self.filter_queryset(queryset)
+
+    async def apaginate_queryset(self, queryset):
+        paginator = self.paginator
+        if paginator is None:
+            return None
+        if hasattr(paginator, 'apaginate_queryset'):
+            return await paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(paginator.paginate_queryset)(queryset, self.request, view=self)
+
+    async def alist(self, request, *args, **kwargs):
+        reader = self.get_reader()
+        queryset = await self.afilter_queryset(self.get_queryset())
+        rows = reader.rows(queryset, self.get_position_fields(queryset))
+        page = await self.apaginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(await reader.abuild(page, request))
+        return Response(await reader.abuild([row async for row in rows], request))
+
+    async def aretrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        reader = self.get_reader()
+        queryset = reader.rows(await self.afilter_queryset(self.get_queryset()))
+        try:
+            row = await queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).afirst()
+        except (TypeError, ValueError, ValidationError):
+            row = None
+        if row is None:
+            raise Http404
+        return Response((await reader.abuild([row], request))[0])
+
+
+def cart(cart_id, rows):
+    """
+    CartSerializer's output from (item id, product id, title, price, quantity)
+    rows, as returned by the cart backends' item_rows().
+    """
+    cart_id = UUID(str(cart_id))
+    items = [
+        {
+            'id': item_id,
+            'cart': cart_id,
+            'product': {'id': product_id, 'title': title, 'price': price},
+            'quantity': quantity,
+            'total_price': quantity * price,
+        }
+        for item_id, product_id, title, price, quantity in rows
+    ]
+    return {'id': str(cart_id), 'items': items, 'total_price': sum([item['total_price'] for item in items])}
@@ -0,0 +1,119 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def get_pin_cookie():
+    return getattr(settings, 'REPLICA_PIN_COOKIE', 'primary_pin')
+
+
+@contextmanager
+def replica_reads():
+    """Let the router send reads in this block to a replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reading_from_replicas():
+    return bool(_replica_reads.get() and get_replicas())
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes always go to the primary (`default`). Reads go to a random
+    DATABASE_REPLICAS alias, but only inside `replica_reads()` and outside
+    transactions on the primary, which must see their own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # Related objects come from wherever their parent was read.
+            return instance._state.db
+        if not reading_from_replicas() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(get_replicas())
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary.
+        return db not in get_replicas()
+
+
+def is_pinned(request):
+    return get_pin_cookie() in request.COOKIES
+
+
+class PrimaryPinMiddleware:
+    """
+    After a client writes, keep its reads on the primary for
+    REPLICA_PIN_SECONDS so replication lag never shows it stale data.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if request.method not in SAFE_METHODS and get_replicas():
+            response.set_cookie(get_pin_cookie(), '1', max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 5),
+                                httponly=True, samesite='Lax')
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe-method requests from a replica unless the client is pinned to
+    the primary. Put it before CatalogCacheMixin: a response read from a
+    replica may be slightly stale, so it is cached for at most
+    REPLICA_CACHE_TIMEOUT seconds, and never served to a pinned client.
+    """
+
+    def should_read_cache(self, request):
+        if get_replicas() and is_pinned(request):
+            return False
+        return super().should_read_cache(request)
+
+    def get_cache_timeout(self):
+        timeout = super().get_cache_timeout()
+        if reading_from_replicas():
+            return min(timeout, getattr(settings, 'REPLICA_CACHE_TIMEOUT', 60))
+        return timeout
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS and not is_pinned(request):
+            with replica_reads():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,274 @@
+import heapq
+import math
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+from core import generations
+from storefront.models import Product
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+GENERATION_KEY = 'search:index:generation'
+
+
+def tokenize(text):
+    return [token.lower() for token in TOKEN_RE.findall(text or '')]
+
+
+def get_generation():
+    """Counts product changes across processes, so each can tell whether its index is stale."""
+    return generations.get_generation(GENERATION_KEY)
+
+
+def bump_generation():
+    return generations.bump_generation(GENERATION_KEY)
+
+
+class LikeSearchBackend:
+    """The old SearchFilter behaviour: icontains over title, no relevance."""
+
+    def search(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(title__icontains=term)
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index(self, products):
+        pass
+
+    def remove(self, product_ids):
+        pass
+
+
+class MySQLFullTextBackend:
+    """MATCH ... AGAINST over the FULLTEXT(title, description) index."""
+    # InnoDB ignores tokens shorter than innodb_ft_min_token_size.
+    min_token_size = 3
+
+    def search(self, queryset, terms):
+        tokens = [token for term in terms for token in tokenize(term)
+                  if len(token) >= self.min_token_size]
+        if not tokens:
+            return LikeSearchBackend().search(queryset, terms)
+
+        table = connection.ops.quote_name(Product._meta.db_table)
+        match = 'MATCH ({table}.{title}, {table}.{description}) AGAINST (%s IN BOOLEAN MODE)'.format(
+            table=table,
+            title=connection.ops.quote_name('title'),
+            description=connection.ops.quote_name('description'),
+        )
+        query = ' '.join(f'+{token}*' for token in tokens)
+        return queryset.annotate(
+            search_rank=RawSQL(match, [query], output_field=FloatField())
+        ).filter(search_rank__gt=0)
+
+    def index(self, products):
+        pass
+
+    def remove(self, product_ids):
+        pass
+
+
+class InvertedIndexBackend:
+    """
+    In-process inverted index over title and description.
+
+    Meant for SQLite/dev runs where there is no FULLTEXT support. The index is
+    built lazily on the first search and then kept current from product
+    save/delete signals. Every change also bumps a generation in the cache: a
+    process that missed one (a change made by another worker, or rows written
+    with bulk_create and then mark_dirty()) rebuilds on its next search.
+    Terms are prefix-matched and combined with AND, and results are ranked by
+    tf-idf, capped at `max_results` after the view's other filters apply.
+    """
+    max_results = 1000
+    max_chunk_size = 16000
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.built = False
+            self.generation = None
+            self.postings = defaultdict(dict)
+            self.documents = {}
+            self.vocabulary = []
+
+    def ensure_built(self):
+        # Read before building, so a change made meanwhile leaves it stale.
+        generation = get_generation()
+        if self.built and self.generation == generation:
+            return
+        with self.lock:
+            if self.built and self.generation == generation:
+                return
+            self.reset()
+            products = Product.objects.values_list('id', 'title', 'description')
+            for product_id, title, description in products.iterator(chunk_size=2000):
+                self._add(product_id, title, description)
+            self.built = True
+            self.generation = generation
+
+    def _add(self, product_id, title, description):
+        counts = defaultdict(int)
+        for token in tokenize(title) + tokenize(description):
+            counts[token] += 1
+        for token, count in counts.items():
+            if token not in self.postings:
+                insort(self.vocabulary, token)
+            self.postings[token][product_id] = count
+        self.documents[product_id] = list(counts)
+
+    def _remove(self, product_id):
+        for token in self.documents.pop(product_id, []):
+            postings = self.postings[token]
+            postings.pop(product_id, None)
+            if not postings:
+                del self.postings[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def index(self, products):
+        with self.lock:
+            if self.apply_change():
+                for product in products:
+                    self._remove(product.pk)
+                    self._add(product.pk, product.title, product.description)
+
+    def remove(self, product_ids):
+        with self.lock:
+            if self.apply_change():
+                for product_id in product_ids:
+                    self._remove(product_id)
+
+    def apply_change(self):
+        """
+        Bump the generation for a change made by this process. Returns whether
+        to apply it to this index in place: only when the index was current,
+        otherwise it is rebuilt on the next search anyway.
+        """
+        generation = bump_generation()
+        if self.built and self.generation == generation - 1:
+            self.generation = generation
+            return True
+        return False
+
+    def _expand(self, prefix):
+        start = bisect_left(self.vocabulary, prefix)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            yield token
+
+    def rank(self, terms):
+        """Every product matching all `terms`, as a dict of id to score."""
+        self.ensure_built()
+        tokens = [token for term in terms for token in tokenize(term)]
+        if not tokens:
+            return {}
+
+        with self.lock:
+            total = len(self.documents) or 1
+            scores = None
+            for prefix in tokens:
+                term_scores = defaultdict(float)
+                for token in self._expand(prefix):
+                    postings = self.postings[token]
+                    idf = math.log(1 + total / len(postings))
+                    for product_id, count in postings.items():
+                        term_scores[product_id] += count * idf
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {product_id: score + term_scores[product_id]
+                              for product_id, score in scores.items() if product_id in term_scores}
+                if not scores:
+                    return {}
+
+        return scores
+
+    def top(self, queryset, scores):
+        """
+        The best `max_results` of `scores` that are also in `queryset`. When the
+        queryset is filtered (a collection, a price range), candidates are
+        checked against it best first, in chunks that double in size, so a
+        selective filter doesn't lose matches ranked below the cap.
+        """
+        if len(scores) <= self.max_results or not queryset.query.has_filters():
+            return heapq.nlargest(self.max_results, scores.items(), key=lambda item: item[1])
+
+        candidates = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        ranked = []
+        start, size = 0, self.max_results
+        while start < len(candidates) and len(ranked) < self.max_results:
+            chunk = candidates[start:start + size]
+            allowed = set(queryset.order_by().filter(
+                pk__in=[product_id for product_id, _ in chunk]).values_list('pk', flat=True))
+            ranked += [item for item in chunk if item[0] in allowed]
+            start += size
+            size = min(size * 2, self.max_chunk_size)
+        return ranked[:self.max_results]
+
+    def search(self, queryset, terms):
+        ranked = self.top(queryset, self.rank(terms))
+        if not ranked:
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+        # A raw CASE compiles far quicker than hundreds of When() expressions.
+        column = '{}.{}'.format(connection.ops.quote_name(Product._meta.db_table),
+                                connection.ops.quote_name('id'))
+        rank = 'CASE {} {} ELSE 0 END'.format(column, ' '.join(['WHEN %s THEN %s'] * len(ranked)))
+        params = [value for pair in ranked for value in pair]
+        return queryset.filter(pk__in=[product_id for product_id, _ in ranked]).annotate(
+            search_rank=RawSQL(rank, params, output_field=FloatField())
+        )
+
+
+BACKENDS = {
+    'like': LikeSearchBackend(),
+    'fulltext': MySQLFullTextBackend(),
+    'index': InvertedIndexBackend(),
+}
+
+
+def get_default_backend_name():
+    name = getattr(settings, 'PRODUCT_SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        return 'fulltext' if connection.vendor == 'mysql' else 'index'
+    return name
+
+
+def get_backend(name=None):
+    if name not in BACKENDS or (name == 'fulltext' and connection.vendor != 'mysql'):
+        name = get_default_backend_name()
+    return BACKENDS[name]
+
+
+def index_product(product):
+    index_products([product])
+
+
+def index_products(products):
+    def _index():
+        for backend in BACKENDS.values():
+            backend.index(products)
+
+    transaction.on_commit(_index)
+
+
+def remove_product(product_id):
+    def _remove():
+        for backend in BACKENDS.values():
+            backend.remove([product_id])
+
+    transaction.on_commit(_remove)
+
+
+def mark_dirty():
+    """After products are written without the per-row signals (seeding), rebuild every process's index."""
+    transaction.on_commit(bump_generation)
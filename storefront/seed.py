@@ -0,0 +1,297 @@
+import itertools
+import math
+import random
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from storefront import cache as catalog_cache, search, workers
+from storefront.bulk import recount_collections
+from storefront.models import Collection, Customer, Order, OrderItem, Product, ProductImage, Review
+
+
+# Sizes per dataset. Orders per customer, reviews and images per product are
+# means; each customer's order count is drawn from a geometric distribution.
+SCALES = {
+    'small': {'collections': 10, 'products': 500, 'customers': 50,
+              'orders_per_customer': 4, 'reviews_per_product': 2, 'images_per_product': 1},
+    'medium': {'collections': 50, 'products': 5000, 'customers': 500,
+               'orders_per_customer': 4, 'reviews_per_product': 2, 'images_per_product': 1},
+    'large': {'collections': 200, 'products': 50000, 'customers': 5000,
+              'orders_per_customer': 4, 'reviews_per_product': 2, 'images_per_product': 1},
+    # About 15M rows.
+    'huge': {'collections': 1000, 'products': 1000000, 'customers': 500000,
+             'orders_per_customer': 5, 'reviews_per_product': 3, 'images_per_product': 1},
+}
+WORDS = [
+    'alpine', 'amber', 'bamboo', 'canvas', 'cedar', 'ceramic', 'classic', 'copper', 'cotton', 'crystal',
+    'denim', 'elegant', 'espresso', 'forest', 'glass', 'harbor', 'indigo', 'ivory', 'jade', 'leather',
+    'linen', 'maple', 'marble', 'meadow', 'midnight', 'nordic', 'oak', 'olive', 'onyx', 'pearl',
+    'rustic', 'sage', 'silk', 'slate', 'solar', 'summit', 'tundra', 'velvet', 'walnut', 'wool',
+]
+NOUNS = [
+    'backpack', 'blanket', 'bottle', 'bowl', 'candle', 'chair', 'clock', 'cushion', 'desk', 'jacket',
+    'kettle', 'lamp', 'mirror', 'mug', 'notebook', 'pillow', 'planter', 'rug', 'scarf', 'teapot',
+]
+PASSWORD = 'benchmark'
+IMAGE_DIR = 'storefront/images/seed'
+MAX_ITEMS_PER_ORDER = 4
+
+
+def get_scale(name):
+    if name not in SCALES:
+        raise KeyError(f'Unknown scale {name!r}; expected one of {", ".join(SCALES)}')
+    return SCALES[name]
+
+
+class Plan:
+    """
+    Everything a worker needs to generate its share of the rows: sizes, id
+    ranges and distributions. Ids are assigned here rather than by the
+    database, so workers can refer to rows other workers are still writing
+    (and because MySQL doesn't report the ids of bulk inserted rows).
+    """
+
+    def __init__(self, seed=0, collections=10, products=500, customers=50, orders_per_customer=4,
+                 reviews_per_product=2, images_per_product=1, popularity=1.1, chunk_size=10000,
+                 batch_size=1000):
+        self.seed = seed
+        self.collections = collections
+        self.products = products
+        self.customers = customers
+        self.orders_per_customer = orders_per_customer
+        self.reviews_per_product = reviews_per_product
+        self.images_per_product = images_per_product
+        # Zipf exponent of product popularity in orders and reviews.
+        self.popularity = popularity
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.starts = {}
+
+    def allocate(self):
+        for model in (Collection, Product, get_user_model(), Customer, Order):
+            self.starts[model._meta.label_lower] = (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def start(self, model):
+        return self.starts[model._meta.label_lower]
+
+    def ids(self, model, count):
+        return range(self.start(model), self.start(model) + count)
+
+    def chunks(self, count):
+        for start in range(0, count, self.chunk_size):
+            yield start, min(start + self.chunk_size, count)
+
+    def rng(self, kind, start):
+        # Per chunk, so a chunk generates the same rows whichever worker runs it.
+        return random.Random(f'{self.seed}:{kind}:{start}')
+
+    def order_counts(self, start, stop):
+        rng = self.rng('orders', start)
+        mean = self.orders_per_customer
+        if mean <= 0:
+            return [0] * (stop - start)
+        # Geometric with the given mean: most customers order a little, a few a lot.
+        log_q = math.log(mean / (mean + 1))
+        return [int(math.log(1.0 - rng.random()) / log_q) for _ in range(start, stop)]
+
+
+def product_price(seed, product_id):
+    # A hash of the id, so order items can be priced without reading products.
+    return Decimal(100 + (product_id * 2654435761 + seed * 40503) % 49900) / 100
+
+
+_popularity = {}
+
+
+def pick_products(plan, rng, count):
+    """`count` product ids, Zipf distributed: the lowest ids are the most popular."""
+    key = (plan.products, plan.popularity)
+    if key not in _popularity:
+        _popularity.clear()
+        _popularity[key] = list(itertools.accumulate(
+            1 / rank ** plan.popularity for rank in range(1, plan.products + 1)))
+    return rng.choices(plan.ids(Product, plan.products), cum_weights=_popularity[key], k=count)
+
+
+def words(rng, low, high):
+    return ' '.join(rng.choice(WORDS + NOUNS) for _ in range(rng.randint(low, high)))
+
+
+def seed_products(plan, start, stop):
+    rng = plan.rng('products', start)
+    collections = plan.ids(Collection, plan.collections)
+    products = []
+    for pk in plan.ids(Product, plan.products)[start:stop]:
+        title = f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(NOUNS).title()}'
+        products.append(Product(
+            pk=pk,
+            title=title,
+            slug=f'{title.lower().replace(" ", "-")}-{pk}',
+            description=words(rng, 8, 24),
+            price=product_price(plan.seed, pk),
+            inventory=rng.randint(10, 1000),
+            collection_id=rng.choice(collections),
+        ))
+    with transaction.atomic():
+        Product.objects.bulk_create(products, batch_size=plan.batch_size)
+    return 'products', len(products)
+
+
+def seed_customers(plan, start, stop, password):
+    User = get_user_model()
+    rng = plan.rng('customers', start)
+    users = [
+        User(pk=pk, username=f'seed{pk}', email=f'seed{pk}@example.com', password=password,
+             first_name=rng.choice(WORDS).title(), last_name=rng.choice(NOUNS).title())
+        for pk in plan.ids(User, plan.customers)[start:stop]
+    ]
+    # bulk_create skips the post_save handler that makes each user a customer.
+    customers = [
+        Customer(pk=pk, user_id=user.pk, phone=f'555{user.pk:07d}')
+        for pk, user in zip(plan.ids(Customer, plan.customers)[start:stop], users)
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=plan.batch_size)
+        Customer.objects.bulk_create(customers, batch_size=plan.batch_size)
+    return 'customers', len(customers)
+
+
+def seed_orders(plan, start, stop, first_order_id):
+    rng = plan.rng('order-items', start)
+    orders, items = [], []
+    order_ids = itertools.count(first_order_id)
+    customer_ids = plan.ids(Customer, plan.customers)[start:stop]
+    for customer_id, count in zip(customer_ids, plan.order_counts(start, stop)):
+        for _ in range(count):
+            order = Order(pk=next(order_ids), customer_id=customer_id,
+                          payment_status=rng.choice(Order.Status.values))
+            orders.append(order)
+            for product_id in sorted(set(pick_products(plan, rng, rng.randint(1, MAX_ITEMS_PER_ORDER)))):
+                items.append(OrderItem(order_id=order.pk, product_id=product_id, quantity=rng.randint(1, 5),
+                                       unit_price=product_price(plan.seed, product_id)))
+    with transaction.atomic():
+        Order.objects.bulk_create(orders, batch_size=plan.batch_size)
+        OrderItem.objects.bulk_create(items, batch_size=plan.batch_size)
+    return 'orders', len(orders), 'order_items', len(items)
+
+
+def seed_reviews(plan, start, stop):
+    rng = plan.rng('reviews', start)
+    reviews = [
+        Review(product_id=product_id, name=f'{rng.choice(WORDS).title()} {rng.choice(NOUNS).title()}',
+               description=words(rng, 10, 40))
+        for product_id in pick_products(plan, rng, stop - start)
+    ]
+    with transaction.atomic():
+        Review.objects.bulk_create(reviews, batch_size=plan.batch_size)
+    return 'reviews', len(reviews)
+
+
+def seed_images(plan, start, stop):
+    # Rows only: the files don't exist, so the API serves broken image URLs.
+    images = [
+        ProductImage(product_id=product_id, image=f'{IMAGE_DIR}/{product_id}-{n}.jpg')
+        for product_id in plan.ids(Product, plan.products)[start:stop]
+        for n in range(plan.images_per_product)
+    ]
+    with transaction.atomic():
+        ProductImage.objects.bulk_create(images, batch_size=plan.batch_size)
+    return 'images', len(images)
+
+
+def run(executor, jobs):
+    totals = {}
+    futures = [executor.submit(*job) for job in jobs]
+    for future in futures:
+        result = future.result()
+        for name, count in zip(result[::2], result[1::2]):
+            totals[name] = totals.get(name, 0) + count
+    return totals
+
+
+def generate(plan, executor, progress=None):
+    """
+    Seed the rows described by `plan`, a chunk per job on `executor`. Jobs
+    that refer to other rows only start once those rows have been written.
+    Returns row counts and the manifest load tests read id ranges from.
+    """
+    plan.allocate()
+    progress = progress or (lambda message: None)
+
+    Collection.objects.bulk_create(
+        [Collection(pk=pk, title=f'{random.Random(f"{plan.seed}:collection:{pk}").choice(WORDS).title()} {pk}')
+         for pk in plan.ids(Collection, plan.collections)],
+        batch_size=plan.batch_size,
+    )
+    counts = {'collections': plan.collections}
+    password = make_password(PASSWORD)
+
+    jobs = [(seed_products, plan, start, stop) for start, stop in plan.chunks(plan.products)]
+    jobs += [(seed_customers, plan, start, stop, password) for start, stop in plan.chunks(plan.customers)]
+    counts.update(run(executor, jobs))
+    recount_collections(plan.ids(Collection, plan.collections))
+    # bulk_create sends no signals, so do the handlers' invalidation here.
+    catalog_cache.bump(catalog_cache.PRODUCTS, catalog_cache.COLLECTIONS)
+    search.mark_dirty()
+    progress(f'{counts["products"]} products, {counts["customers"]} customers')
+
+    jobs = []
+    first_order_id = plan.start(Order)
+    for start, stop in plan.chunks(plan.customers):
+        jobs.append((seed_orders, plan, start, stop, first_order_id))
+        first_order_id += sum(plan.order_counts(start, stop))
+    if plan.products:
+        jobs += [(seed_reviews, plan, start, stop)
+                 for start, stop in plan.chunks(plan.products * plan.reviews_per_product)]
+        jobs += [(seed_images, plan, start, stop) for start, stop in plan.chunks(plan.products)]
+    counts.update({'orders': 0, 'order_items': 0, 'reviews': 0, 'images': 0})
+    counts.update(run(executor, jobs))
+    progress(f'{counts["orders"]} orders, {counts["reviews"]} reviews, {counts["images"]} images')
+
+    reset_sequences([Collection, Product, get_user_model(), Customer, Order])
+    return counts, manifest(plan, counts)
+
+
+def manifest(plan, counts):
+    def id_range(model, count):
+        ids = plan.ids(model, count)
+        return [ids.start, ids.stop - 1] if count else None
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'seed': plan.seed,
+        'counts': counts,
+        'ranges': {
+            'collections': id_range(Collection, plan.collections),
+            'products': id_range(Product, plan.products),
+            'users': id_range(get_user_model(), plan.customers),
+            'customers': id_range(Customer, plan.customers),
+            'orders': id_range(Order, counts['orders']),
+        },
+        'popularity': plan.popularity,
+        'username': 'seed{id}',
+        'password': PASSWORD,
+    }
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+def seed(scale, seed=0, batch_size=1000):
+    """
+    Add a `scale` dataset in this process. Into an empty database, the same
+    scale and seed always produce the same rows and ids, so runs against
+    different commits are comparable. Seeded users log in with PASSWORD.
+    """
+    counts, _ = generate(Plan(seed=seed, batch_size=batch_size, **get_scale(scale)), workers.InlineExecutor())
+    return counts
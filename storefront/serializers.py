@@ -1,7 +1,10 @@
 from django.db import transaction
 from rest_framework import serializers
-from storefront.models import Collection, Product, Review, Cart, CartItem, Customer, Order, OrderItem, ProductImage
-from .signals import order_created
+from storefront.models import Collection, Product, Promotion, Review, Cart, CartItem, Customer, Order, OrderItem, \
+    ProductImage
+from . import customers, images, inventory, outbox
+from .carts import UnknownProducts, get_cart_backend
+from .fieldsets import ExpandableFieldsMixin
 
 
 class CollectionSerializer(serializers.ModelSerializer):
@@ -15,19 +18,42 @@ class CollectionSerializer(serializers.ModelSerializer):
 
 class ProductImageSerializer(serializers.ModelSerializer):
 
+    variants = serializers.SerializerMethodField()
+
     def create(self, validated_data):
 
         product_id = self.context['product_id']
         return ProductImage.objects.create(product_id=product_id, **validated_data)
 
+    def get_variants(self, image: ProductImage):
+        return images.variant_urls(image.image.name, image.variants, self.context.get('request'))
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        url = images.requested_url(instance.image.name, instance.variants, self.context.get('request'))
+        if url is not None:
+            data['image'] = url
+        return data
+
     class Meta:
         model = ProductImage
-        fields = ['image']
+        fields = ['image', 'variants']
+
 
+class PromotionSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Promotion
+        fields = ['id', 'description', 'discount']
 
-class ProductSerializer(serializers.ModelSerializer):
+
+class ProductSerializer(ExpandableFieldsMixin, serializers.ModelSerializer):
 
     images = ProductImageSerializer(many=True)
+    expandable = {
+        'collection': lambda: CollectionSerializer(read_only=True),
+        'promotions': lambda: PromotionSerializer(many=True, read_only=True),
+    }
 
     class Meta:
         model = Product
@@ -35,6 +61,17 @@ class ProductSerializer(serializers.ModelSerializer):
                   'inventory', 'price', 'images', 'collection']
 
 
+class ProductImportSerializer(serializers.ModelSerializer):
+
+    collection = serializers.IntegerField(source='collection_id')
+
+    class Meta:
+        model = Product
+        fields = ['slug', 'title', 'description', 'price', 'inventory', 'collection']
+        # Slugs are upserted, not rejected; collections are checked per batch.
+        extra_kwargs = {'slug': {'validators': []}}
+
+
 class SimpleProductSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -91,26 +128,17 @@ class AddCartItemSerializer(serializers.ModelSerializer):
 
     product_id = serializers.IntegerField()
 
-    def validate_product_id(self, value):
-        if not Product.objects.filter(pk=value).exists():
-            raise serializers.ValidationError(
-                'Product with the id does not exists!')
-        return value
-
     def save(self, **kwargs):
         product_id = self.validated_data['product_id']
         quantity = self.validated_data['quantity']
         cart_id = self.context['cart_id']
 
         try:
-            cart_item = CartItem.objects.get(
-                cart_id=cart_id, product_id=product_id)
-            cart_item.quantity = quantity
-            cart_item.save()
-            self.instance = cart_item
-        except CartItem.DoesNotExist:
-            self.instance = CartItem.objects.create(
-                cart_id=cart_id, **self.validated_data)
+            self.instance = get_cart_backend().add_item(cart_id, product_id, quantity)
+        except Cart.DoesNotExist:
+            raise serializers.ValidationError({'cart': 'No cart found with the given id!'})
+        except Product.DoesNotExist:
+            raise serializers.ValidationError({'product_id': ['Product with the id does not exists!']})
 
         return self.instance
 
@@ -119,8 +147,41 @@ class AddCartItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'product_id', 'quantity']
 
 
+class CartItemLineSerializer(serializers.Serializer):
+
+    product_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, max_value=32767)
+
+
+class BatchAddCartItemSerializer(serializers.Serializer):
+
+    max_items = 100
+    items = CartItemLineSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, items):
+        if len(items) > self.max_items:
+            raise serializers.ValidationError(f'At most {self.max_items} items can be added at once.')
+        return items
+
+    def save(self, **kwargs):
+        # Later lines for the same product win, as repeated single adds would.
+        quantities = {line['product_id']: line['quantity'] for line in self.validated_data['items']}
+        try:
+            self.instance = get_cart_backend().add_items(self.context['cart_id'], quantities)
+        except Cart.DoesNotExist:
+            raise serializers.ValidationError({'cart': 'No cart found with the given id!'})
+        except UnknownProducts as exc:
+            ids = ', '.join(map(str, exc.product_ids))
+            raise serializers.ValidationError({'items': [f'Products with the ids {ids} do not exist!']})
+
+        return self.instance
+
+
 class UpdateCartItemSerializer(serializers.ModelSerializer):
 
+    def update(self, instance, validated_data):
+        return get_cart_backend().update_item(instance, validated_data['quantity'])
+
     class Meta:
         model = CartItem
         fields = ['quantity']
@@ -165,10 +226,11 @@ class CreateOrderSerializer(serializers.Serializer):
     cart_id = serializers.UUIDField()
 
     def validate_cart_id(self, cart_id):
-        if not Cart.objects.filter(pk=cart_id).exists():
+        carts = get_cart_backend()
+        if not carts.exists(cart_id):
             raise serializers.ValidationError(
                 "No cart found with the given id!")
-        elif CartItem.objects.filter(cart_id=cart_id).count() == 0:
+        elif not carts.quantities(cart_id):
             raise serializers.ValidationError("Add some item to proceed")
         return cart_id
 
@@ -177,25 +239,34 @@ class CreateOrderSerializer(serializers.Serializer):
         with transaction.atomic():
             cart_id = self.validated_data['cart_id']
 
-            customer = Customer.objects.get(user_id=self.context['user_id'])
-            order = Order.objects.create(customer=customer)
-
-            cart_items = CartItem.objects.select_related(
-                'product').filter(cart_id=cart_id)
+            carts = get_cart_backend()
+            quantities = carts.quantities(cart_id)
+            try:
+                products = inventory.reserve(quantities)
+            except inventory.InsufficientStock as error:
+                raise serializers.ValidationError({'items': {
+                    str(line['product_id']): f"Only {line['available']} in stock, {line['requested']} requested."
+                    for line in error.shortages
+                }})
+
+            customer_id = self.context.get('customer_id')
+            if customer_id is None:
+                customer_id = customers.load_customer(self.context['user_id']).pk
+            order = Order.objects.create(customer_id=customer_id)
             order_items = [
                 OrderItem(
                     order=order,
-                    product=item.product,
-                    quantity=item.quantity,
-                    unit_price=item.product.price
+                    product=products[product_id],
+                    quantity=quantity,
+                    unit_price=products[product_id].price
                 )
-                for item in cart_items
+                for product_id, quantity in quantities.items()
             ]
 
             OrderItem.objects.bulk_create(order_items)
 
-            Cart.objects.filter(pk=cart_id).delete()
+            carts.delete(cart_id)
 
-            order_created.send_robust(sender=__class__, order=order)
+            outbox.publish('order_created', order_id=order.pk)
 
             return order
@@ -1,10 +1,165 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from storefront.models import Customer
+from django.utils import timezone
+from core.authentication import revoke_user
+from storefront import cache as catalog_cache, customers, images, search
+from storefront.models import Collection, Customer, Product, ProductImage, Promotion
 from django.conf import settings
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_customer_for_new_user(sender, *args, **kwargs):
     if kwargs['created']:
-        Customer.objects.create(user=kwargs['instance'])
\ No newline at end of file
+        Customer.objects.create(user=kwargs['instance'])
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def revoke_tokens_on_credentials_change(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if created or raw:
+        return
+    fields = instance.token_fields
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    current = {field: getattr(instance, field) for field in fields}
+    if getattr(instance, '_loaded_token_fields', None) != current:
+        revoke_user(instance.pk)
+        instance._loaded_token_fields = current
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def revoke_tokens_on_user_delete(sender, instance, **kwargs):
+    revoke_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Customer)
+def invalidate_customer_cache(sender, instance, **kwargs):
+    # Also covers the customer create_customer_for_new_user makes.
+    customers.invalidate(instance.user_id)
+
+
+@receiver(post_delete, sender=Customer)
+def revoke_tokens_on_customer_delete(sender, instance, **kwargs):
+    # Their tokens carry the deleted customer's id.
+    revoke_user(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_product_cache(sender, instance, **kwargs):
+    catalog_cache.invalidate_product(instance.pk)
+
+
+def _adjust_products_count(collection_id, delta):
+    if collection_id is not None:
+        Collection.objects.filter(pk=collection_id).update(products_count=F('products_count') + delta)
+
+
+@receiver(post_save, sender=Product)
+def update_collection_products_count(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded_collection_id = getattr(instance, '_loaded_collection_id', None)
+    if created:
+        _adjust_products_count(instance.collection_id, 1)
+    elif loaded_collection_id is not None and loaded_collection_id != instance.collection_id:
+        _adjust_products_count(loaded_collection_id, -1)
+        _adjust_products_count(instance.collection_id, 1)
+    instance._loaded_collection_id = instance.collection_id
+
+
+@receiver(post_delete, sender=Product)
+def decrement_collection_products_count(sender, instance, **kwargs):
+    _adjust_products_count(instance.collection_id, -1)
+
+
+@receiver(post_save, sender=Product)
+def index_product_for_search(sender, instance, **kwargs):
+    search.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def remove_product_from_search(sender, instance, **kwargs):
+    search.remove_product(instance.pk)
+
+
+def touch_products(product_ids):
+    # Changes outside the product row still count as a change to the product
+    # for last_update, and so for Last-Modified.
+    Product.objects.filter(pk__in=product_ids).update(last_update=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=ProductImage)
+def invalidate_product_image_cache(sender, instance, **kwargs):
+    touch_products([instance.product_id])
+    catalog_cache.invalidate_product(instance.product_id)
+
+
+@receiver(post_save, sender=ProductImage)
+def generate_product_image_variants(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created or instance.image.name != getattr(instance, '_loaded_image_name', None):
+        instance._loaded_image_name = instance.image.name
+        transaction.on_commit(lambda: images.schedule(instance))
+
+
+@receiver(post_delete, sender=ProductImage)
+def delete_product_image_variants(sender, instance, **kwargs):
+    variants = instance.variants
+    transaction.on_commit(lambda: images.delete_variants(variants))
+
+
+@receiver([post_save, post_delete], sender=Collection)
+def invalidate_collection_cache(sender, instance, **kwargs):
+    catalog_cache.invalidate_collections()
+
+
+@receiver(post_save, sender=Collection)
+def touch_collection_products(sender, instance, created, raw=False, **kwargs):
+    # Products render their collection with ?expand=collection. A collection
+    # with products can't be deleted (PROTECT), so only saves matter, and
+    # only the title is rendered from the collection row itself.
+    if raw:
+        return
+    if not created and instance.title != getattr(instance, '_loaded_title', None):
+        Product.objects.filter(collection_id=instance.pk).update(last_update=timezone.now())
+    instance._loaded_title = instance.title
+
+
+@receiver(pre_delete, sender=Promotion)
+def remember_promotion_products(sender, instance, **kwargs):
+    # By post_delete the m2m rows are gone.
+    instance._product_ids = list(instance.product_set.values_list('pk', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Promotion)
+def invalidate_promotion_cache(sender, instance, created=False, raw=False, **kwargs):
+    # Products render their promotions with ?expand=promotions.
+    catalog_cache.invalidate_promotions()
+    if created or raw:
+        return
+    product_ids = getattr(instance, '_product_ids', None)
+    if product_ids is None:
+        product_ids = list(instance.product_set.values_list('pk', flat=True))
+    if product_ids:
+        touch_products(product_ids)
+
+
+@receiver(m2m_changed, sender=Product.promotions.through)
+def invalidate_product_promotions_cache(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # post_clear from the promotion side doesn't say which products lost it.
+        instance._cleared_product_ids = list(instance.product_set.values_list('pk', flat=True))
+        return
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        product_ids = [instance.pk]
+    elif action == 'post_clear':
+        product_ids = getattr(instance, '_cleared_product_ids', [])
+    else:
+        product_ids = pk_set
+    if product_ids:
+        touch_products(product_ids)
+        catalog_cache.invalidate_products(product_ids)
@@ -1,7 +1,29 @@
+from django.conf import settings as django_settings
+from django.core.cache import cache
 from rest_framework.test import APIClient
 import pytest
 
 
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    # A second alias for the replica tests: its own connection to the test
+    # database. Tests route to it by setting DATABASE_REPLICAS.
+    django_settings.DATABASES["replica"] = {**django_settings.DATABASES["default"], "TEST": {"MIRROR": "default"}}
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    settings.QUERY_BUDGET_RAISE = True
+
+
 @pytest.fixture
 def api_client():
-    return APIClient()
\ No newline at end of file
+    return APIClient()
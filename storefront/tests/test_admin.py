@@ -0,0 +1,75 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from storefront import admin_site
+from storefront.models import Customer, Order, Product
+import pytest
+
+
+def make_customer(username):
+    return Customer.objects.get(user=baker.make("core.User", username=username, email=f"{username}@example.com"))
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    def test_if_unfiltered_counts_are_estimated(self, monkeypatch):
+        monkeypatch.setattr(admin_site, "estimate_count", lambda model, using: 5_000_000)
+        baker.make(Product, inventory=5, _quantity=3)
+
+        assert admin_site.EstimatedCountPaginator(Product.objects.all(), 20).count == 5_000_000
+        assert admin_site.EstimatedCountPaginator(Product.objects.filter(inventory__lt=10), 20).count == 3
+
+    def test_if_small_tables_are_counted(self, monkeypatch):
+        monkeypatch.setattr(admin_site, "estimate_count", lambda model, using: 40)
+        baker.make(Product, _quantity=3)
+
+        assert admin_site.EstimatedCountPaginator(Product.objects.all(), 20).count == 3
+
+
+@pytest.mark.django_db
+class TestAdminChangelists:
+    def test_if_orders_are_counted_for_the_page_only(self, admin_client):
+        customers = [make_customer(f"user{index:02}") for index in range(25)]
+        baker.make(Order, customer=customers[0], _quantity=2)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = admin_client.get("/admin/storefront/customer/")
+
+        assert res.status_code == 200
+        counts = [query["sql"] for query in queries if 'FROM "storefront_order"' in query["sql"]]
+        assert len(counts) == 1
+        assert len(res.context["cl"].result_list) == 20
+        assert {customer.id: customer.orders_count for customer in res.context["cl"].result_list}[customers[0].id] == 2
+
+    def test_if_inventory_buckets_filter(self, admin_client):
+        baker.make(Product, inventory=9)
+        medium = baker.make(Product, inventory=10)
+        baker.make(Product, inventory=90)
+
+        res = admin_client.get("/admin/storefront/product/", {"inventory": ">10 and <90"})
+
+        assert [product.id for product in res.context["cl"].result_list] == [medium.id]
+
+    def test_if_clear_inventory_touches_products(self, admin_client):
+        product = baker.make(Product, inventory=5)
+        Product.objects.filter(pk=product.pk).update(last_update="2020-01-01T00:00:00Z")
+
+        admin_client.post("/admin/storefront/product/", {"action": "clear_inventory", "_selected_action": [product.id]})
+
+        product.refresh_from_db()
+        assert product.inventory == 0
+        assert product.last_update.year > 2020
+
+    def test_if_autocomplete_results_are_cached(self, admin_client):
+        make_customer("jane")
+        make_customer("john")
+        params = {"app_label": "storefront", "model_name": "order", "field_name": "customer", "term": "ja"}
+
+        first = admin_client.get("/admin/autocomplete/", params)
+        with CaptureQueriesContext(connection) as queries:
+            second = admin_client.get("/admin/autocomplete/", params)
+
+        assert [result["id"] for result in first.json()["results"]] == \
+            [str(Customer.objects.get(user__username="jane").id)]
+        assert second.json() == first.json()
+        assert not any("storefront_customer" in query["sql"] for query in queries)
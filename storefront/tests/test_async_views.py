@@ -0,0 +1,124 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from model_bakery import baker
+from storefront import readers
+from storefront.budget import QueryBudgetExceeded
+from storefront.models import Collection, Product, ProductImage, Review
+from storefront.views import CollectionViewSet
+import pytest
+
+
+@pytest.fixture
+def catalog():
+    collection = baker.make(Collection, title="Kitchen")
+    products = [baker.make(Product, title=f"Mug {index}", price=f"{index}.50", inventory=index,
+                           collection=collection) for index in range(1, 4)]
+    ProductImage.objects.create(product=products[0], image="storefront/images/a.png")
+    baker.make(Review, product=products[0], _quantity=3)
+    return products
+
+
+@pytest.fixture
+def async_get():
+    client = AsyncClient()
+
+    def get(url, headers=None):
+        return async_to_sync(client.get)(url, headers=headers)
+
+    return get
+
+
+@pytest.fixture
+def async_reads(monkeypatch):
+    calls = []
+    for name in ("alist", "aretrieve"):
+        original = getattr(readers.FastReadMixin, name)
+
+        async def spy(self, request, *args, original=original, **kwargs):
+            calls.append(self.basename)
+            return await original(self, request, *args, **kwargs)
+
+        monkeypatch.setattr(readers.FastReadMixin, name, spy)
+    return calls
+
+
+@pytest.mark.django_db
+class TestAsyncCatalogViews:
+    @pytest.mark.parametrize("url", [
+        "/storefront/products/",
+        "/storefront/products/?page_size=2&ordering=-price",
+        "/storefront/products/?price__lte=2&count=true",
+        "/storefront/products/?search=mug",
+        "/storefront/collections/",
+        "/storefront/products/{product}/",
+        "/storefront/products/0/",
+        "/storefront/products/abc/",
+        "/storefront/products/?cursor=bad",
+        "/storefront/collections/{collection}/",
+        "/storefront/products/{product}/reviews/",
+        "/storefront/products/{product}/reviews/{review}/",
+    ])
+    def test_if_async_responses_match_the_viewsets(self, api_client, async_get, async_reads, catalog, url):
+        product = catalog[0]
+        url = url.format(product=product.id, collection=product.collection_id, review=product.reviews.first().id)
+
+        asynchronous = async_get(url)
+        cache.clear()
+        synchronous = api_client.get(url)
+
+        assert async_reads
+        assert asynchronous.status_code == synchronous.status_code
+        assert asynchronous.content == synchronous.content
+        assert asynchronous["Content-Type"] == synchronous["Content-Type"]
+
+    def test_if_collection_filter_is_applied(self, async_get, catalog):
+        other = baker.make(Product, collection=baker.make(Collection), inventory=1)
+
+        res = async_get(f"/storefront/products/?collection_id={other.collection_id}")
+
+        assert [product["id"] for product in res.json()["results"]] == [other.id]
+
+    def test_if_etag_gives_304(self, async_get, catalog):
+        etag = async_get("/storefront/products/")["ETag"]
+
+        res = async_get("/storefront/products/", headers={"if-none-match": etag})
+
+        assert res.status_code == 304
+
+    def test_if_browsable_api_falls_back_to_the_viewset(self, async_get, async_reads, catalog):
+        res = async_get("/storefront/products/", headers={"accept": "text/html"})
+
+        assert res.status_code == 200
+        assert res["Content-Type"].startswith("text/html")
+        assert not async_reads
+
+    def test_if_writes_fall_back_to_the_viewset(self, catalog):
+        res = async_to_sync(AsyncClient().post)(
+            f"/storefront/products/{catalog[0].id}/reviews/",
+            {"name": "Ann", "description": "Great"}, content_type="application/json")
+
+        assert res.status_code == 201
+        assert Review.objects.filter(name="Ann").exists()
+
+    def test_if_disabled_uses_the_viewsets(self, settings, async_get, async_reads, catalog):
+        settings.ASYNC_CATALOG_READS = False
+
+        res = async_get("/storefront/products/")
+
+        assert res.status_code == 200
+        assert not async_reads
+
+    @pytest.mark.parametrize("token, status", [("JWT bad", 401), ("Basic bad", 200)])
+    def test_if_credentials_are_checked_like_the_viewsets(self, api_client, async_get, catalog, token, status):
+        asynchronous = async_get("/storefront/products/", headers={"authorization": token})
+        synchronous = api_client.get("/storefront/products/", HTTP_AUTHORIZATION=token)
+
+        assert asynchronous.status_code == synchronous.status_code == status
+        assert asynchronous.content == synchronous.content
+
+    def test_if_query_budget_is_enforced(self, monkeypatch, async_get, catalog):
+        monkeypatch.setattr(CollectionViewSet, "query_budgets", {"list": 0})
+
+        with pytest.raises(QueryBudgetExceeded):
+            async_get("/storefront/collections/")
@@ -0,0 +1,108 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from core.authentication import ClaimsJWTAuthentication
+from storefront.models import Customer
+import pytest
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(username='jane', email='jane@example.com', password='secret')
+
+
+@pytest.fixture
+def obtain(api_client):
+    def obtain(username='jane', password='secret'):
+        res = api_client.post('/auth/jwt/create/', {'username': username, 'password': password})
+        assert res.status_code == status.HTTP_200_OK
+        return res.data
+
+    return obtain
+
+
+def get_orders(api_client, access):
+    api_client.credentials(HTTP_AUTHORIZATION=f'JWT {access}')
+    return api_client.get('/storefront/orders/')
+
+
+@pytest.mark.django_db
+class TestClaimsAuthentication:
+    def test_if_claims_are_embedded(self, user, obtain):
+        token = AccessToken(obtain()['access'])
+
+        assert token['user_id'] == user.id
+        assert token['is_staff'] is False
+        assert token['customer_id'] == Customer.objects.get(user=user).id
+
+    def test_if_authentication_does_not_query(self, user, obtain, django_assert_num_queries):
+        access = obtain()['access']
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'JWT {access}')
+
+        with django_assert_num_queries(0):
+            token_user, _ = ClaimsJWTAuthentication().authenticate(request)
+
+        assert token_user.id == user.id
+        assert token_user.customer_id == Customer.objects.get(user=user).id
+
+    def test_if_logout_revokes_tokens(self, api_client, user, obtain):
+        tokens = obtain()
+        api_client.credentials(HTTP_AUTHORIZATION=f'JWT {tokens["access"]}')
+
+        res = api_client.post('/auth/jwt/logout/', {'refresh': tokens['refresh']})
+
+        assert res.status_code == status.HTTP_204_NO_CONTENT
+        assert get_orders(api_client, tokens['access']).status_code == status.HTTP_401_UNAUTHORIZED
+        res = api_client.post('/auth/jwt/refresh/', {'refresh': tokens['refresh']})
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_logout_revokes_tokens_for_account_views(self, api_client, user, obtain):
+        access = obtain()["access"]
+        assert api_client.post("/auth/jwt/verify/", {"token": access}).status_code == status.HTTP_200_OK
+        api_client.credentials(HTTP_AUTHORIZATION=f"JWT {access}")
+        api_client.post("/auth/jwt/logout/")
+
+        assert api_client.get("/auth/users/me/").status_code == status.HTTP_401_UNAUTHORIZED
+        assert api_client.patch("/auth/users/me/", {"first_name": "Eve"}).status_code == status.HTTP_401_UNAUTHORIZED
+        api_client.credentials()
+        assert api_client.post("/auth/jwt/verify/", {"token": access}).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_password_change_revokes_tokens(self, api_client, user, obtain, django_capture_on_commit_callbacks):
+        tokens = obtain()
+        assert get_orders(api_client, tokens['access']).status_code == status.HTTP_200_OK
+
+        user = get_user_model().objects.get(pk=user.pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            user.set_password('changed')
+            user.save()
+
+        assert get_orders(api_client, tokens['access']).status_code == status.HTTP_401_UNAUTHORIZED
+        assert get_orders(api_client, obtain(password='changed')['access']).status_code == status.HTTP_200_OK
+
+    def test_if_unrelated_save_keeps_tokens(self, api_client, user, obtain, django_capture_on_commit_callbacks):
+        access = obtain()['access']
+
+        user = get_user_model().objects.get(pk=user.pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            user.first_name = 'Jane'
+            user.save()
+
+        assert get_orders(api_client, access).status_code == status.HTTP_200_OK
+
+    def test_if_evicted_session_is_logged(self, api_client, user, obtain, caplog):
+        access = obtain()["access"]
+        cache.delete(f"auth:session:{user.id}")
+
+        assert get_orders(api_client, access).status_code == status.HTTP_401_UNAUTHORIZED
+        assert "evicted" in caplog.text
+        assert get_orders(api_client, obtain()["access"]).status_code == status.HTTP_200_OK
+
+    def test_if_account_endpoints_load_the_user(self, api_client, user, obtain):
+        api_client.credentials(HTTP_AUTHORIZATION=f'JWT {obtain()["access"]}')
+
+        res = api_client.get('/auth/users/me/')
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['email'] == 'jane@example.com'
@@ -0,0 +1,91 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from model_bakery import baker
+from rest_framework import status
+from storefront.models import Collection, Product
+import pytest
+
+
+@pytest.fixture
+def admin_client(api_client, django_user_model):
+    api_client.force_authenticate(user=baker.make(django_user_model, is_staff=True))
+    return api_client
+
+
+@pytest.fixture
+def collection():
+    return baker.make(Collection)
+
+
+def ndjson(*rows):
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+
+def row(collection, slug, **kwargs):
+    return {"slug": slug, "title": slug.title(), "price": "10.00", "inventory": 5,
+            "collection": collection.id, **kwargs}
+
+
+@pytest.mark.django_db
+class TestProductImport:
+    def test_if_anonymous_returns_401(self, api_client):
+        res = api_client.post("/storefront/products/import/", "", content_type="application/x-ndjson")
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_rows_are_upserted_by_slug(self, admin_client, collection, django_capture_on_commit_callbacks):
+        existing = baker.make(Product, slug="mug", price=3, inventory=1, collection=collection)
+        body = ndjson(row(collection, "mug", price="12.50"), row(collection, "plate"))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            res = admin_client.post("/storefront/products/import/?batch_size=1", body,
+                                    content_type="application/x-ndjson")
+
+        assert res.data == {"created": 1, "updated": 1, "errors": []}
+        existing.refresh_from_db()
+        assert existing.price == 12.5
+        collection.refresh_from_db()
+        assert collection.products_count == 2
+
+    def test_if_bad_rows_are_reported_without_aborting(self, admin_client, collection):
+        body = ndjson(row(collection, "mug"), row(collection, "plate", price="0"),
+                      {**row(collection, "cup"), "collection": 0}) + "{not json\n"
+
+        res = admin_client.post("/storefront/products/import/", body, content_type="application/x-ndjson")
+
+        assert res.data["created"] == 1
+        assert [(error["line"], error["slug"]) for error in res.data["errors"]] == \
+            [(2, "plate"), (4, None), (3, "cup")]
+        assert list(Product.objects.values_list("slug", flat=True)) == ["mug"]
+
+    def test_if_csv_is_accepted(self, admin_client, collection):
+        body = f"slug,title,price,inventory,collection\nmug,Mug,4.00,2,{collection.id}\n"
+
+        res = admin_client.post("/storefront/products/import/", body, content_type="text/csv")
+
+        assert res.data["created"] == 1
+
+
+@pytest.mark.django_db
+class TestProductExport:
+    def test_if_export_streams_ndjson(self, admin_client, collection):
+        baker.make(Product, slug="mug", price=3, collection=collection)
+
+        res = admin_client.get("/storefront/products/export/")
+
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        assert [json.loads(line)["slug"] for line in lines] == ["mug"]
+
+    def test_if_export_round_trips_through_import_command(self, collection, tmp_path):
+        baker.make(Product, slug="mug", title="Mug", price=3, inventory=1, collection=collection)
+        path = tmp_path / "products.csv"
+
+        call_command("export_products", format="csv", output=str(path), chunk_size=1)
+        Product.objects.update(title="Changed")
+        out = StringIO()
+        call_command("import_products", str(path), stdout=out)
+
+        assert Product.objects.get(slug="mug").title == "Mug"
+        assert "updated 1" in out.getvalue()
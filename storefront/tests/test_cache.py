@@ -0,0 +1,112 @@
+import time
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from storefront.models import Collection, Product, Promotion
+import pytest
+
+
+@pytest.fixture
+def product():
+    return baker.make(Product, title="a", price=10)
+
+
+@pytest.mark.django_db
+class TestCatalogCache:
+    def test_if_product_list_is_served_from_cache(self, api_client, product, django_assert_num_queries):
+        api_client.get("/storefront/products/")
+
+        with django_assert_num_queries(0):
+            res = api_client.get("/storefront/products/")
+
+        assert [p["id"] for p in res.data["results"]] == [product.id]
+
+    def test_if_query_params_are_part_of_the_key(self, api_client, product):
+        api_client.get("/storefront/products/")
+        res = api_client.get("/storefront/products/?price__gte=20")
+
+        assert res.data["results"] == []
+
+    def test_if_product_save_invalidates_detail(self, api_client, product, django_capture_on_commit_callbacks):
+        api_client.get(f"/storefront/products/{product.id}/")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.title = "b"
+            product.save()
+        res = api_client.get(f"/storefront/products/{product.id}/")
+
+        assert res.data["title"] == "b"
+
+    def test_if_new_product_invalidates_collections(self, api_client, product, django_capture_on_commit_callbacks):
+        api_client.get(f"/storefront/collections/{product.collection_id}/")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(Product, collection=product.collection, price=10)
+        res = api_client.get(f"/storefront/collections/{product.collection_id}/")
+
+        assert res.data["products_count"] == 2
+
+    def test_if_promotion_change_invalidates_products(self, api_client, product, django_capture_on_commit_callbacks):
+        etag = api_client.get("/storefront/products/")["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(Promotion).product_set.add(product)
+        with CaptureQueriesContext(connection) as queries:
+            res = api_client.get("/storefront/products/")
+
+        assert res["ETag"] != etag
+        assert any("storefront_product" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    def test_if_matching_etag_returns_304(self, api_client, product):
+        etag = api_client.get(f"/storefront/products/{product.id}/")["ETag"]
+
+        res = api_client.get(f"/storefront/products/{product.id}/", HTTP_IF_NONE_MATCH=etag)
+
+        assert res.status_code == 304
+        assert res["ETag"] == etag
+
+    def test_if_last_modified_is_honoured(self, api_client, product):
+        last_modified = api_client.get("/storefront/products/")["Last-Modified"]
+
+        res = api_client.get("/storefront/products/", HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        assert res.status_code == 304
+
+    def test_if_promotion_change_changes_validators(self, api_client, product, django_capture_on_commit_callbacks):
+        Product.objects.filter(pk=product.pk).update(last_update="2020-01-01T00:00:00Z")
+        first = api_client.get(f"/storefront/products/{product.id}/")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            baker.make(Promotion).product_set.add(product)
+        res = api_client.get(f"/storefront/products/{product.id}/", HTTP_IF_NONE_MATCH=first["ETag"],
+                             HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        assert res.status_code == 200
+        assert res["Last-Modified"] != first["Last-Modified"]
+
+    def test_if_leaving_a_filter_moves_list_last_modified(self, api_client, product, monkeypatch,
+                                                           django_capture_on_commit_callbacks):
+        url = f"/storefront/products/?collection_id={product.collection_id}"
+        first = api_client.get(url)
+        later = time.time() + 60
+
+        # Moves the product out of the filtered list without touching any row left in it.
+        with monkeypatch.context() as patch, django_capture_on_commit_callbacks(execute=True):
+            patch.setattr(time, "time", lambda: later)
+            product.collection = baker.make(Collection)
+            product.save()
+        res = api_client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        assert res.status_code == 200
+        assert res.data["results"] == []
+        assert res["Last-Modified"] != first["Last-Modified"]
+
+    def test_if_collections_get_an_etag(self, api_client, product):
+        etag = api_client.get("/storefront/collections/")["ETag"]
+
+        res = api_client.get("/storefront/collections/", HTTP_IF_NONE_MATCH=etag)
+
+        assert res.status_code == 304
@@ -0,0 +1,135 @@
+from django.conf import settings
+from model_bakery import baker
+from rest_framework import status
+from storefront import carts
+from storefront.models import Order, Product
+from storefront.serializers import CreateOrderSerializer
+import pytest
+
+
+@pytest.fixture(params=["database", "redis"])
+def cart_backend(request, monkeypatch):
+    if request.param == "database":
+        backend = carts.DatabaseCartBackend()
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        backend = carts.RedisCartBackend(client=fakeredis.FakeRedis())
+    monkeypatch.setattr(carts, "get_cart_backend", lambda: backend)
+    monkeypatch.setattr("storefront.views.get_cart_backend", lambda: backend)
+    monkeypatch.setattr("storefront.serializers.get_cart_backend", lambda: backend)
+    return backend
+
+
+@pytest.fixture
+def product():
+    return baker.make(Product, title="Mug", price=5, inventory=10)
+
+
+@pytest.fixture
+def cart_id(api_client, cart_backend):
+    return api_client.post("/storefront/carts/").data["id"]
+
+
+@pytest.mark.django_db
+class TestCartBackends:
+    def test_if_new_cart_is_empty(self, api_client, cart_id):
+        res = api_client.get(f"/storefront/carts/{cart_id}/")
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data == {"id": cart_id, "items": [], "total_price": 0}
+
+    def test_if_unknown_cart_returns_404(self, api_client, cart_backend):
+        res = api_client.get("/storefront/carts/9b1deb4d-3b7d-4bad-9bdd-2b0d7b3dcb6d/")
+
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_adding_twice_replaces_quantity(self, api_client, cart_id, product):
+        url = f"/storefront/carts/{cart_id}/cartitems/"
+        first = api_client.post(url, {"product_id": product.id, "quantity": 1})
+        second = api_client.post(url, {"product_id": product.id, "quantity": 3})
+
+        assert first.status_code == second.status_code == status.HTTP_201_CREATED
+        assert first.data["id"] == second.data["id"]
+        cart = api_client.get(f"/storefront/carts/{cart_id}/").data
+        assert [(item["product"]["id"], item["quantity"]) for item in cart["items"]] == [(product.id, 3)]
+        assert cart["total_price"] == 15
+
+    def test_if_item_can_be_updated_and_removed(self, api_client, cart_id, product):
+        url = f"/storefront/carts/{cart_id}/cartitems/"
+        item_id = api_client.post(url, {"product_id": product.id, "quantity": 1}).data["id"]
+
+        res = api_client.patch(f"{url}{item_id}/", {"quantity": 4})
+        assert res.data["quantity"] == 4
+        assert api_client.get(f"{url}{item_id}/").data["total_price"] == 20
+
+        res = api_client.delete(f"{url}{item_id}/")
+        assert res.status_code == status.HTTP_204_NO_CONTENT
+        assert api_client.get(url).data["results"] == []
+
+    def test_if_checkout_materializes_the_cart(self, api_client, cart_id, product,
+                                               django_capture_on_commit_callbacks):
+        api_client.post(f"/storefront/carts/{cart_id}/cartitems/", {"product_id": product.id, "quantity": 2})
+        user = baker.make(settings.AUTH_USER_MODEL)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            serializer = CreateOrderSerializer(data={"cart_id": cart_id}, context={"user_id": user.id})
+            serializer.is_valid(raise_exception=True)
+            order = serializer.save()
+
+        assert [(item.product_id, item.quantity) for item in order.items.all()] == [(product.id, 2)]
+        assert Order.objects.count() == 1
+        assert api_client.get(f"/storefront/carts/{cart_id}/").status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_adding_unknown_product_returns_400(self, api_client, cart_id):
+        res = api_client.post(f"/storefront/carts/{cart_id}/cartitems/", {"product_id": 0, "quantity": 1})
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert "product_id" in res.data
+
+    def test_if_adding_to_unknown_cart_returns_400(self, api_client, cart_backend, product):
+        res = api_client.post("/storefront/carts/9b1deb4d-3b7d-4bad-9bdd-2b0d7b3dcb6d/cartitems/",
+                              {"product_id": product.id, "quantity": 1})
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert "cart" in res.data
+
+    def test_if_batch_add_upserts_lines(self, api_client, cart_id, product):
+        other = baker.make(Product, title="Plate", price=2)
+        url = f"/storefront/carts/{cart_id}/cartitems/"
+        api_client.post(url, {"product_id": product.id, "quantity": 1})
+
+        res = api_client.post(f"{url}batch/", {"items": [
+            {"product_id": product.id, "quantity": 2},
+            {"product_id": other.id, "quantity": 5},
+        ]}, format="json")
+
+        assert res.status_code == status.HTTP_201_CREATED
+        assert [(item["product"]["id"], item["quantity"]) for item in res.data] == [(product.id, 2), (other.id, 5)]
+        cart = api_client.get(f"/storefront/carts/{cart_id}/").data
+        assert cart["total_price"] == 20
+
+    @pytest.mark.parametrize("known", [True, False])
+    def test_if_batch_add_with_unknown_products_returns_400(self, api_client, cart_id, product, known):
+        lines = [{"product_id": 0, "quantity": 1}, {"product_id": -1, "quantity": 1}]
+        if known:
+            lines.insert(0, {"product_id": product.id, "quantity": 2})
+
+        res = api_client.post(f"/storefront/carts/{cart_id}/cartitems/batch/", {"items": lines}, format="json")
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert res.data == {"items": ["Products with the ids 0, -1 do not exist!"]}
+        assert api_client.get(f"/storefront/carts/{cart_id}/").data["items"] == []
+
+    def test_if_batch_add_rejects_bad_quantities(self, api_client, cart_id, product):
+        res = api_client.post(f"/storefront/carts/{cart_id}/cartitems/batch/",
+                              {"items": [{"product_id": product.id, "quantity": 0}]}, format="json")
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_if_batch_add_to_unknown_cart_returns_400(self, api_client, cart_backend, product):
+        res = api_client.post("/storefront/carts/9b1deb4d-3b7d-4bad-9bdd-2b0d7b3dcb6d/cartitems/batch/",
+                              {"items": [{"product_id": product.id, "quantity": 1}]}, format="json")
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert "cart" in res.data
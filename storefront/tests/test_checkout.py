@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, transaction
+from model_bakery import baker
+from rest_framework.exceptions import ValidationError
+from storefront.inventory import InsufficientStock, reserve
+from storefront.models import Cart, CartItem, Order, Product
+from storefront.serializers import CreateOrderSerializer
+import pytest
+
+
+@pytest.fixture
+def user():
+    return baker.make(settings.AUTH_USER_MODEL)
+
+
+@pytest.fixture
+def checkout(user):
+    def place(cart):
+        serializer = CreateOrderSerializer(data={"cart_id": cart.id}, context={"user_id": user.id})
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    return place
+
+
+@pytest.mark.django_db
+class TestCheckoutInventory:
+    def test_if_checkout_takes_stock(self, checkout):
+        first, second = baker.make(Product, price=10, inventory=5, _quantity=2)
+        cart = baker.make(Cart)
+        baker.make(CartItem, cart=cart, product=first, quantity=2)
+        baker.make(CartItem, cart=cart, product=second, quantity=5)
+
+        order = checkout(cart)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.inventory, second.inventory) == (3, 0)
+        assert order.items.count() == 2
+        assert not Cart.objects.filter(pk=cart.pk).exists()
+
+    def test_if_short_lines_are_reported_and_nothing_changes(self, checkout):
+        enough, short = baker.make(Product, price=10, inventory=1, _quantity=2)
+        cart = baker.make(Cart)
+        baker.make(CartItem, cart=cart, product=enough, quantity=1)
+        baker.make(CartItem, cart=cart, product=short, quantity=3)
+
+        with pytest.raises(ValidationError) as error:
+            checkout(cart)
+
+        assert error.value.detail["items"] == {str(short.id): "Only 1 in stock, 3 requested."}
+        enough.refresh_from_db()
+        assert enough.inventory == 1
+        assert Order.objects.count() == 0
+        assert Cart.objects.filter(pk=cart.pk).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor == "sqlite", reason="SQLite has no row locks; writers fail instead of waiting")
+class TestConcurrentReserve:
+    def test_if_parallel_checkouts_never_oversell(self):
+        product = baker.make(Product, price=10, inventory=10)
+        workers = 20
+        barrier = threading.Barrier(workers)
+
+        def buy():
+            try:
+                barrier.wait()
+                with transaction.atomic():
+                    reserve({product.id: 1})
+                return True
+            except InsufficientStock:
+                return False
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda _: buy(), range(workers)))
+
+        product.refresh_from_db()
+        assert results.count(True) == 10
+        assert product.inventory == 0
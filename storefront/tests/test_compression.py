@@ -0,0 +1,89 @@
+import gzip
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from model_bakery import baker
+from storefront import compression
+from storefront.models import Collection, Product
+import pytest
+
+
+@pytest.fixture
+def catalog(settings):
+    settings.COMPRESSION_MIN_SIZE = 200
+    collection = baker.make(Collection)
+    return baker.make(Product, description="A sturdy mug. " * 20, collection=collection, _quantity=5)
+
+
+@pytest.fixture
+def compressions(monkeypatch):
+    calls = []
+    original = compression.Gzip.compress
+
+    def spy(self, data):
+        calls.append(len(data))
+        return original(self, data)
+
+    monkeypatch.setattr(compression.Gzip, "compress", spy)
+    return calls
+
+
+class TestNegotiation:
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("*", "zstd"),
+        ("br;q=0, *;q=0.1", "zstd"),
+        ("identity", None),
+        ("", None),
+    ])
+    def test_if_best_accepted_codec_is_picked(self, header, expected):
+        codecs = [compression.Zstd(3), compression.Brotli(5), compression.Gzip(6)]
+
+        codec = compression.negotiate(header, codecs)
+
+        assert (codec and codec.encoding) == expected
+
+
+@pytest.mark.django_db
+class TestCompressionMiddleware:
+    def test_if_response_is_gzipped(self, api_client, catalog):
+        plain = api_client.get("/storefront/products/")
+        res = api_client.get("/storefront/products/", HTTP_ACCEPT_ENCODING="gzip")
+
+        assert res["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in res["Vary"]
+        assert res["ETag"] == "W/" + plain["ETag"]
+        assert gzip.decompress(res.content) == plain.content
+
+    def test_if_small_responses_are_not_compressed(self, api_client, catalog, settings):
+        settings.COMPRESSION_MIN_SIZE = 10 ** 6
+
+        res = api_client.get("/storefront/products/", HTTP_ACCEPT_ENCODING="gzip")
+
+        assert not res.has_header("Content-Encoding")
+
+    def test_if_cached_responses_are_compressed_once(self, api_client, catalog, compressions):
+        first = api_client.get("/storefront/products/", HTTP_ACCEPT_ENCODING="gzip")
+        second = api_client.get("/storefront/products/", HTTP_ACCEPT_ENCODING="gzip")
+
+        assert len(compressions) == 1
+        assert first.content == second.content
+
+    def test_if_async_responses_reuse_compressed_copies(self, api_client, catalog, compressions, settings):
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+        api_client.get("/storefront/products/", HTTP_ACCEPT_ENCODING="gzip")
+
+        res = async_to_sync(AsyncClient().get)("/storefront/products/", headers={"Accept-Encoding": "gzip"})
+
+        assert res["Content-Encoding"] == "gzip"
+        assert len(compressions) == 1
+
+    def test_if_streaming_responses_are_compressed(self, api_client, catalog, django_user_model):
+        api_client.force_authenticate(user=baker.make(django_user_model, is_staff=True))
+        plain = api_client.get("/storefront/products/export/")
+
+        res = api_client.get("/storefront/products/export/", HTTP_ACCEPT_ENCODING="gzip")
+
+        assert res["Content-Encoding"] == "gzip"
+        assert gzip.decompress(b"".join(res.streaming_content)) == b"".join(plain.streaming_content)
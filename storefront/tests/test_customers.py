@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from model_bakery import baker
+from storefront.models import Customer
+import pytest
+
+
+@pytest.fixture
+def customer():
+    return Customer.objects.get(user=baker.make(settings.AUTH_USER_MODEL))
+
+
+def customer_queries(api_client, path):
+    with CaptureQueriesContext(connection) as queries:
+        res = api_client.get(path)
+    assert res.status_code == status.HTTP_200_OK
+    return [query for query in queries if 'storefront_customer' in query['sql']]
+
+
+@pytest.mark.django_db
+class TestCustomerResolution:
+    def test_if_orders_resolve_customer_from_cache(self, api_client, customer):
+        api_client.force_authenticate(user=customer.user)
+
+        assert len(customer_queries(api_client, '/storefront/orders/')) == 1
+        assert customer_queries(api_client, '/storefront/orders/') == []
+
+    def test_if_me_resolves_customer_from_cache(self, api_client, customer):
+        api_client.force_authenticate(user=customer.user)
+
+        assert len(customer_queries(api_client, '/storefront/customers/me/')) == 1
+        assert customer_queries(api_client, '/storefront/customers/me/') == []
+
+    def test_if_update_invalidates_customer(self, api_client, django_capture_on_commit_callbacks):
+        customer = Customer.objects.get(user=baker.make(settings.AUTH_USER_MODEL, is_staff=True))
+        api_client.force_authenticate(user=customer.user)
+        api_client.get('/storefront/customers/me/')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            res = api_client.put('/storefront/customers/me/', {'phone': '555-0100', 'birth_date': '1990-01-01',
+                                                             'membership': 'Premium'})
+        assert res.status_code == status.HTTP_200_OK
+
+        res = api_client.get('/storefront/customers/me/')
+        assert res.data['phone'] == '555-0100'
+        assert res.data['membership'] == 'Premium'
@@ -2,7 +2,9 @@ from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
 from model_bakery import baker
-from storefront.models import Collection
+from io import StringIO
+from django.core.management import call_command
+from storefront.models import Collection, Product
 import pytest
 
 
@@ -68,4 +70,41 @@ class TestCollectionEndpoints:
         res = api_client.patch(f"/storefront/collections/{collection.id}/",data=update_payload)
         
         assert res.status_code == status.HTTP_401_UNAUTHORIZED
-    
\ No newline at end of file
+    
+
+@pytest.mark.django_db
+class TestCollectionProductsCount:
+    def test_if_count_follows_product_create_move_and_delete(self):
+        first, second = baker.make(Collection, _quantity=2)
+        product = baker.make(Product, collection=first)
+        baker.make(Product, collection=first)
+
+        product = Product.objects.get(pk=product.pk)
+        product.collection = second
+        product.save()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.products_count, second.products_count) == (1, 1)
+
+        Product.objects.filter(collection=first).delete()
+        first.refresh_from_db()
+        assert first.products_count == 0
+
+    def test_if_reconcile_fixes_drift(self):
+        collection = baker.make(Collection)
+        baker.make(Product, collection=collection, _quantity=3)
+        Collection.objects.update(products_count=10)
+
+        call_command("reconcile_collection_counts", stdout=StringIO())
+
+        collection.refresh_from_db()
+        assert collection.products_count == 3
+
+    def test_if_list_does_not_touch_products(self, api_client, django_assert_num_queries):
+        collection = baker.make(Collection)
+        baker.make(Product, collection=collection, _quantity=2)
+
+        with django_assert_num_queries(1):
+            res = api_client.get(f"/storefront/collections/{collection.id}/")
+
+        assert res.data["products_count"] == 2
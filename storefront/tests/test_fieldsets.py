@@ -0,0 +1,108 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from model_bakery import baker
+from storefront.models import Collection, Product, ProductImage, Promotion
+import pytest
+
+
+@pytest.fixture
+def product():
+    product = baker.make(Product, title="Mug", price=5, collection=baker.make(Collection, title="Kitchen"))
+    ProductImage.objects.create(product=product, image="storefront/images/a.png")
+    product.promotions.add(baker.make(Promotion, description="Sale", discount=0.5))
+    return product
+
+
+@pytest.fixture(params=[True, False], ids=["fast", "serializer"])
+def fetch(request, api_client, settings):
+    settings.FAST_CATALOG_READS = request.param
+
+    def fetch(url):
+        with CaptureQueriesContext(connection) as queries:
+            res = api_client.get(url)
+        return res, [query['sql'] for query in queries]
+
+    return fetch
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def test_if_only_requested_fields_are_fetched(self, fetch, product):
+        res, queries = fetch("/storefront/products/?fields=title,price")
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['results'] == [{'title': 'Mug', 'price': 5}]
+        assert not any('description' in sql for sql in queries)
+        assert not any('storefront_productimage' in sql or 'promotion' in sql for sql in queries)
+
+    def test_if_relations_are_expanded(self, fetch, product):
+        res, queries = fetch(f"/storefront/products/{product.id}/?fields=id&expand=collection,promotions")
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data == {
+            'id': product.id,
+            'collection': {'id': product.collection_id, 'title': 'Kitchen', 'products_count': 1},
+            'promotions': [{'id': product.promotions.get().id, 'description': 'Sale', 'discount': 0.5}],
+        }
+        assert not any('storefront_productimage' in sql for sql in queries)
+
+    def test_if_unknown_fields_return_400(self, fetch, product):
+        res, _ = fetch("/storefront/products/?fields=title,secret&expand=images")
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(res.data) == {'fields', 'expand'}
+
+
+@pytest.mark.django_db
+class TestExpandedCaching:
+    def test_if_promotion_change_refreshes_expanded_lists(self, api_client, product,
+                                                          django_capture_on_commit_callbacks):
+        url = "/storefront/products/?fields=id&expand=promotions"
+        first = api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            promotion = product.promotions.get()
+            promotion.description = "Clearance"
+            promotion.save()
+        res = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['results'][0]['promotions'][0]['description'] == 'Clearance'
+
+    def test_if_promotion_delete_refreshes_expanded_details(self, api_client, product,
+                                                            django_capture_on_commit_callbacks):
+        url = f"/storefront/products/{product.id}/?fields=id&expand=promotions"
+        Product.objects.filter(pk=product.pk).update(last_update="2020-01-01T00:00:00Z")
+        first = api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.promotions.get().delete()
+        res = api_client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['promotions'] == []
+
+    def test_if_collection_change_refreshes_expanded_details(self, api_client, product,
+                                                             django_capture_on_commit_callbacks):
+        url = f"/storefront/products/{product.id}/?fields=id&expand=collection"
+        Product.objects.filter(pk=product.pk).update(last_update="2020-01-01T00:00:00Z")
+        first = api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.collection.title = "Dining"
+            product.collection.save()
+        res = api_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"], HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data['collection']['title'] == 'Dining'
+        assert res["Last-Modified"] != first["Last-Modified"]
+
+    def test_if_collection_save_without_changes_keeps_products(self, product):
+        Product.objects.filter(pk=product.pk).update(last_update="2020-01-01T00:00:00Z")
+        collection = Collection.objects.get(pk=product.collection_id)
+
+        collection.feature_product_id = str(product.id)
+        collection.save()
+
+        assert Product.objects.get(pk=product.pk).last_update.year == 2020
@@ -0,0 +1,57 @@
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from model_bakery import baker
+from PIL import Image
+from storefront.models import Product, ProductImage
+import pytest
+
+
+def upload(size=(800, 600), mode="RGB"):
+    buffer = BytesIO()
+    Image.new(mode, size, "red").save(buffer, "PNG")
+    return SimpleUploadedFile("mug.png", buffer.getvalue(), content_type="image/png")
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.PRODUCT_IMAGE_WORKERS = 0
+
+
+@pytest.fixture
+def product():
+    return baker.make(Product, price=10, inventory=1)
+
+
+@pytest.mark.django_db
+class TestImageVariants:
+    def test_if_upload_generates_every_variant(self, product, tmp_path, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            image = ProductImage.objects.create(product=product, image=upload(mode="RGBA"))
+
+        image.refresh_from_db()
+        assert image.variants["thumbnail"]["width"] == image.variants["thumbnail"]["height"] == 100
+        assert (image.variants["listing"]["width"], image.variants["listing"]["height"]) == (400, 300)
+        with Image.open(tmp_path / image.variants["detail"]["jpeg"]) as detail:
+            assert (detail.format, detail.size) == ("JPEG", (800, 600))
+
+    def test_if_clients_can_choose_a_size(self, api_client, product, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            image = ProductImage.objects.create(product=product, image=upload())
+        image.refresh_from_db()
+
+        res = api_client.get(f"/storefront/products/{product.id}/?image_size=thumbnail&image_format=jpeg")
+
+        assert res.data["images"][0]["image"].endswith(image.variants["thumbnail"]["jpeg"])
+        assert res.data["images"][0]["variants"]["listing"]["webp"].endswith(image.variants["listing"]["webp"])
+
+    def test_if_backfill_fills_missing_variants(self, product):
+        # Without the on-commit callbacks running, the upload gets no variants.
+        image = ProductImage.objects.create(product=product, image=upload())
+
+        call_command("generate_image_variants", workers=0, stdout=StringIO())
+
+        image.refresh_from_db()
+        assert set(image.variants) == {"thumbnail", "listing", "detail"}
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory
+from model_bakery import baker
+from storefront import metrics
+from storefront.models import Product
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(settings):
+    settings.METRICS_DIR = None
+    metrics.registry.reset()
+    yield
+    metrics.registry.reset()
+
+
+@pytest.fixture
+def staff_client(api_client):
+    api_client.force_authenticate(user=baker.make(get_user_model(), is_staff=True))
+    return api_client
+
+
+def series(values, name, **labels):
+    return values[name].get(json.dumps(sorted(labels.items())))
+
+
+@pytest.mark.django_db
+class TestMetricsMiddleware:
+    def test_if_requests_are_recorded_by_route(self, api_client):
+        product = baker.make(Product, inventory=1)
+
+        api_client.get(f"/storefront/products/{product.id}/")
+        api_client.get("/storefront/products/0/")
+
+        values = metrics.registry.snapshot()
+        assert series(values, "storefront_requests_total",
+                      route="products-detail", method="GET", status="200") == 1
+        assert series(values, "storefront_requests_total",
+                      route="products-detail", method="GET", status="404") == 1
+        latency = series(values, "storefront_request_duration_seconds", route="products-detail", method="GET")
+        assert latency["count"] == 2
+        queries = series(values, "storefront_db_queries", route="products-detail", method="GET")
+        assert queries["sum"] > 0
+        size = series(values, "storefront_response_size_bytes", route="products-detail", method="GET")
+        assert size["sum"] > 0
+
+    def test_if_concurrent_async_requests_count_their_own_queries(self, monkeypatch):
+        counts = {}
+
+        def record(self, request, response, counter, duration):
+            counts[request.path] = counter.count
+
+        monkeypatch.setattr(metrics.MetricsMiddleware, "record", record)
+
+        async def view(request):
+            for _ in range(int(request.path.strip("/"))):
+                await Product.objects.acount()
+                await asyncio.sleep(0)
+            return HttpResponse()
+
+        middleware = metrics.MetricsMiddleware(view)
+
+        async def handle():
+            # Both requests are in flight at once, on the same sync thread
+            # and so the same connections.
+            await asyncio.gather(*[middleware(RequestFactory().get(f"/{queries}/")) for queries in (1, 3)])
+
+        async_to_sync(handle)()
+
+        assert counts == {"/1/": 1, "/3/": 3}
+
+    def test_if_unknown_paths_share_a_route(self, api_client):
+        api_client.get("/nowhere/")
+
+        values = metrics.registry.snapshot()
+        assert series(values, "storefront_requests_total", route="unmatched", method="GET", status="404") == 1
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    def test_if_anonymous_returns_401(self, api_client):
+        res = api_client.get("/storefront/metrics/")
+
+        assert res.status_code == 401
+
+    def test_if_non_staff_returns_403(self, api_client):
+        api_client.force_authenticate(user=baker.make(get_user_model()))
+
+        res = api_client.get("/storefront/metrics/")
+
+        assert res.status_code == 403
+
+    def test_if_staff_gets_prometheus_text(self, staff_client):
+        staff_client.get("/storefront/collections/")
+
+        res = staff_client.get("/storefront/metrics/")
+
+        assert res.status_code == 200
+        assert res["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = res.content.decode()
+        assert "# TYPE storefront_request_duration_seconds histogram" in body
+        assert 'storefront_request_duration_seconds_bucket{method="GET",route="collections-list",le="+Inf"} 1' in body
+
+    def test_if_process_files_are_added_up(self, staff_client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        labels = json.dumps([["method", "GET"], ["route", "collections-list"], ["status", "200"]])
+        (tmp_path / "1.json").write_text(json.dumps({"storefront_requests_total": {labels: 3}}))
+        (tmp_path / "2.json").write_text(json.dumps({"storefront_requests_total": {labels: 4}}))
+
+        res = staff_client.get("/storefront/metrics/")
+
+        assert 'storefront_requests_total{method="GET",route="collections-list",status="200"} 7' in res.content.decode()
+
+
+class TestRender:
+    def test_if_histogram_buckets_are_cumulative(self):
+        registry = metrics.Registry()
+        for value in (0, 1, 1, 500):
+            registry.observe("storefront_db_queries", {"route": "r"}, value)
+
+        text = metrics.render(registry.snapshot())
+
+        assert 'storefront_db_queries_bucket{route="r",le="0"} 1' in text
+        assert 'storefront_db_queries_bucket{route="r",le="1"} 3' in text
+        assert 'storefront_db_queries_bucket{route="r",le="100"} 3' in text
+        assert 'storefront_db_queries_bucket{route="r",le="+Inf"} 4' in text
+        assert 'storefront_db_queries_count{route="r"} 4' in text
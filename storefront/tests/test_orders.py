@@ -0,0 +1,94 @@
+from django.conf import settings
+from rest_framework import status
+from model_bakery import baker
+from storefront.bulk import order_rows
+from storefront.models import Customer, Order, OrderItem, Product
+import pytest
+
+
+def make_customer():
+    user = baker.make(settings.AUTH_USER_MODEL)
+    return Customer.objects.get(user=user)
+
+
+@pytest.fixture
+def customer():
+    return make_customer()
+
+
+@pytest.fixture
+def make_orders():
+    def make(customer, count):
+        orders = baker.make(Order, customer=customer, _quantity=count)
+        for order in orders:
+            baker.make(OrderItem, order=order, product=baker.make(Product, price=10),
+                       quantity=1, unit_price=10, _quantity=3)
+        return orders
+
+    return make
+
+
+@pytest.mark.django_db
+class TestOrderEndpoints:
+    def test_if_anonymous_returns_401(self, api_client):
+        res = api_client.get("/storefront/orders/")
+
+        assert res.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_if_user_gets_only_own_orders(self, api_client, customer, make_orders):
+        own = make_orders(customer, 2)
+        make_orders(make_customer(), 2)
+        api_client.force_authenticate(user=customer.user)
+
+        res = api_client.get("/storefront/orders/")
+
+        assert res.status_code == status.HTTP_200_OK
+        assert {order["id"] for order in res.data["results"]} == {order.id for order in own}
+        assert len(res.data["results"][0]["items"]) == 3
+
+    def test_if_query_count_does_not_grow_with_page(self, api_client, customer, make_orders,
+                                                     django_assert_max_num_queries):
+        make_orders(customer, 20)
+        api_client.force_authenticate(user=customer.user)
+
+        with django_assert_max_num_queries(4):
+            res = api_client.get("/storefront/orders/")
+
+        assert len(res.data["results"]) == 20
+
+
+@pytest.mark.django_db
+class TestOrderExport:
+    def test_if_non_staff_returns_403(self, api_client, customer):
+        api_client.force_authenticate(user=customer.user)
+
+        res = api_client.get("/storefront/orders/export/")
+
+        assert res.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_if_export_streams_one_row_per_item(self, api_client, customer, make_orders):
+        orders = make_orders(customer, 2)
+        Order.objects.filter(pk=orders[0].pk).update(payment_status=Order.Status.C)
+        api_client.force_authenticate(user=baker.make(settings.AUTH_USER_MODEL, is_staff=True))
+
+        res = api_client.get("/storefront/orders/export/?type=csv&payment_status=C")
+
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        assert lines[0].startswith("order_id,placed_at,payment_status")
+        assert [line.split(",")[0] for line in lines[1:]] == [str(orders[0].id)] * 3
+
+    def test_if_rows_are_paged_across_orders(self, customer, make_orders, django_assert_num_queries):
+        make_orders(customer, 3)
+        expected = list(OrderItem.objects.order_by("order_id", "id").values_list("order_id", "id"))
+
+        with django_assert_num_queries(3):
+            rows = list(order_rows(OrderItem.objects.all(), chunk_size=4))
+
+        assert [(row["order_id"], row["item_id"]) for row in rows] == expected
+
+    def test_if_invalid_filter_returns_400(self, api_client):
+        api_client.force_authenticate(user=baker.make(settings.AUTH_USER_MODEL, is_staff=True))
+
+        res = api_client.get("/storefront/orders/export/?placed_after=yesterday")
+
+        assert res.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from model_bakery import baker
+from storefront import outbox
+from storefront.models import CartItem, Customer, Order, OutboxMessage, Product
+from storefront.serializers import CreateOrderSerializer
+from storefront.signals import order_created
+import pytest
+
+
+@pytest.fixture
+def receiver():
+    calls = []
+
+    def handler(sender, order, **kwargs):
+        calls.append(order.pk)
+        if len(calls) == 1 and getattr(handler, "fail_first", False):
+            raise RuntimeError("ERP is down")
+
+    order_created.connect(handler, weak=False)
+    yield handler, calls
+    order_created.disconnect(handler)
+
+
+@pytest.fixture
+def order():
+    customer = Customer.objects.get(user=baker.make(settings.AUTH_USER_MODEL))
+    return baker.make(Order, customer=customer)
+
+
+@pytest.mark.django_db
+class TestOutbox:
+    def test_if_checkout_enqueues_instead_of_sending(self, receiver):
+        _, calls = receiver
+        product = baker.make(Product, price=5, inventory=3)
+        item = baker.make(CartItem, product=product, quantity=1)
+        user = baker.make(settings.AUTH_USER_MODEL)
+
+        serializer = CreateOrderSerializer(data={"cart_id": item.cart_id}, context={"user_id": user.id})
+        serializer.is_valid(raise_exception=True)
+        order = serializer.save()
+
+        assert calls == []
+        message = OutboxMessage.objects.get()
+        assert (message.topic, message.payload) == ("order_created", {"order_id": order.pk})
+
+    def test_if_claimed_messages_are_delivered_once(self, receiver, order):
+        _, calls = receiver
+        outbox.publish("order_created", order_id=order.pk)
+
+        messages = outbox.claim(10)
+        assert outbox.claim(10) == []
+        assert [outbox.process(message) for message in messages] == [OutboxMessage.Status.DONE]
+
+        assert calls == [order.pk]
+
+    def test_if_failure_is_retried_with_backoff(self, receiver, order):
+        handler, calls = receiver
+        handler.fail_first = True
+        message = outbox.publish("order_created", order_id=order.pk)
+
+        outbox.process(outbox.claim(10)[0])
+        message.refresh_from_db()
+        assert (message.status, message.attempts) == (OutboxMessage.Status.PENDING, 1)
+        assert "ERP is down" in message.last_error
+        assert message.available_at > timezone.now()
+
+        OutboxMessage.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+        outbox.process(outbox.claim(10)[0])
+        message.refresh_from_db()
+        assert message.status == OutboxMessage.Status.DONE
+        assert calls == [order.pk, order.pk]
+
+    def test_if_message_fails_after_max_attempts(self, settings):
+        settings.OUTBOX_MAX_ATTEMPTS = 1
+        message = outbox.publish("order_created", order_id=0)
+
+        outbox.process(outbox.claim(10)[0])
+
+        message.refresh_from_db()
+        assert message.status == OutboxMessage.Status.FAILED
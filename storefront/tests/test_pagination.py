@@ -0,0 +1,66 @@
+from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
+from model_bakery import baker
+from storefront.models import Collection, Product
+import pytest
+
+
+@pytest.fixture
+def products():
+    collection = baker.make(Collection)
+    return [baker.make(Product, title=f"p{index // 2}", price=index + 1, collection=collection)
+            for index in range(7)]
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    def walk(self, api_client, url):
+        ids = []
+        while url:
+            res = api_client.get(url)
+            assert res.status_code == status.HTTP_200_OK
+            ids += [product["id"] for product in res.data["results"]]
+            url = res.data["next"]
+        return ids
+
+    def test_if_pages_follow_title_then_id(self, api_client, products):
+        ids = self.walk(api_client, "/storefront/products/?page_size=2")
+
+        expected = sorted(products, key=lambda product: (product.title, product.id))
+        assert ids == [product.id for product in expected]
+
+    def test_if_pages_follow_ordering_filter(self, api_client, products):
+        ids = self.walk(api_client, "/storefront/products/?page_size=3&ordering=-price")
+
+        expected = sorted(products, key=lambda product: -product.price)
+        assert ids == [product.id for product in expected]
+
+    def test_if_previous_returns_the_page_before(self, api_client, products):
+        first = api_client.get("/storefront/products/?page_size=3").data
+        second = api_client.get(first["next"]).data
+        previous = api_client.get(second["previous"]).data
+
+        assert [p["id"] for p in previous["results"]] == [p["id"] for p in first["results"]]
+
+    def test_if_count_is_only_returned_on_request(self, api_client, products):
+        res = api_client.get("/storefront/products/")
+        assert "count" not in res.data
+
+        res = api_client.get("/storefront/products/?count=true")
+        assert res.data["count"] == len(products)
+
+    def test_if_invalid_cursor_returns_404(self, api_client):
+        res = api_client.get("/storefront/products/?cursor=garbage")
+
+        assert res.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_if_page_numbers_keep_working(self, api_client, products, monkeypatch):
+        monkeypatch.setattr(PageNumberPagination, "page_size", 3)
+        expected = sorted(products, key=lambda product: (product.title, product.id))
+
+        res = api_client.get("/storefront/products/?page=2")
+
+        assert res.status_code == status.HTTP_200_OK
+        assert res.data["count"] == len(products)
+        assert [p["id"] for p in res.data["results"]] == [p.id for p in expected[3:6]]
+        assert "page=3" in res.data["next"]
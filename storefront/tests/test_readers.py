@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from model_bakery import baker
+from storefront.models import Cart, CartItem, Collection, Product, ProductImage, Promotion, Review
+import pytest
+
+
+@pytest.fixture
+def catalog():
+    collection = baker.make(Collection, title="Kitchen")
+    products = [baker.make(Product, title=f"Mug {index}", price=f"{index}.50", inventory=index,
+                           collection=collection) for index in range(1, 4)]
+    ProductImage.objects.create(product=products[0], image="storefront/images/a.png",
+                                variants={"thumbnail": {"width": 100, "height": 100,
+                                                        "webp": "storefront/images/variants/1/thumbnail.webp"}})
+    ProductImage.objects.create(product=products[0], image="storefront/images/b.png")
+    products[0].promotions.add(*baker.make(Promotion, discount=0.1, _quantity=2))
+    return products
+
+
+def fetch_both(api_client, settings, url):
+    settings.FAST_CATALOG_READS = True
+    fast = api_client.get(url)
+    cache.clear()
+    settings.FAST_CATALOG_READS = False
+    slow = api_client.get(url)
+    return fast, slow
+
+
+@pytest.mark.django_db
+class TestFastReads:
+    @pytest.mark.parametrize("url", [
+        "/storefront/products/",
+        "/storefront/products/?page_size=2&ordering=-price",
+        "/storefront/products/?search=mug&image_size=thumbnail",
+        "/storefront/products/?fields=id,title,price",
+        "/storefront/products/?fields=title,images&expand=collection,promotions&page_size=2&ordering=-price",
+        "/storefront/collections/",
+    ])
+    def test_if_lists_match_the_serializer(self, api_client, settings, catalog, url):
+        fast, slow = fetch_both(api_client, settings, url)
+
+        assert fast.status_code == 200
+        assert fast.content == slow.content
+
+    def test_if_details_match_the_serializer(self, api_client, settings, catalog):
+        for url in [f"/storefront/products/{catalog[0].id}/", f"/storefront/collections/{catalog[0].collection_id}/",
+                    "/storefront/products/0/"]:
+            fast, slow = fetch_both(api_client, settings, url)
+
+            assert (fast.status_code, fast.content) == (slow.status_code, slow.content)
+
+    def test_if_reviews_match_the_serializer(self, api_client, settings, catalog):
+        review = baker.make(Review, product=catalog[0])
+        baker.make(Review, product=catalog[0], _quantity=2)
+
+        for url in [f"/storefront/products/{catalog[0].id}/reviews/?page_size=2",
+                    f"/storefront/products/{catalog[0].id}/reviews/{review.id}/"]:
+            fast, slow = fetch_both(api_client, settings, url)
+
+            assert fast.status_code == 200
+            assert fast.content == slow.content
+
+    def test_if_cart_matches_the_serializer(self, api_client, settings, catalog):
+        item = baker.make(CartItem, product=catalog[1], quantity=3)
+        baker.make(CartItem, cart=item.cart, product=catalog[2], quantity=1)
+
+        for cart_id in [item.cart_id, baker.make(Cart).id]:
+            fast, slow = fetch_both(api_client, settings, f"/storefront/carts/{cart_id}/")
+
+            assert fast.status_code == 200
+            assert fast.content == slow.content
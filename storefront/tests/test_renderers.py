@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import BytesIO
+import json
+from uuid import UUID
+
+from django.utils.translation import gettext_lazy as _
+from model_bakery import baker
+from rest_framework.renderers import JSONRenderer
+from storefront.models import Product
+from storefront.renderers import ORJSONParser, ORJSONRenderer
+import pytest
+
+
+PAYLOAD = {
+    "price": Decimal("12.50"),
+    "cart": UUID("9b1deb4d-3b7d-4bad-9bdd-2b0d7b3dcb6d"),
+    "placed_at": datetime(2024, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    "label": _("Pending"),
+    "title": "Tasse à café\u2028",
+    "counts": {1: [1, 2.5, None, True]},
+}
+
+
+class TestORJSON:
+    def test_if_output_matches_drf_json_renderer(self):
+        assert ORJSONRenderer().render(PAYLOAD) == JSONRenderer().render(PAYLOAD)
+
+    def test_if_exponent_floats_parse_to_the_same_values(self):
+        payload = {"small": 1e-07, "large": 1.5e16}
+
+        assert ORJSONRenderer().render(payload) == b'{"small":1e-7,"large":1.5e16}'
+        assert json.loads(ORJSONRenderer().render(payload)) == json.loads(JSONRenderer().render(payload))
+
+    def test_if_non_finite_floats_become_null(self):
+        assert ORJSONRenderer().render({"value": float("nan")}) == b'{"value":null}'
+
+    def test_if_indent_falls_back_to_stdlib(self):
+        media_type = "application/json; indent=2"
+
+        assert ORJSONRenderer().render(PAYLOAD, media_type) == JSONRenderer().render(PAYLOAD, media_type)
+
+    def test_if_parser_reads_json(self):
+        assert ORJSONParser().parse(BytesIO(b'{"product_id": 1, "quantity": 2}')) == {"product_id": 1, "quantity": 2}
+
+
+@pytest.mark.django_db
+class TestMessagePack:
+    def test_if_msgpack_is_negotiated(self, api_client):
+        msgpack = pytest.importorskip("msgpack")
+        product = baker.make(Product, price=Decimal("9.99"), inventory=1)
+
+        res = api_client.get(f"/storefront/products/{product.id}/", HTTP_ACCEPT="application/msgpack")
+
+        assert res["Content-Type"] == "application/msgpack"
+        assert msgpack.unpackb(res.content)["price"] == 9.99
+
+    def test_if_msgpack_body_is_parsed(self, api_client):
+        msgpack = pytest.importorskip("msgpack")
+        product = baker.make(Product, price=5, inventory=1)
+        cart_id = api_client.post("/storefront/carts/").data["id"]
+
+        res = api_client.post(f"/storefront/carts/{cart_id}/cartitems/",
+                              msgpack.packb({"product_id": product.id, "quantity": 2}),
+                              content_type="application/msgpack")
+
+        assert res.status_code == 201
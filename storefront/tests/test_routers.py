@@ -0,0 +1,88 @@
+import gzip
+import json
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from storefront import routers
+from storefront.models import Collection, Product
+import pytest
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+
+
+@pytest.fixture
+def replica_queries(replicas):
+    with CaptureQueriesContext(connections["replica"]) as queries:
+        yield queries
+
+
+class TestPrimaryReplicaRouter:
+    def test_if_reads_stay_on_primary_by_default(self, replicas):
+        assert routers.PrimaryReplicaRouter().db_for_read(Product) == "default"
+
+    def test_if_replica_reads_go_to_a_replica(self, replicas):
+        with routers.replica_reads():
+            assert routers.PrimaryReplicaRouter().db_for_read(Product) == "replica"
+
+    def test_if_writes_go_to_primary(self, replicas):
+        with routers.replica_reads():
+            assert routers.PrimaryReplicaRouter().db_for_write(Product) == "default"
+
+    def test_if_nothing_is_migrated_on_replicas(self, replicas):
+        assert routers.PrimaryReplicaRouter().allow_migrate("replica", "storefront") is False
+        assert routers.PrimaryReplicaRouter().allow_migrate("default", "storefront") is True
+
+    @pytest.mark.django_db(transaction=True)
+    def test_if_transactions_read_from_primary(self, replicas):
+        with routers.replica_reads(), transaction.atomic():
+            assert routers.PrimaryReplicaRouter().db_for_read(Product) == "default"
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+class TestReplicaRouting:
+    def test_if_catalog_reads_use_replica(self, api_client, replica_queries):
+        baker.make(Collection)
+
+        res = api_client.get("/storefront/collections/")
+
+        assert res.status_code == 200
+        assert len(res.data["results"]) == 1
+        assert replica_queries
+
+    def test_if_pinned_client_reads_from_primary(self, api_client, replica_queries):
+        api_client.cookies["primary_pin"] = "1"
+
+        res = api_client.get("/storefront/collections/")
+
+        assert res.status_code == 200
+        assert not replica_queries
+
+    def test_if_pinned_client_skips_cached_replica_reads(self, api_client, replica_queries, settings):
+        settings.COMPRESSION_MIN_SIZE = 0
+        # Long enough that gzip pays off.
+        collection = baker.make(Collection, title="Old" * 80)
+        api_client.get("/storefront/collections/")
+        api_client.get("/storefront/collections/", HTTP_ACCEPT_ENCODING="gzip")
+        # Without a signal there is no invalidation, as if the cached
+        # response had been read from a lagging replica.
+        Collection.objects.filter(pk=collection.pk).update(title="New" * 80)
+
+        api_client.cookies["primary_pin"] = "1"
+        res = api_client.get("/storefront/collections/")
+        compressed = api_client.get("/storefront/collections/", HTTP_ACCEPT_ENCODING="gzip")
+
+        assert res.data["results"][0]["title"] == "New" * 80
+        assert compressed["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(compressed.content))["results"][0]["title"] == "New" * 80
+
+    def test_if_writes_pin_the_client(self, api_client, replica_queries):
+        cart_id = api_client.post("/storefront/carts/").data["id"]
+        product = baker.make(Product, inventory=5)
+
+        res = api_client.post(f"/storefront/carts/{cart_id}/cartitems/", {"product_id": product.id, "quantity": 1})
+
+        assert res.cookies["primary_pin"]["max-age"] == 5
+        assert not replica_queries
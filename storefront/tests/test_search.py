@@ -0,0 +1,71 @@
+from model_bakery import baker
+from storefront import search
+from storefront.models import Product
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    search.BACKENDS["index"].reset()
+
+
+@pytest.fixture
+def products():
+    return [
+        baker.make(Product, title="Oak table", description="solid oak, oak legs", price=10),
+        baker.make(Product, title="Pine table", description="light pine", price=10),
+        baker.make(Product, title="Oak chair", description="", price=10),
+    ]
+
+
+def search_ids(api_client, query):
+    res = api_client.get(f"/storefront/products/?search={query}&search_backend=index")
+    return [product["id"] for product in res.data["results"]]
+
+
+@pytest.mark.django_db
+class TestProductSearch:
+    def test_if_all_terms_must_match(self, api_client, products):
+        assert search_ids(api_client, "oak table") == [products[0].id]
+
+    def test_if_terms_match_as_prefix(self, api_client, products):
+        assert set(search_ids(api_client, "tab")) == {products[0].id, products[1].id}
+
+    def test_if_results_are_ordered_by_relevance(self, api_client, products):
+        assert search_ids(api_client, "oak") == [products[0].id, products[2].id]
+
+    def test_if_like_backend_is_still_available(self, api_client, products):
+        res = api_client.get("/storefront/products/?search=table&search_backend=like")
+
+        assert [p["id"] for p in res.data["results"]] == [products[0].id, products[1].id]
+
+    def test_if_index_follows_saves(self, api_client, products, django_capture_on_commit_callbacks):
+        search_ids(api_client, "oak")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            products[1].title = "Walnut table"
+            products[1].save()
+
+        assert search_ids(api_client, "walnut") == [products[1].id]
+        assert search_ids(api_client, "pine") == [products[1].id]
+
+    def test_if_cap_applies_after_filters(self, api_client, products, monkeypatch, settings):
+        # A cap of one walks the candidates a query at a time.
+        settings.QUERY_BUDGET_RAISE = False
+        monkeypatch.setattr(search.InvertedIndexBackend, "max_results", 1)
+        collection_id = products[2].collection_id
+
+        res = api_client.get(f"/storefront/products/?search=oak&search_backend=index&collection_id={collection_id}")
+
+        assert [product["id"] for product in res.data["results"]] == [products[2].id]
+
+    def test_if_bulk_writes_elsewhere_are_picked_up(self, api_client, products, django_capture_on_commit_callbacks):
+        search_ids(api_client, "oak")
+
+        # Written by another process, or without signals: only the shared
+        # generation tells this process's index that it is stale.
+        product = Product.objects.bulk_create([baker.prepare(Product, title="Walnut desk", price=10, collection=products[0].collection)])[0]
+        with django_capture_on_commit_callbacks(execute=True):
+            search.mark_dirty()
+
+        assert search_ids(api_client, "walnut") == [product.id]
@@ -0,0 +1,66 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from storefront import seed
+from storefront.models import Collection, Customer, Order, OrderItem, Product, ProductImage, Review
+import pytest
+
+
+def run_seed(tmp_path, *args):
+    manifest = tmp_path / "seed.json"
+    call_command("seed", "--workers", "0", "--chunk-size", "40", "--manifest", str(manifest), *args, stdout=StringIO())
+    return json.loads(manifest.read_text())
+
+
+@pytest.mark.django_db
+class TestSeed:
+    def test_if_rows_are_consistent_and_match_the_manifest(self, tmp_path):
+        manifest = run_seed(tmp_path, "--products", "100", "--customers", "30", "--collections", "5")
+
+        counts = manifest["counts"]
+        assert Product.objects.count() == counts["products"] == 100
+        assert Customer.objects.count() == get_user_model().objects.count() == 30
+        assert Order.objects.count() == counts["orders"]
+        assert OrderItem.objects.count() == counts["order_items"]
+        assert Review.objects.count() == 200
+        assert ProductImage.objects.count() == 100
+        first, last = manifest["ranges"]["products"]
+        assert (first, last) == (Product.objects.earliest("id").id, Product.objects.latest("id").id)
+        assert sum(Collection.objects.values_list("products_count", flat=True)) == 100
+        assert not OrderItem.objects.exclude(unit_price__gte=1).exists()
+
+    def test_if_same_seed_gives_same_rows(self, tmp_path):
+        run_seed(tmp_path, "--products", "60", "--customers", "20")
+        first = list(OrderItem.objects.order_by("order_id", "product_id").values_list("order_id", "product_id", "quantity"))
+        call_command("flush", interactive=False, verbosity=0)
+
+        run_seed(tmp_path, "--products", "60", "--customers", "20")
+
+        assert first == list(OrderItem.objects.order_by("order_id", "product_id")
+                             .values_list("order_id", "product_id", "quantity"))
+
+    def test_if_popular_products_are_ordered_most(self, tmp_path):
+        run_seed(tmp_path, "--products", "200", "--customers", "100", "--orders-per-customer", "10")
+
+        top = OrderItem.objects.values("product_id").annotate(n=Count("id")).order_by("-n")[0]["product_id"]
+
+        assert top == Product.objects.earliest("id").id
+
+    def test_if_seeded_users_can_log_in(self, tmp_path, api_client):
+        manifest = run_seed(tmp_path, "--products", "10", "--customers", "2")
+        username = manifest["username"].format(id=manifest["ranges"]["users"][0])
+
+        res = api_client.post("/auth/jwt/create/", {"username": username, "password": seed.PASSWORD})
+
+        assert res.status_code == 200
+
+    def test_if_cached_catalog_is_invalidated(self, tmp_path, api_client, django_capture_on_commit_callbacks):
+        assert api_client.get("/storefront/products/").data["results"] == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            run_seed(tmp_path, "--products", "10", "--customers", "2")
+
+        assert len(api_client.get("/storefront/products/").data["results"]) == 10
@@ -26,4 +26,5 @@ urlpatterns = [
     path(r'', include(router.urls)),
     path(r'', include(product_router.urls)),
     path(r'', include(cart_router.urls)),
+    path('metrics/', views.metrics, name='metrics'),
 ]
@@ -1,44 +1,137 @@
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Count
+from django.db.models import Prefetch, prefetch_related_objects
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.mixins import CreateModelMixin, RetrieveModelMixin, DestroyModelMixin, UpdateModelMixin
 from rest_framework.viewsets import ModelViewSet, GenericViewSet
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from .serializers import CollectionSerializer, ProductSerializer, ReviewSerializer, CartSerializer, \
-    CartItemSerializer, AddCartItemSerializer, UpdateCartItemSerializer, CustomerSerializer, \
+    CartItemSerializer, AddCartItemSerializer, BatchAddCartItemSerializer, UpdateCartItemSerializer, CustomerSerializer, \
     OrderSerializer, OrderItemSerializer, CreateOrderSerializer, UpdateOrderSerializer, ProductImageSerializer
 from .models import (Cart, CartItem, Collection, Customer, Order, OrderItem, Product, ProductImage,
-                     Review)
-from .filters import ProductFilter
+                     Promotion, Review)
+from . import bulk, cache as catalog_cache, customers, metrics as request_metrics, readers
+from .budget import QueryBudgetMixin
+from .carts import get_cart_backend
+from .cache import CatalogCacheMixin
+from .fieldsets import SparseFieldsMixin
+from .filters import OrderExportFilter, ProductFilter, ProductOrderingFilter, ProductSearchFilter
+from .pagination import KeysetPagination
+from .routers import ReplicaReadMixin
 from .permissions import IsAdminOrReadOnly
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAdminUser, IsAuthenticated
 
 
-class ProductViewSet(ModelViewSet):
+class ProductViewSet(QueryBudgetMixin, ReplicaReadMixin, CatalogCacheMixin, SparseFieldsMixin, readers.FastReadMixin,
+                     ModelViewSet):
 
-    queryset = Product.objects.select_related(
-        'collection',).prefetch_related('promotions', 'images').all()
+    queryset = Product.objects.all()
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, ProductSearchFilter, ProductOrderingFilter]
     filterset_class = ProductFilter
-    search_fields = ['title', 'id']
+    search_fields = ['title', 'description']
     ordering_fields = ['id', 'title', 'price', 'collection__id']
+    pagination_class = KeysetPagination
     permission_classes = [IsAdminOrReadOnly]
+    reader = readers.ProductReader()
+    sync_filter_params = ['collection_id', 'search']
+    query_budgets = {'list': 5, 'retrieve': 4}
+    cache_query_params = CatalogCacheMixin.cache_query_params + \
+        ['collection_id', 'price__gte', 'price__lte', 'search', 'search_backend', 'image_size', 'image_format',
+         'fields', 'expand']
+    expand_cache_scopes = {'collection': catalog_cache.COLLECTIONS, 'promotions': catalog_cache.PROMOTIONS}
+
+    def get_queryset(self):
+        queryset = Product.objects.all()
+        if self.request.method not in SAFE_METHODS:
+            # Writes save the instance, so it must be fully loaded.
+            return queryset.prefetch_related('images')
+
+        fieldset = self.get_fieldset()
+        # Keyset pagination also reads the ordering columns off each product.
+        positions = self.get_position_fields(queryset)
+        loaded = set(fieldset.fields) | {term.split('__')[0] for term in positions}
+        relations = {term.split('__')[0] for term in positions if '__' in term}
+        if 'collection' in fieldset.expand:
+            relations.add('collection')
+        queryset = queryset.only(*[field for field in readers.ProductReader.fields if field == 'id' or field in loaded])
+        if relations:
+            queryset = queryset.select_related(*relations)
+        if 'images' in fieldset.fields:
+            queryset = queryset.prefetch_related('images')
+        if 'promotions' in fieldset.expand:
+            queryset = queryset.prefetch_related(Prefetch('promotions', queryset=Promotion.objects.order_by('id')))
+        return queryset
+
+    def get_reader(self):
+        return readers.ProductReader(self.get_fieldset())
+
+    def get_cache_scopes(self):
+        if self.action == 'retrieve':
+            scopes = [catalog_cache.product_scope(self.kwargs['pk'])]
+        else:
+            scopes = [catalog_cache.PRODUCTS]
+        # An expanded collection or promotion changes without the product.
+        return scopes + [self.expand_cache_scopes[name] for name in self.get_fieldset().expand]
+
+    def get_last_modified(self):
+        # Image, promotion and collection changes touch last_update too (see
+        # storefront.signals).
+        if self.action == 'retrieve':
+            try:
+                return Product.objects.filter(pk=self.kwargs['pk']).values_list('last_update', flat=True).first()
+            except ValueError:
+                return None
+        # A list also changes when a product is deleted or leaves its filter,
+        # which no remaining row's last_update shows.
+        return catalog_cache.get_last_changed(self.get_cache_scopes())
+
+    async def aget_last_modified(self):
+        if self.action == 'retrieve':
+            try:
+                return await Product.objects.filter(pk=self.kwargs['pk']).values_list('last_update', flat=True).afirst()
+            except ValueError:
+                return None
+        return await catalog_cache.aget_last_changed(self.get_cache_scopes())
 
     def destroy(self, request, *args, **kwargs):
         if OrderItem.objects.filter(product__id=kwargs['pk']).count() > 0:
             return Response({'error': 'Product can not be deleted since it is associated with Order Item'}, status=405)
         return super().destroy(request, *args, **kwargs)
 
-
-class CollectionViewSet(ModelViewSet):
-
-    queryset = Collection.objects.annotate(
-        products_count=Count('product')).all()
+    @action(detail=False, methods=['post'], url_path='import', permission_classes=[IsAdminUser])
+    def import_products(self, request):
+        # Read the body line by line instead of through a parser, which would
+        # load the whole upload into memory.
+        file_format = 'csv' if request.content_type.startswith('text/csv') else 'ndjson'
+        batch_size = request.query_params.get('batch_size', '')
+        rows = bulk.PARSERS[file_format](request.stream or [])
+        result = bulk.ProductImporter(int(batch_size) if batch_size.isdigit() else None).run(rows)
+        return Response(result)
+
+    @action(detail=False, methods=['get'], url_path='export', permission_classes=[IsAdminUser])
+    def export_products(self, request):
+        file_format = request.query_params.get('type', 'ndjson')
+        if file_format not in bulk.EXPORTERS:
+            return Response({'type': [f'Must be one of: {", ".join(bulk.EXPORTERS)}.']}, status=400)
+        response = StreamingHttpResponse(
+            bulk.EXPORTERS[file_format](Product.objects.all()), content_type=bulk.CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="products.{file_format}"'
+        return response
+
+
+class CollectionViewSet(QueryBudgetMixin, ReplicaReadMixin, CatalogCacheMixin, readers.FastReadMixin, ModelViewSet):
+
+    queryset = Collection.objects.all()
     serializer_class = CollectionSerializer
     permission_classes = [IsAdminOrReadOnly]
+    reader = readers.CollectionReader()
+    query_budgets = {'list': 2, 'retrieve': 1}
+
+    def get_cache_scopes(self):
+        return [catalog_cache.COLLECTIONS]
 
     def delete(self, request, pk):
         collection = get_object_or_404(Collection, pk=pk)
@@ -48,9 +141,13 @@ class CollectionViewSet(ModelViewSet):
         return Response(status=204)
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(QueryBudgetMixin, ReplicaReadMixin, readers.FastReadMixin, ModelViewSet):
 
     serializer_class = ReviewSerializer
+    pagination_class = KeysetPagination
+    reader = readers.ReviewReader()
+    ordering = ['-date']
+    query_budgets = {'list': 2, 'retrieve': 1}
 
     def get_queryset(self):
         return Review.objects.select_related('product').filter(product=self.kwargs['product_pk'])
@@ -59,25 +156,68 @@ class ReviewViewSet(ModelViewSet):
         return {'product_id': self.kwargs['product_pk']}
 
 
-class CartViewSet(CreateModelMixin, GenericViewSet, RetrieveModelMixin, DestroyModelMixin):
+class CartViewSet(QueryBudgetMixin, CreateModelMixin, GenericViewSet, RetrieveModelMixin, DestroyModelMixin):
 
-    queryset = Cart.objects.prefetch_related('items__product').all()
     serializer_class = CartSerializer
+    query_budgets = {'create': 1, 'retrieve': 3}
+
+    def create(self, request, *args, **kwargs):
+        cart = get_cart_backend().create()
+        serializer = self.get_serializer(cart)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not readers.enabled():
+            return super().retrieve(request, *args, **kwargs)
+        rows = get_cart_backend().item_rows(self.kwargs['pk'])
+        if rows is None:
+            raise Http404
+        return Response(readers.cart(self.kwargs['pk'], rows))
 
+    def get_object(self):
+        cart = get_cart_backend().get(self.kwargs['pk'])
+        if cart is None:
+            raise Http404
+        self.check_object_permissions(self.request, cart)
+        return cart
 
-class CartItemViewSet(ModelViewSet):
+    def perform_destroy(self, instance):
+        get_cart_backend().delete(instance.pk)
+
+
+class CartItemViewSet(QueryBudgetMixin, ModelViewSet):
 
     http_method_names = ['get', 'post', 'patch', 'delete']
+    query_budgets = {'list': 2, 'retrieve': 1, 'create': 2, 'batch': 2}
 
     def get_serializer_class(self):
-        if self.request.method == "POST":
+        if self.action == 'batch':
+            return BatchAddCartItemSerializer
+        elif self.request.method == "POST":
             return AddCartItemSerializer
         elif self.request.method == "PATCH":
             return UpdateCartItemSerializer
         return CartItemSerializer
 
     def get_queryset(self):
-        return CartItem.objects.select_related('cart', 'product').filter(cart_id=self.kwargs['cart_pk'])
+        return get_cart_backend().items(self.kwargs['cart_pk'])
+
+    def get_object(self):
+        item = get_cart_backend().get_item(self.kwargs['cart_pk'], self.kwargs['pk'])
+        if item is None:
+            raise Http404
+        self.check_object_permissions(self.request, item)
+        return item
+
+    def perform_destroy(self, instance):
+        get_cart_backend().remove_item(instance)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request, cart_pk=None):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.save()
+        return Response(CartItemSerializer(items, many=True).data, status=status.HTTP_201_CREATED)
 
     def get_serializer_context(self):
         return {'cart_id': self.kwargs['cart_pk']}
@@ -91,7 +231,7 @@ class CustomerViewSet(ModelViewSet):
 
     @action(detail=False, methods=('GET', 'PUT'), permission_classes=[IsAdminOrReadOnly])
     def me(self, request):
-        customer = Customer.objects.get(user_id=request.user.id)
+        customer = customers.get_customer(request)
         if request.method == "GET":
             serializer = CustomerSerializer(customer)
             return Response(serializer.data)
@@ -108,17 +248,21 @@ class OrderItemViewSet(ModelViewSet):
     serializer_class = OrderItemSerializer
 
 
-class OrderViewSet(ModelViewSet):
+class OrderViewSet(QueryBudgetMixin, ModelViewSet):
 
     http_method_names = ['get', 'patch', 'delete', 'head', 'options']
 
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    ordering = ['-placed_at']
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def create(self, request, *args, **kwargs):
         serializer = CreateOrderSerializer(data=request.data, context={
-                                           'user_id': self.request.user.id})
+                                           'customer_id': customers.get_customer_id(request)})
         serializer.is_valid(raise_exception=True)
         order = serializer.save()
+        prefetch_related_objects([order], 'items__product')
         serializer = OrderSerializer(order)
         return Response(serializer.data)
 
@@ -132,10 +276,23 @@ class OrderViewSet(ModelViewSet):
     def get_queryset(self):
         user = self.request.user
 
+        queryset = Order.objects.prefetch_related('items__product')
         if user.is_staff:
-            return Order.objects.select_related('customer').all()
-        customer_id = Customer.objects.get(user_id=user.id)
-        return Order.objects.select_related('customer').filter(customer_id=customer_id)
+            return queryset.all()
+        return queryset.filter(customer_id=customers.get_customer_id(self.request))
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser])
+    def export(self, request):
+        file_format = request.query_params.get('type', 'ndjson')
+        if file_format not in bulk.EXPORTERS:
+            return Response({'type': [f'Must be one of: {", ".join(bulk.EXPORTERS)}.']}, status=400)
+        filterset = OrderExportFilter(request.query_params, queryset=OrderItem.objects.all())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=400)
+        response = StreamingHttpResponse(
+            bulk.export_orders(filterset.qs, file_format), content_type=bulk.CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="orders.{file_format}"'
+        return response
 
 
 class ProductImageViewSet(ModelViewSet):
@@ -147,3 +304,10 @@ class ProductImageViewSet(ModelViewSet):
 
     def get_queryset(self):
         return ProductImage.objects.select_related('product').filter(product_id=self.kwargs['product_pk'])
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    return HttpResponse(request_metrics.render(request_metrics.collect()),
+                        content_type='text/plain; version=0.0.4; charset=utf-8')
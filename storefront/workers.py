@@ -0,0 +1,38 @@
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import nullcontext
+
+
+# Nothing here may import models at module level: spawned workers import this
+# module to find `init_worker` before Django is set up.
+
+
+def init_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+class InlineExecutor:
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+def process_pool(workers):
+    """
+    A pool of `workers` Django-ready processes, or with 0 workers an executor
+    that runs jobs in this process. Use it as a context manager.
+    """
+    if not workers:
+        return nullcontext(InlineExecutor())
+    # spawn rather than fork: forked children would share the parent's
+    # database sockets and any locks its threads were holding.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=init_worker)